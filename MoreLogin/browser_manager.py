@@ -1,4 +1,4 @@
-import sys
+import asyncio
 from typing import Optional, Tuple
 from selenium.webdriver import Chrome
 from selenium.webdriver.chrome.options import Options
@@ -70,6 +70,8 @@ class BrowserManager:
         """
         Завершение работы профиля браузера
 
+        Запрос к MoreLogin выполняется в отдельном потоке и не блокирует цикл событий.
+
         Args:
             env_id: ID окружения
 
@@ -78,7 +80,7 @@ class BrowserManager:
         """
         request_path = f"{BASEURL}/api/env/close"
         data = {"envId": env_id, "encryptKey": SECRET_KEY}
-        response = postRequest(request_path, data, requestHeader(APP_ID, APP_KEY)).json()
+        response = (await asyncio.to_thread(postRequest, request_path, data, requestHeader(APP_ID, APP_KEY))).json()
         logger.debug(f"Профиль {env_id} остановлен.")
         return response
 
@@ -94,27 +96,27 @@ class BrowserManager:
             Tuple[str, int, str]: Кортеж из ID профиля, unique_id и имени профиля
 
         Raises:
-            SystemExit: При ошибке API или отсутствии профиля
+            ConnectionError: При ошибке API MoreLogin
+            LookupError: Профиль с unique_id не найден
         """
         request_path = f"{BASEURL}/api/env/page"
         data = {"pageNo": 1, "pageSize": 100, "envName": "-"}
 
         try:
             response = postRequest(request_path, data, requestHeader(APP_ID, APP_KEY)).json()
-            if response["code"] != 0:
-                logger.error(f"Ошибка API: {response['msg']}")
-                sys.exit(1)
-
-            for env in response.get("data", {}).get("dataList", []):
-                if int(env["envName"][2:]) == unique_id:
-                    return str(env["id"]), unique_id, env["envName"]
-
-            logger.error("Профиль не найден. Проверьте unique_id.")
-            sys.exit(1)
         except Exception as e:
             logger.error(f"Ошибка подключения: {e}")
-            sys.exit(1)
+            raise ConnectionError(f"Ошибка подключения к MoreLogin: {e}") from e
+        if response["code"] != 0:
+            logger.error(f"Ошибка API: {response['msg']}")
+            raise ConnectionError(f"Ошибка API MoreLogin: {response['msg']}")
+
+        for env in response.get("data", {}).get("dataList", []):
+            if int(env["envName"][2:]) == unique_id:
+                return str(env["id"]), unique_id, env["envName"]
 
+        logger.error("Профиль не найден. Проверьте unique_id.")
+        raise LookupError(f"Профиль {unique_id} не найден в MoreLogin")
 
 async def more_login():
     global driver
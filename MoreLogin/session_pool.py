@@ -0,0 +1,166 @@
+"""
+Пул запущенных профилей MoreLogin с подключенным WebDriver.
+
+Запуск профиля обходится дорого: старт через API MoreLogin, подключение Chrome,
+ожидание инициализации MetaMask, правка lavamoat, разблокировка кошелька и выбор
+сети. Пул держит последние профили запущенными после работы: при следующем
+запуске того же профиля main_flow берет готовый драйвер (acquire) и сразу
+переходит к активностям.
+
+Перед выдачей профиль проверяется через CDP (Runtime.evaluate): закрытый
+пользователем браузер или упавший драйвер из пула удаляется. Память профиля
+оценивается как PROFILE_BASE_MB + JS heap текущей вкладки (Performance.getMetrics);
+при превышении MAX_SESSIONS или MEMORY_BUDGET_MB закрываются давно не
+использованные профили (LRU), а также простаивающие дольше MAX_IDLE_MINUTES.
+Кроме acquire/release лимиты проверяет sweep: в постоянном режиме его вызывает
+ProfileDaemon при каждом поиске новых профилей, поэтому простаивающий профиль
+закрывается, даже если другие профили не запускаются.
+
+Профили работают в разных потоках (постоянный режим), поэтому пул защищен
+блокировкой, а профиль на время работы из пула изымается.
+"""
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+from config import logger, get_settings
+from MoreLogin.browser_manager import BrowserManager
+
+
+@dataclass
+class WarmSession:
+    """Запущенный профиль: драйвер подключен, MetaMask разблокирован, сеть выбрана."""
+    env_id: str
+    driver: object  # selenium.webdriver.Chrome
+    wallet_address: str
+    started: datetime = field(default_factory=datetime.now)
+    last_used: datetime = field(default_factory=datetime.now)
+    memory_mb: float = 0.0
+    uses: int = 0
+
+
+def is_alive(driver) -> bool:
+    """Драйвер отвечает и браузер выполняет JS (CDP Runtime.evaluate)."""
+    try:
+        response = driver.execute_cdp_cmd("Runtime.evaluate", {"expression": "1", "returnByValue": True})
+        return response.get("result", {}).get("value") == 1 and bool(driver.window_handles)
+    except Exception:
+        return False
+
+
+def estimate_memory_mb(driver) -> float:
+    """Оценка памяти профиля: базовый размер браузера + JS heap текущей вкладки."""
+    base_mb = get_settings().warm_pool_profile_base_mb
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        metrics = driver.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", [])
+        heap = next((metric["value"] for metric in metrics if metric["name"] == "JSHeapTotalSize"), 0)
+        return base_mb + heap / (1024 * 1024)
+    except Exception:
+        return base_mb
+
+
+async def close_session(session: WarmSession):
+    """Закрывает драйвер и останавливает профиль в MoreLogin (блокирующие вызовы - в потоке)."""
+    try:
+        await asyncio.to_thread(session.driver.quit)
+    except Exception as e:
+        logger.debug(f" (close_session), Драйвер {session.env_id} уже закрыт: {e}")
+    try:
+        await BrowserManager.stop_browser_profile(session.env_id)
+    except Exception as e:
+        logger.error(f" (close_session), Ошибка остановки профиля {session.env_id}: {e}")
+
+
+class WarmSessionPool:
+    """LRU-пул запущенных профилей с ограничением по количеству и памяти."""
+
+    def __init__(self):
+        self._sessions: "OrderedDict[str, WarmSession]" = OrderedDict()  # От давно использованных к недавним
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return get_settings().warm_pool_enabled
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _take_expired(self) -> List[WarmSession]:
+        """Изымает профили сверх лимитов и простаивающие (вызывается под блокировкой)."""
+        settings = get_settings()
+        idle_before = datetime.now() - settings.warm_pool_max_idle
+        expired = [session for session in self._sessions.values() if session.last_used < idle_before]
+        for session in expired:
+            del self._sessions[session.env_id]
+        while self._sessions and (
+                len(self._sessions) > settings.warm_pool_max_sessions
+                or sum(session.memory_mb for session in self._sessions.values())
+                > settings.warm_pool_memory_budget_mb):
+            expired.append(self._sessions.popitem(last=False)[1])
+        return expired
+
+    async def acquire(self, env_id: str) -> Optional[WarmSession]:
+        """Забирает запущенный профиль из пула, если он есть и отвечает; иначе None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            session = self._sessions.pop(env_id, None)
+        await self.sweep()
+        if session is None:
+            return None
+        if not is_alive(session.driver):
+            logger.warning(f" (WarmSessionPool), Профиль {env_id} не отвечает, будет запущен заново")
+            await close_session(session)
+            return None
+        session.uses += 1
+        logger.info(f" (WarmSessionPool), Профиль {env_id} взят из пула (использований: {session.uses}, "
+                    f"запущен {session.started.strftime('%H:%M:%S')})")
+        return session
+
+    async def release(self, session: WarmSession):
+        """Возвращает профиль в пул после работы; лишние по LRU закрываются."""
+        if not self.enabled or not is_alive(session.driver):
+            await close_session(session)
+            return
+        session.last_used = datetime.now()
+        session.memory_mb = estimate_memory_mb(session.driver)
+        with self._lock:
+            self._sessions.pop(session.env_id, None)
+            self._sessions[session.env_id] = session
+            evicted = self._take_expired()
+        logger.debug(f" (WarmSessionPool), Профиль {session.env_id} оставлен запущенным "
+                     f"(~{session.memory_mb:.0f} МБ, в пуле: {len(self._sessions)})")
+        for old in evicted:
+            logger.info(f" (WarmSessionPool), Закрытие профиля {old.env_id} (вытеснен из пула)")
+            await close_session(old)
+
+    async def sweep(self):
+        """Закрывает профили, простаивающие дольше MAX_IDLE_MINUTES или сверх лимитов пула."""
+        with self._lock:
+            expired = self._take_expired()
+        for stale in expired:
+            logger.info(f" (WarmSessionPool), Закрытие простаивающего профиля {stale.env_id}")
+            await close_session(stale)
+
+    async def discard(self, session: WarmSession):
+        """Закрывает профиль, не возвращая его в пул (ошибка в работе)."""
+        with self._lock:
+            self._sessions.pop(session.env_id, None)
+        await close_session(session)
+
+    async def close_all(self):
+        """Закрывает все профили пула (завершение скрипта)."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            await close_session(session)
+        if sessions:
+            logger.info(f" (WarmSessionPool), Закрыто профилей пула: {len(sessions)}")
+
+
+warm_pool = WarmSessionPool()
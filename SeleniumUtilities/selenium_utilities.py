@@ -1,3 +1,4 @@
+import logging
 import time
 import random
 from pprint import pprint
@@ -213,7 +214,7 @@ class SeleniumUtilities:
             tuple: (WebElement, int) - найденный элемент и глубина, на которой он был найден, или (None, -1)
         """
         if current_depth >= max_depth:
-            logger.debug(f"Достигнута максимальная глубина поиска ({max_depth})")
+            logger.debug("Достигнута максимальная глубина поиска (%s)", max_depth)
             return None, -1
 
         try:
@@ -222,12 +223,12 @@ class SeleniumUtilities:
             if buttons:
                 for button in buttons:
                     if button.is_displayed() and button.is_enabled():
-                        logger.debug(f"Найдена кнопка '{text_btn}' на глубине {current_depth}")
+                        logger.debug("Найдена кнопка '%s' на глубине %s", text_btn, current_depth)
                         return button, current_depth
 
             # Если кнопка не найдена, ищем во всех дочерних элементах
             children = element.find_elements(By.XPATH, "./*")
-            logger.debug(f"Найдено {len(children)} дочерних элементов на глубине {current_depth}")
+            logger.debug("Найдено %s дочерних элементов на глубине %s", len(children), current_depth)
 
             for child in children:
                 result, depth = SeleniumUtilities.find_button_recursively(
@@ -237,7 +238,7 @@ class SeleniumUtilities:
                     return result, depth
 
         except Exception as e:
-            logger.debug(f"Ошибка при поиске на глубине {current_depth}: {str(e)}")
+            logger.debug("Ошибка при поиске на глубине %s: %s", current_depth, e)
 
         return None, -1
 
@@ -246,7 +247,7 @@ class SeleniumUtilities:
         """Ищет и безопасно кликает по кнопке, выполняя поиск во вложенных элементах."""
         number_of_symbols = (len(text_btn))  # подсчет количества символов в строковой переменной
         try:
-            logger.debug(f" (find_click_button), Начинаем поиск кнопки с текстом: '{text_btn}'")
+            logger.debug(" (find_click_button), Начинаем поиск кнопки с текстом: '%s'", text_btn)
             parsed_data = SeleniumUtilities.parse_interactive_elements(main_block)
 
             for element_info in parsed_data['elements_info']:
@@ -258,7 +259,7 @@ class SeleniumUtilities:
                         continue
 
                     if SeleniumUtilities.click_safely(button):
-                        logger.debug(f" (find_click_button), Успешный клик по кнопке '{text_btn}'")
+                        logger.debug(" (find_click_button), Успешный клик по кнопке '%s'", text_btn)
                         return True
 
             logger.warning(f" (find_click_button), Не найдена кнопка с текстом: '{text_btn}'")
@@ -277,13 +278,13 @@ class SeleniumUtilities:
             try:
                 if el['is_input_field'] and el['element'] and el['aria_label'].strip().lower() == aria_label.lower():
                     if el['element'].is_displayed() and el['element'].is_enabled():
-                        logger.debug(f"Попытка взаимодействия с полем ввода '{aria_label}', XPath: {el['xpath']}")
+                        logger.debug("Попытка взаимодействия с полем ввода '%s'", aria_label)
 
                         el['element'].click()
                         el['element'].clear()
                         el['element'].send_keys(text_input)
 
-                        logger.debug(f"Текст '{text_input}' успешно введен в поле '{aria_label}'")
+                        logger.debug("Текст '%s' успешно введен в поле '%s'", text_input, aria_label)
                         return True
                     else:
                         logger.warning(f"Поле '{aria_label}' недоступно для взаимодействия")
@@ -347,7 +348,8 @@ class SeleniumUtilities:
 
                 for obstr_elem in obstructing_elements:
                     try:
-                        logger.debug(f"Попытка закрытия окна: {obstr_elem.get_attribute('class')}")
+                        if logger.isEnabledFor(logging.DEBUG):  # get_attribute - лишний запрос к WebDriver
+                            logger.debug("Попытка закрытия окна: %s", obstr_elem.get_attribute('class'))
 
                         # 🔄 Ищем кнопку закрытия
                         close_buttons = obstr_elem.find_elements(By.XPATH,
@@ -399,10 +401,10 @@ class SeleniumUtilities:
                         if child_text.lower() == element_text.lower():
                         # if child_text.lower() == "metamask" and element_text.lower() == "metamask":
                             if child.is_displayed() and child.is_enabled():
-                                logger.debug(f" (find_and_click_child_by_text), Найден элемент с текстом: '{element_text}'. Попытка клика...")
+                                logger.debug(" (find_and_click_child_by_text), Найден элемент с текстом: '%s'. Попытка клика...", element_text)
 
                                 if SeleniumUtilities.click_safely(child):
-                                    logger.debug(f" (find_and_click_child_by_text), Успешный клик по элементу с текстом: '{element_text}'")
+                                    logger.debug(" (find_and_click_child_by_text), Успешный клик по элементу с текстом: '%s'", element_text)
                                     return True
                                 else:
                                     logger.warning(f" (find_and_click_child_by_text), Не удалось кликнуть по элементу с текстом: '{element_text}'")
@@ -415,10 +417,10 @@ class SeleniumUtilities:
                                 else (child_text.lower() == element_text.lower())
 
                             if text_match and child.is_displayed() and child.is_enabled():
-                                logger.debug(f" (find_and_click_child_by_text), Найден элемент с текстом: '{element_text}'. Попытка клика...")
+                                logger.debug(" (find_and_click_child_by_text), Найден элемент с текстом: '%s'. Попытка клика...", element_text)
 
                                 if SeleniumUtilities.click_safely(child):
-                                    logger.debug(f" (find_and_click_child_by_text), Успешный клик по элементу с текстом: '{element_text}'")
+                                    logger.debug(" (find_and_click_child_by_text), Успешный клик по элементу с текстом: '%s'", element_text)
                                     return True
                                 else:
                                     logger.warning(f" (find_and_click_child_by_text), Не удалось кликнуть по элементу с текстом: '{element_text}'")
@@ -438,12 +440,15 @@ class SeleniumUtilities:
     @staticmethod
     def find_which_selector(driver, by, selectors, timeout):
         for selector in selectors:
-            logger.debug(f' (SeleniumUtilities.find_which_selector), Проверяем селектор: {selector}')
+            logger.debug(' (SeleniumUtilities.find_which_selector), Проверяем селектор: %s', selector)
             selector_element = SeleniumUtilities.find_element_safely(driver, by, selector, timeout)
             if selector_element:
-                logger.debug(f' (SeleniumUtilities.find_which_selector), Найден элемент, type: {selector_element.get_attribute('type')} по селектору: {selector}')
+                if logger.isEnabledFor(logging.DEBUG):  # get_attribute - лишний запрос к WebDriver
+                    logger.debug(' (SeleniumUtilities.find_which_selector), Найден элемент, type: %s по селектору: %s',
+                                 selector_element.get_attribute('type'), selector)
                 return selector_element
-            logger.debug(f' (SeleniumUtilities.find_which_selector), Элемента не найдено по данному селектору: {selector}')
+            logger.debug(' (SeleniumUtilities.find_which_selector), Элемента не найдено по данному селектору: %s',
+                         selector)
         logger.debug(f' (SeleniumUtilities.find_which_selector), Элементов не найдено по данным селекторам')
         return None
 
@@ -509,3 +514,57 @@ class SeleniumUtilities:
         element = SeleniumUtilities.find_element_safely(driver, By.CSS_SELECTOR, class_selector)  # Находим элементы
         return element # Получаем 1 элемент
 
+    @staticmethod
+    def smooth_scroll(driver, fraction: float = None, element: WebElement = None, offset: int = None,
+                      duration: float = None) -> bool:
+        """
+        Плавная "человеческая" прокрутка страницы одним вызовом execute_async_script.
+
+        Вся анимация (easing + небольшой случайный дребезг) выполняется внутри страницы
+        через requestAnimationFrame, скрипт возвращает результат после ее завершения.
+        Цель прокрутки задается одним из параметров: fraction, element или offset.
+
+        Args:
+            driver: Экземпляр Selenium WebDriver.
+            fraction: Доля высоты страницы (0.5 - прокрутить до середины).
+            element: WebElement, который нужно вывести в центр экрана.
+            offset: Абсолютная позиция прокрутки в пикселях.
+            duration: Длительность анимации в секундах (по умолчанию случайная 0.6-1.2).
+
+        Returns:
+            True, если прокрутка выполнена, False в противном случае.
+        """
+        duration = duration if duration is not None else random.uniform(0.6, 1.2)
+        try:
+            result = driver.execute_async_script("""
+                var fraction = arguments[0], element = arguments[1], offset = arguments[2];
+                var duration = arguments[3] * 1000, done = arguments[arguments.length - 1];
+                var root = document.scrollingElement || document.documentElement;
+                var maxY = Math.max(0, root.scrollHeight - window.innerHeight);
+                var startY = window.scrollY, targetY;
+                if (element) {
+                    var rect = element.getBoundingClientRect();
+                    targetY = startY + rect.top - (window.innerHeight - rect.height) / 2;
+                } else if (fraction !== null) {
+                    targetY = document.body.scrollHeight * fraction;
+                } else {
+                    targetY = offset || 0;
+                }
+                targetY = Math.min(maxY, Math.max(0, targetY));
+                var distance = targetY - startY, startTime = null;
+                if (Math.abs(distance) < 1) { done(window.scrollY); return; }
+                function ease(t) { return t < 0.5 ? 4 * t * t * t : 1 - Math.pow(-2 * t + 2, 3) / 2; }
+                function step(now) {
+                    if (startTime === null) { startTime = now; }
+                    var t = Math.min(1, (now - startTime) / duration);
+                    var jitter = t < 1 ? (Math.random() - 0.5) * 4 : 0;
+                    window.scrollTo(0, startY + distance * ease(t) + jitter);
+                    if (t < 1) { window.requestAnimationFrame(step); } else { done(window.scrollY); }
+                }
+                window.requestAnimationFrame(step);
+            """, fraction, element, offset, duration)
+            logger.debug(f" (SeleniumUtilities.smooth_scroll), Прокрутка завершена, scrollY: {result}")
+            return True
+        except Exception as e:
+            logger.error(f" (SeleniumUtilities.smooth_scroll), Ошибка прокрутки: {e}")
+            return False
@@ -0,0 +1,168 @@
+"""
+Выполнение независимых активностей профиля в отдельных вкладках одного браузера.
+
+WebDriver однопоточный, поэтому активности чередуются кооперативно: каждая
+выполняется в своем потоке, но драйвер в каждый момент принадлежит только
+одной из них. Активность отдает драйвер в точках ожидания (wait_point вместо
+time.sleep) - пока она ждет транзакцию или загрузку страницы, другая работает
+в своей вкладке. При возврате драйвера окно переключается обратно на то, где
+активность остановилась (ее вкладка или открытое ею окно MetaMask).
+
+Порядок задается зависимостями: активность с after=('Monad_Faucet_Portal',)
+начнется только после завершения крана. Вне исполнителя wait_point - обычный
+time.sleep, поэтому активности работают и при последовательном запуске.
+
+Потоки активностей запускаются в копии контекста вызывающего потока, поэтому
+их логи несут run_id и номер профиля (logger_setup.log_context) и имя активности.
+"""
+import contextvars
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional, Sequence
+
+from config import logger
+from logger_setup import bind_log_context
+
+_local = threading.local()
+
+
+def is_cooperative() -> bool:
+    """Текущий код выполняется активностью внутри TabActivityExecutor."""
+    return getattr(_local, 'task', None) is not None
+
+
+def wait_point(seconds: float):
+    """
+    Пауза, во время которой драйвер может использовать другая активность.
+
+    Вне TabActivityExecutor равносильна time.sleep(seconds).
+    """
+    task = getattr(_local, 'task', None)
+    if task is None:
+        time.sleep(seconds)
+        return
+    task.executor.release(task)
+    try:
+        time.sleep(seconds)
+    finally:
+        task.executor.acquire(task)
+
+
+class Activity:
+    """Описание активности для TabActivityExecutor."""
+
+    def __init__(self, name: str, run: Callable[..., Any], after: Sequence[str] = ()):
+        """
+        Args:
+            name: Тип активности (как в DEFAULT_ACTIVITIES)
+            run: Функция (driver, wallet_address) -> результат активности
+            after: Активности, которые должны завершиться до начала этой
+        """
+        self.name = name
+        self.run = run
+        self.after = tuple(after)
+
+
+class _Task:
+    """Состояние выполняемой активности: вкладка, текущее окно, результат."""
+
+    def __init__(self, executor: "TabActivityExecutor", activity: Activity, handle: str):
+        self.executor = executor
+        self.activity = activity
+        self.handle = handle  # Вкладка активности
+        self.window = handle  # Окно, в котором активность отдала драйвер
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TabActivityExecutor:
+    """Кооперативное выполнение активностей в отдельных вкладках одного драйвера."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.baton = threading.Lock()  # Владелец драйвера
+
+    def acquire(self, task: _Task):
+        """Забирает драйвер и возвращается в окно, где активность остановилась."""
+        self.baton.acquire()
+        try:
+            target = task.window if task.window in self.driver.window_handles else task.handle
+            self.driver.switch_to.window(target)
+        except Exception as e:
+            # Драйвер остается за активностью: ошибку окна она обнаружит сама на следующем действии
+            logger.warning(f" (TabActivityExecutor), Не удалось вернуться во вкладку {task.activity.name}: {e}")
+
+    def release(self, task: _Task):
+        """Запоминает окно активности и отдает драйвер."""
+        try:
+            task.window = self.driver.current_window_handle
+        except Exception:
+            task.window = task.handle  # Окно (например, MetaMask) уже закрыто
+        self.baton.release()
+
+    def _worker(self, task: _Task, tasks: Dict[str, _Task], wallet_address: str):
+        for name in task.activity.after:
+            if name in tasks:
+                tasks[name].done.wait()
+        _local.task = task
+        try:
+            with bind_log_context(activity=task.activity.name):
+                self.acquire(task)
+                try:
+                    logger.debug(f" (TabActivityExecutor), Старт {task.activity.name} во вкладке {task.handle}")
+                    task.result = task.activity.run(self.driver, wallet_address)
+                finally:
+                    self.release(task)
+        except BaseException as e:
+            task.error = e
+            logger.error(f" (TabActivityExecutor), Ошибка активности {task.activity.name}: {e}")
+        finally:
+            _local.task = None
+            task.done.set()
+
+    def run(self, activities: List[Activity], wallet_address: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Выполняет активности и возвращает их результаты.
+
+        Первая активность работает в текущей вкладке, остальные - в новых. После завершения
+        всех активностей закрываются все окна, которых не было до запуска: вкладки активностей
+        и окна, которые открыли сами активности (например, вкладки Morkie ID).
+
+        Returns:
+            {activity_name: {'result': Any, 'error': Exception | None}}
+        """
+        started = time.perf_counter()
+        original = self.driver.current_window_handle
+        existing = set(self.driver.window_handles)
+        tasks: Dict[str, _Task] = {}
+        for index, activity in enumerate(activities):
+            if index == 0:
+                handle = original
+            else:
+                self.driver.switch_to.new_window('tab')
+                handle = self.driver.current_window_handle
+            tasks[activity.name] = _Task(self, activity, handle)
+        self.driver.switch_to.window(original)
+
+        # Каждому потоку своя копия контекста: контекст логов профиля общий, активность - своя
+        threads = [threading.Thread(target=contextvars.copy_context().run,
+                                    args=(self._worker, task, tasks, wallet_address),
+                                    name=f"activity-{name}", daemon=True)
+                   for name, task in tasks.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for handle in [handle for handle in self.driver.window_handles if handle not in existing]:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception as e:
+                logger.debug(" (TabActivityExecutor), Окно %s не закрыто: %s", handle, e)
+        self.driver.switch_to.window(original)
+
+        logger.info(f" (TabActivityExecutor), Активности {list(tasks)} выполнены за "
+                    f"{time.perf_counter() - started:.1f} сек")
+        return {name: {'result': task.result, 'error': task.error} for name, task in tasks.items()}
@@ -0,0 +1,124 @@
+"""
+Реестр активностей-плагинов.
+
+Каждая активность (кран, свап Kuru, onchaingm, ...) регистрируется в своем
+модуле через register_activity и описывает:
+    - точку входа run(driver, wallet_address) -> результат для БД;
+    - паузу после успешного выполнения (cooldown);
+    - минимальный баланс токена, без которого запуск бессмысленен;
+    - ожидаемую длительность, стоимость (газ в MON) и ценность.
+
+Планировщик (database.py) берет из реестра правила паузы и балансов, а по
+длительности и ценности выбирает профиль и порядок активностей в сессии, чтобы
+за один запуск браузера выполнить как можно больше полезной работы. Новая
+активность подключается модулем в ACTIVITY_SETTINGS.ACTIVITY_PLUGINS без
+изменений в database.py.
+"""
+import importlib
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Any, Callable, List, Optional, Sequence, Tuple
+
+from activity_executor import Activity
+from config import logger, get_settings
+
+# Модули, регистрирующие активности при импорте
+DEFAULT_PLUGIN_MODULES = ['faucet_morkie.faucet_morkie', 'kuru.kuru', 'onchaingm.onchaingm']
+# Накладные расходы сессии браузера (запуск профиля, разблокировка MetaMask, смена сети), сек
+SESSION_OVERHEAD_SECONDS = 90
+
+_registry: Dict[str, "ActivityPlugin"] = {}
+_loaded = False
+
+
+class ActivityPlugin(Activity):
+    """Активность с правилами планирования."""
+
+    def __init__(self, name: str, run: Callable[..., Any], cooldown: Callable[[], timedelta],
+                 required_balance: Optional[Callable[[], Tuple[str, Decimal]]] = None, expected_duration: float = 60,
+                 cost: Decimal = Decimal(0), value: float = 1.0, after: Sequence[str] = ()):
+        """
+        Args:
+            name: Тип активности (activity_type в БД)
+            run: Функция (driver, wallet_address) -> Dict результата
+            cooldown: Пауза после успешного выполнения (вызывается при каждой проверке - допускает случайность)
+            required_balance: Функция -> (адрес токена, минимальный баланс) или None (вызывается при каждой
+                проверке - минимум берется из текущих настроек)
+            expected_duration: Ожидаемая длительность, сек
+            cost: Ожидаемый расход газа, MON
+            value: Ценность выполнения (относительный вес при выборе)
+            after: Активности, которые должны завершиться раньше в той же сессии
+        """
+        super().__init__(name, run, after)
+        self.cooldown = cooldown
+        self.required_balance = required_balance
+        self.expected_duration = expected_duration
+        self.cost = cost
+        self.value = value
+
+    def next_allowed_time(self, last_success: datetime) -> datetime:
+        """Время, с которого активность снова можно выполнять после успеха."""
+        return last_success + self.cooldown()
+
+    @property
+    def value_rate(self) -> float:
+        """Ценность в минуту работы браузера."""
+        return self.value / max(self.expected_duration, 1) * 60
+
+
+def balance_is_enough(balance: Decimal, min_balance: Decimal) -> bool:
+    """
+    Хватает ли баланса для активности: баланс должен быть строго больше минимума.
+    Одна граница для отбора профилей в планировщике и для проверки внутри активности.
+    """
+    return balance > min_balance
+
+
+def register_activity(plugin: ActivityPlugin) -> ActivityPlugin:
+    """Регистрирует активность (повторная регистрация заменяет прежнюю)."""
+    _registry[plugin.name] = plugin
+    logger.debug(f" (register_activity), Зарегистрирована активность: {plugin.name}")
+    return plugin
+
+
+def load_activity_plugins() -> Dict[str, ActivityPlugin]:
+    """Импортирует модули активностей из ACTIVITY_SETTINGS.ACTIVITY_PLUGINS (один раз)."""
+    global _loaded
+    if not _loaded:
+        for module in get_settings().activity_plugins or DEFAULT_PLUGIN_MODULES:
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                logger.error(f" (load_activity_plugins), Модуль активности {module} не загружен: {e}")
+        _loaded = True
+    return _registry
+
+
+def get_activity(name: str) -> Optional[ActivityPlugin]:
+    """Активность по имени или None, если она не зарегистрирована."""
+    return load_activity_plugins().get(name)
+
+
+def order_for_session(names: Sequence[str]) -> List[ActivityPlugin]:
+    """
+    Порядок активностей в сессии: сначала более ценные в минуту, при равенстве - более дешевые.
+    Зависимости after соблюдаются: активность идет после тех, от которых зависит.
+    """
+    plugins = [plugin for name in names if (plugin := get_activity(name))]
+    pending = sorted(plugins, key=lambda plugin: (-plugin.value_rate, plugin.cost))
+    ordered: List[ActivityPlugin] = []
+    while pending:
+        names_left = {plugin.name for plugin in pending}
+        ready = next((plugin for plugin in pending if not names_left & set(plugin.after)), pending[0])
+        ordered.append(ready)
+        pending.remove(ready)
+    return ordered
+
+
+def session_score(names: Sequence[str]) -> float:
+    """Ценность сессии браузера с учетом накладных расходов на запуск профиля."""
+    plugins = [plugin for name in names if (plugin := get_activity(name))]
+    if not plugins:
+        return 0.0
+    duration = SESSION_OVERHEAD_SECONDS + sum(plugin.expected_duration for plugin in plugins)
+    return sum(plugin.value for plugin in plugins) / duration * 60
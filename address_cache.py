@@ -0,0 +1,162 @@
+"""
+Кэш адресов кошельков, вычисленных из сид-фраз.
+
+Адрес первого аккаунта MetaMask однозначно задается сид-фразой (wallet_derivation.
+address_from_seed), но вычисление дорогое: PBKDF2 BIP39 и импорт hdwallet, ~40 мс
+на фразу. Адреса вычисляются один раз для всей таблицы DB.xlsx (precompute_workbook,
+в пуле процессов отдельного интерпретатора python -m wallet_derivation) и хранятся
+в зашифрованном файле ADDRESS_CACHE_PATH.
+
+Сид-фразы в файле не хранятся: ключ записи - HMAC-SHA256 сид-фразы, содержимое
+зашифровано AES-GCM (pycryptodome, зависимость hdwallet) ключом из SECRET_KEY.
+Файл, созданный с другим ключом или поврежденный, считается пустым.
+"""
+import hashlib
+import hmac
+import json
+import os
+import subprocess
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from config import logger, get_config
+from wallet_derivation import derive_address
+
+ADDRESS_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".address_cache.bin")
+PROCESS_POOL_MIN_SEEDS = 8  # Меньше фраз вычисляются в текущем процессе: запуск пула дороже
+
+
+def _normalize(seed: str) -> str:
+    return " ".join(str(seed).split())
+
+
+def _derive_in_pool(seeds: List[str], workers: Optional[int] = None) -> List[Optional[str]]:
+    """
+    Адреса в пуле процессов отдельного интерпретатора (python -m wallet_derivation).
+
+    Процессы пула импортируют только wallet_derivation, а не main.py и config.
+    """
+    command = [sys.executable, "-m", "wallet_derivation"] + (["--workers", str(workers)] if workers else [])
+    completed = subprocess.run(command, input=json.dumps(seeds), capture_output=True, text=True,
+                               encoding="utf-8", check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    addresses = json.loads(completed.stdout)
+    return [addresses.get(seed) for seed in seeds]
+
+
+class AddressCache:
+    """Зашифрованный кэш {HMAC сид-фразы: адрес}."""
+
+    def __init__(self, path: str = ADDRESS_CACHE_PATH, secret: Optional[str] = None):
+        self.path = path
+        self._secret = secret  # По умолчанию SECRET_KEY из .env, читается при первом обращении
+        self._key_bytes: Optional[bytes] = None
+        self._addresses: Optional[Dict[str, str]] = None  # Загружается при первом обращении
+        self._lock = threading.Lock()
+
+    @property
+    def _key(self) -> bytes:
+        if self._key_bytes is None:
+            secret = self._secret if self._secret is not None else get_config().secret_key
+            self._key_bytes = hashlib.sha256(f"address-cache:{secret}".encode()).digest()
+        return self._key_bytes
+
+    def seed_key(self, seed: str) -> str:
+        return hmac.new(self._key, _normalize(seed).encode(), hashlib.sha256).hexdigest()
+
+    def _load(self) -> Dict[str, str]:
+        if self._addresses is None:
+            self._addresses = {}
+            try:
+                with open(self.path, "rb") as f:
+                    blob = f.read()
+                from Crypto.Cipher import AES  # Файл: nonce (12 байт) + tag (16 байт) + данные
+                cipher = AES.new(self._key, AES.MODE_GCM, nonce=blob[:12])
+                self._addresses = json.loads(cipher.decrypt_and_verify(blob[28:], blob[12:28]))
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f" (AddressCache), Кэш адресов не прочитан (другой SECRET_KEY или файл поврежден): {e}")
+        return self._addresses
+
+    def _save(self):
+        from Crypto.Cipher import AES
+        cipher = AES.new(self._key, AES.MODE_GCM, nonce=os.urandom(12))
+        ciphertext, tag = cipher.encrypt_and_digest(json.dumps(self._addresses).encode())
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(cipher.nonce + tag + ciphertext)
+        os.replace(tmp_path, self.path)
+
+    def get(self, seed: str) -> Optional[str]:
+        """Адрес из кэша или None."""
+        with self._lock:
+            return self._load().get(self.seed_key(seed))
+
+    def update(self, addresses: Dict[str, str]):
+        """Добавляет адреса {сид-фраза: адрес} и сохраняет файл."""
+        with self._lock:
+            known = self._load()
+            known.update({self.seed_key(seed): address for seed, address in addresses.items()})
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning(f" (AddressCache), Кэш адресов не сохранен: {e}")
+
+    def expected_address(self, seed: str) -> Optional[str]:
+        """Адрес по сид-фразе: из кэша, иначе вычисляется и сохраняется."""
+        address = self.get(seed)
+        if address is None:
+            address = derive_address(_normalize(seed))
+            if address:
+                self.update({seed: address})
+        return address
+
+    def precompute(self, seeds: Iterable[str], workers: Optional[int] = None) -> int:
+        """
+        Вычисляет адреса фраз, которых нет в кэше (при большом количестве - в пуле процессов).
+
+        Returns:
+            int: Количество новых адресов
+        """
+        with self._lock:
+            known = self._load()
+            missing: List[str] = list({_normalize(seed) for seed in seeds
+                                       if seed and self.seed_key(seed) not in known})
+        if not missing:
+            return 0
+
+        if len(missing) < PROCESS_POOL_MIN_SEEDS:
+            derived = [derive_address(seed) for seed in missing]
+        else:
+            derived = _derive_in_pool(missing, workers)
+
+        addresses = {seed: address for seed, address in zip(missing, derived) if address}
+        if len(addresses) < len(missing):
+            logger.warning(f" (AddressCache), Некорректных сид-фраз: {len(missing) - len(addresses)}")
+        self.update(addresses)
+        logger.info(f" (AddressCache), Вычислено адресов по сид-фразам: {len(addresses)}")
+        return len(addresses)
+
+
+address_cache = AddressCache()
+
+
+def read_seeds(file_path: Optional[str] = None, worksheet_name: Optional[str] = None) -> List[str]:
+    """Сид-фразы (колонка C) всех профилей DB.xlsx (по умолчанию DATA_BASE_PATH и WORKSHEET_NAME)."""
+    from openpyxl import load_workbook
+    workbook = load_workbook(file_path or get_config().file_path, read_only=True)
+    try:
+        rows = workbook[worksheet_name or get_config().worksheet_name].iter_rows(min_row=2, min_col=3, max_col=3, values_only=True)
+        return [str(seed) for (seed,) in rows if seed]
+    finally:
+        workbook.close()
+
+
+def precompute_workbook(file_path: Optional[str] = None) -> int:
+    """Заполняет кэш адресами всех профилей таблицы; ошибки не прерывают работу скрипта."""
+    try:
+        return address_cache.precompute(read_seeds(file_path))
+    except Exception as e:
+        logger.error(f" (precompute_workbook), Адреса по сид-фразам не вычислены: {e}")
+        return 0
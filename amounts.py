@@ -0,0 +1,60 @@
+"""
+Точная арифметика сумм токенов для свапов.
+
+Суммы хранятся как Decimal, а при необходимости переводятся в целые базовые
+единицы токена (wei для MON) с учетом decimals(). Float не используется:
+доля баланса для продажи, строка для поля ввода и изменения балансов до/после
+свапа считаются без накопления ошибки округления.
+"""
+from decimal import Decimal, ROUND_DOWN
+from typing import Union
+
+DEFAULT_DECIMALS = 18
+# Значащих цифр в сумме продажи: достаточно для мелких балансов (0.0₅1) и не перегружает поле ввода
+SALE_SIGNIFICANT_DIGITS = 6
+
+Amount = Union[Decimal, int, float, str]
+
+
+def to_decimal(value: Amount) -> Decimal:
+    """Приводит сумму к Decimal; float переводится через str, чтобы не тянуть двоичный хвост."""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        return Decimal(str(value))
+    return Decimal(value)
+
+
+def to_base_units(amount: Amount, decimals: int = DEFAULT_DECIMALS) -> int:
+    """Сумма в целых базовых единицах токена (дробный остаток отбрасывается)."""
+    return int(to_decimal(amount).scaleb(decimals).to_integral_value(rounding=ROUND_DOWN))
+
+
+def from_base_units(units: int, decimals: int = DEFAULT_DECIMALS) -> Decimal:
+    """Сумма из целых базовых единиц токена."""
+    return Decimal(units).scaleb(-decimals)
+
+
+def percent_of(amount: Amount, percent: Amount, decimals: int = DEFAULT_DECIMALS,
+               significant: int = SALE_SIGNIFICANT_DIGITS) -> Decimal:
+    """
+    Доля percent% от суммы, округленная вниз.
+
+    Округление до significant значащих цифр, но не точнее базовой единицы токена,
+    поэтому результат никогда не превышает долю баланса и представим в токене.
+    """
+    value = to_decimal(amount) * to_decimal(percent) / 100
+    if value <= 0:
+        return Decimal(0)
+    exponent = max(-decimals, value.adjusted() - significant + 1)
+    return value.quantize(Decimal(1).scaleb(exponent), rounding=ROUND_DOWN)
+
+
+def format_amount(amount: Amount) -> str:
+    """Строка для поля ввода и логов: без экспоненты и лишних нулей ('1200', '0.000052')."""
+    return format(to_decimal(amount).normalize(), 'f')
+
+
+def amount_delta(before: Amount, after: Amount) -> Decimal:
+    """Точное изменение суммы: after - before."""
+    return to_decimal(after) - to_decimal(before)
@@ -0,0 +1,187 @@
+"""
+Постоянный режим работы без планировщика ОС.
+
+Вместо цепочки "запуск из Task Scheduler -> один профиль -> новая задача" один
+процесс держит очередь с приоритетом (heapq) по времени, когда у каждого профиля
+наступает ближайшая активность. Профиль запускается, как только его время
+подошло, не более MAX_CONCURRENT_PROFILES одновременно; к времени запуска
+добавляется случайная задержка 0..JITTER_SECONDS, чтобы профили не стартовали
+по расписанию с точностью до секунды. После выполнения профиль возвращается в
+очередь со временем, пересчитанным по БД.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from config import logger, get_settings
+from database import SQLiteDatabase
+from logger_setup import push_log_context
+
+# Запуск профиля: (row, wallet_address, activities) -> None
+LaunchProfile = Callable[[int, str, List[str]], Awaitable[None]]
+# Список профилей (DB.xlsx): () -> [(row, wallet_address или None), ...]
+ListProfiles = Callable[[], List[Tuple[int, Optional[str]]]]
+
+
+class ProfileDaemon:
+    """Очередь профилей по времени ближайшей активности и их запуск по мере наступления."""
+
+    def __init__(self, launch: LaunchProfile, db: SQLiteDatabase = None, max_concurrent: Optional[int] = None,
+                 jitter_seconds: Optional[float] = None, retry_minutes: Optional[float] = None,
+                 rescan_minutes: Optional[float] = None,
+                 housekeeping: Optional[Callable[[], Awaitable[None]]] = None,
+                 profiles: Optional[ListProfiles] = None):
+        """
+        Args:
+            launch: Корутина обработки профиля (запуск браузера и активностей)
+            db: БД активностей (по умолчанию SQLiteDatabase())
+            max_concurrent: Сколько профилей может работать одновременно
+            jitter_seconds: Верхняя граница случайной задержки запуска
+            retry_minutes: Пауза перед повтором профиля, если его время по БД уже наступило после запуска
+            rescan_minutes: Как часто искать в БД новые профили
+            housekeeping: Корутина обслуживания при каждом поиске профилей (закрытие простаивающих профилей пула)
+            profiles: Источник списка профилей (DB.xlsx); без него в очередь попадают только профили,
+                у которых уже есть записи в БД активностей
+
+        Не заданные параметры берутся из GLOBAL_SETTINGS.DAEMON (get_settings), кроме max_concurrent -
+        при каждом обращении, поэтому изменения config.yaml применяются без перезапуска.
+        """
+        settings = get_settings()
+        self.launch = launch
+        self.db = db or SQLiteDatabase()
+        self.max_concurrent = max(1, int(max_concurrent or settings.daemon_max_concurrent_profiles))
+        self._jitter_seconds = jitter_seconds
+        self._retry = timedelta(minutes=retry_minutes) if retry_minutes is not None else None
+        self._rescan = timedelta(minutes=rescan_minutes) if rescan_minutes is not None else None
+        self.housekeeping = housekeeping
+        self.profiles = profiles
+        self._queue: List[Tuple[datetime, int, int, str]] = []  # (время запуска, порядковый номер, row, адрес)
+        self._counter = itertools.count()  # Порядок среди профилей с одинаковым временем
+        self._queued: Set[int] = set()
+        self._running: Dict[int, asyncio.Task] = {}
+
+    @property
+    def jitter_seconds(self) -> float:
+        return max(0.0, float(self._jitter_seconds if self._jitter_seconds is not None
+                              else get_settings().daemon_jitter_seconds))
+
+    @property
+    def retry(self) -> timedelta:
+        return self._retry if self._retry is not None else get_settings().daemon_retry
+
+    @property
+    def rescan(self) -> timedelta:
+        return self._rescan if self._rescan is not None else get_settings().daemon_rescan
+
+    def _push(self, row: int, wallet_address: str, due: datetime):
+        """Ставит профиль в очередь со случайной задержкой запуска."""
+        due += timedelta(seconds=random.uniform(0, self.jitter_seconds))
+        heapq.heappush(self._queue, (due, next(self._counter), row, wallet_address))
+        self._queued.add(row)
+        logger.debug(f" (ProfileDaemon), Профиль № {row} запланирован на {due.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    def refresh(self):
+        """Добавляет в очередь профили, которых еще нет ни в очереди, ни в работе (новые профили - сразу)."""
+        try:
+            profiles = self.profiles() if self.profiles else None
+        except Exception as e:
+            logger.error(f" (ProfileDaemon), Список профилей не прочитан: {e}")
+            return
+        added = 0
+        for row, wallet_address, due in self.db.get_profiles_schedule(profiles=profiles):
+            if row not in self._queued and row not in self._running:
+                self._push(row, wallet_address, due)
+                added += 1
+        if added:
+            logger.info(f" (ProfileDaemon), Добавлено профилей в очередь: {added}, всего: {len(self._queue)}")
+
+    def _reschedule(self, row: int, wallet_address: str, retry: bool = False):
+        """Возвращает профиль в очередь по времени его ближайшей активности."""
+        with self.db._get_connection() as conn:
+            due = self.db.get_next_eligible_time_with_connection(
+                conn, row, None, list(get_settings().default_activities))
+        now = datetime.now()
+        if retry or due <= now:
+            # Время по БД не сдвинулось (ошибка или активность не записана) - не перезапускаем профиль сразу
+            due = max(due, now + self.retry)
+        self._push(row, wallet_address, due)
+
+    async def _run_housekeeping(self):
+        if self.housekeeping is None:
+            return
+        try:
+            await self.housekeeping()
+        except Exception as e:
+            logger.error(f" (ProfileDaemon), Ошибка обслуживания: {e}")
+
+    async def _run_profile(self, row: int, wallet_address: str, semaphore: asyncio.Semaphore):
+        """Проверяет готовность профиля, запускает его и ставит обратно в очередь."""
+        failed = False
+        push_log_context(profile=row)  # Контекст задачи профиля, main_flow дополнит его run_id
+        try:
+            activities = await asyncio.to_thread(self.db.get_profile_activities, row, wallet_address)
+            if not activities:
+                logger.info(f" (ProfileDaemon), Профиль № {row}: нет активностей к выполнению (баланс или пауза)")
+                failed = True
+                return
+            started = datetime.now()
+            logger.info(f" (ProfileDaemon), Запуск Профиль № {row}: {activities}")
+            await self.launch(row, wallet_address, activities)
+            logger.info(f" (ProfileDaemon), Профиль № {row} обработан за {datetime.now() - started}")
+        except Exception as e:
+            failed = True
+            logger.error(f" (ProfileDaemon), Ошибка обработки Профиль № {row}: {e}")
+        finally:
+            self._running.pop(row, None)
+            semaphore.release()
+            try:
+                self._reschedule(row, wallet_address, retry=failed)
+            except Exception as e:
+                logger.error(f" (ProfileDaemon), Профиль № {row} не возвращен в очередь: {e}")
+
+    async def run(self, stop: Optional[asyncio.Event] = None):
+        """
+        Основной цикл: ждет ближайший профиль, запускает его при свободном слоте.
+
+        Args:
+            stop: Событие остановки; после него новые профили не запускаются, работающие дожидаются
+        """
+        stop = stop or asyncio.Event()
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        logger.info(f" (ProfileDaemon), Постоянный режим: до {self.max_concurrent} профилей одновременно, "
+                    f"задержка запуска до {self.jitter_seconds:.0f} сек")
+        self.refresh()
+        next_rescan = datetime.now() + self.rescan
+
+        while not stop.is_set():
+            now = datetime.now()
+            if now >= next_rescan:
+                self.refresh()
+                await self._run_housekeeping()
+                next_rescan = now + self.rescan
+
+            # Ждем ближайший профиль, но не дольше следующего поиска новых профилей
+            wake_at = min(self._queue[0][0], next_rescan) if self._queue else next_rescan
+            if wake_at > now:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=(wake_at - now).total_seconds())
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if not self._queue:
+                continue
+            await semaphore.acquire()  # Свободный слот; пока его нет, очередь не трогаем
+            if stop.is_set():
+                semaphore.release()
+                break
+            _, _, row, wallet_address = heapq.heappop(self._queue)
+            self._queued.discard(row)
+            self._running[row] = asyncio.create_task(self._run_profile(row, wallet_address, semaphore))
+
+        if self._running:
+            logger.info(f" (ProfileDaemon), Ожидание завершения профилей: {list(self._running)}")
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
@@ -0,0 +1,136 @@
+"""
+Бенчмарк стоимости логирования в потоках активностей.
+
+Несколько потоков (как активности во вкладках TabActivityExecutor) пишут типичную
+смесь сообщений: в основном отладочные с данными записи из БД, немного INFO и
+WARNING. Сравниваются:
+    legacy - прежняя схема: синхронные StreamHandler + FileHandler на DEBUG, f-строки;
+    queue  - logger_setup: QueueHandler/QueueListener, ротация файла, %-форматирование,
+             уровень файла INFO (отладочные сообщения отбрасываются до формирования записи);
+    queue-debug - та же очередь, но файл на DEBUG (все сообщения доходят до файла).
+Выводится время потока на одно сообщение: именно его платит активность.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_logging
+    python -m benchmarks.bench_logging --threads 4 --messages 20000
+"""
+import argparse
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from logger_setup import LOG_FORMAT_FILE, ContextFilter, JsonLinesFormatter
+
+# Запись активности, как ее логирует should_process_activity_with_connection
+RECORD = {'row': 17, 'status': 'success', 'next_attempt': None, 'activity_type': 'Kuru_Swap',
+          'wallet_address': '0x0F8009b1dE7fF721A66Eb36c64eA11b2b8847801',
+          'details': {'sold_tokens_symbol': '0.25 MON', 'bought_tokens_symbol': '12.5 CHOG'},
+          'timestamp': '2026-10-19 06:54:11'}
+
+
+def make_logger(name: str, handlers, level: int) -> logging.Logger:
+    bench_logger = logging.getLogger(f"bench.{name}")
+    bench_logger.propagate = False
+    bench_logger.handlers = list(handlers)
+    bench_logger.setLevel(level)
+    return bench_logger
+
+
+def workload_fstring(bench_logger: logging.Logger, messages: int):
+    for index in range(messages):
+        if index % 10 == 0:
+            bench_logger.info(f"Профиль № {RECORD['row']} обработан, статус: {RECORD['status']}")
+        elif index % 50 == 1:
+            bench_logger.warning(f"Активность {RECORD['activity_type']} не вернула результат")
+        else:
+            bench_logger.debug(f"Parsed activities for profile {RECORD['row']}: {[RECORD]}")
+
+
+def workload_lazy(bench_logger: logging.Logger, messages: int):
+    for index in range(messages):
+        if index % 10 == 0:
+            bench_logger.info("Профиль № %s обработан, статус: %s", RECORD['row'], RECORD['status'])
+        elif index % 50 == 1:
+            bench_logger.warning("Активность %s не вернула результат", RECORD['activity_type'])
+        else:
+            bench_logger.debug("Parsed activities for profile %s: %s", RECORD['row'], [RECORD])
+
+
+def run_threads(workload, bench_logger: logging.Logger, threads: int, messages: int) -> float:
+    """Среднее время потока на одно сообщение, мкс."""
+    durations = []
+
+    def worker():
+        started = time.perf_counter()
+        workload(bench_logger, messages)
+        durations.append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(durations) / len(durations) / messages * 1e6
+
+
+def file_handler(path: str, level: int, rotating: bool = False) -> logging.Handler:
+    handler = RotatingFileHandler(path, maxBytes=10 * 1024 * 1024, backupCount=2, encoding="utf-8") if rotating \
+        else logging.FileHandler(path, encoding="utf-8")
+    handler.setLevel(level)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT_FILE))
+    return handler
+
+
+def console_handler(level: int) -> logging.Handler:
+    handler = logging.StreamHandler(open(os.devnull, "w", encoding="utf-8"))
+    handler.setLevel(level)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT_FILE))
+    return handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Стоимость логирования в потоках активностей")
+    parser.add_argument("--threads", type=int, default=4, help="Количество потоков")
+    parser.add_argument("--messages", type=int, default=10000, help="Сообщений на поток")
+    parser.add_argument("--json", action="store_true", help="Добавить JSON lines в схемы с очередью")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = []
+
+        legacy = make_logger("legacy", [console_handler(logging.INFO),
+                                        file_handler(os.path.join(tmp, "legacy.log"), logging.DEBUG)], logging.DEBUG)
+        legacy.addFilter(ContextFilter())  # Формат ожидает %(context)s
+        results.append(("legacy", run_threads(workload_fstring, legacy, args.threads, args.messages)))
+
+        for name, file_level in (("queue", logging.INFO), ("queue-debug", logging.DEBUG)):
+            handlers = [console_handler(logging.INFO),
+                        file_handler(os.path.join(tmp, f"{name}.log"), file_level, rotating=True)]
+            if args.json:
+                json_handler = file_handler(os.path.join(tmp, f"{name}.jsonl"), file_level, rotating=True)
+                json_handler.setFormatter(JsonLinesFormatter())
+                handlers.append(json_handler)
+            log_queue = queue.SimpleQueue()
+            queue_handler = QueueHandler(log_queue)
+            queue_handler.addFilter(ContextFilter())
+            bench_logger = make_logger(name, [queue_handler], min(handler.level for handler in handlers))
+            listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            listener.start()
+            started = time.perf_counter()
+            per_message = run_threads(workload_lazy, bench_logger, args.threads, args.messages)
+            listener.stop()  # Дожидаемся записи всей очереди
+            results.append((name, per_message, time.perf_counter() - started))
+
+    print(f"{args.threads} потоков x {args.messages} сообщений (90% DEBUG)")
+    print(f"{'Схема':<14}{'мкс/сообщение в потоке':>24}{'Всего с записью, с':>22}")
+    for name, per_message, *total in results:
+        total_text = f"{total[0]:.2f}" if total else "-"
+        print(f"{name:<14}{per_message:>24.2f}{total_text:>22}")
+
+
+if __name__ == "__main__":
+    main()
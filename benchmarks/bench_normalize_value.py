@@ -0,0 +1,151 @@
+"""
+Бенчмарк и проверка normalize_value на балансах в формате страницы Kuru.
+
+Таблица CASES фиксирует известные форматы, а сгенерированный корпус проверяет
+свойства парсера на случайных значениях: точное совпадение с исходным Decimal
+для записи с разделителями разрядов, суффиксами K/M/B и сокращенной записью
+0.0ₙXYZ, а также устойчивость к повторному разбору результата. При расхождении
+скрипт завершается с кодом 1. Затем сравнивается скорость с прежней реализацией
+(несколько регулярных выражений на вызов и str(float)).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_normalize_value
+    python -m benchmarks.bench_normalize_value --corpus 20000 --seed 7
+"""
+import argparse
+import random
+import re
+import sys
+import timeit
+from decimal import Decimal
+from typing import List, Tuple
+
+from kuru.kuru import normalize_value
+
+SUBSCRIPTS = '₀₁₂₃₄₅₆₇₈₉'
+SUFFIXES = {'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}
+
+# (строка со страницы, ожидаемое значение; None - строка должна быть отвергнута)
+CASES = [
+    ("0", Decimal("0")),
+    ("12.5", Decimal("12.5")),
+    ("1,234.56", Decimal("1234.56")),
+    ("1,234,567", Decimal("1234567")),
+    ("1.2K", Decimal("1200")),
+    ("3.45M", Decimal("3450000")),
+    ("1B", Decimal("1000000000")),
+    ("2.5k", Decimal("2500")),
+    ("0.0₄52", Decimal("0.000052")),
+    ("0.0₁₂7", Decimal("0.0000000000007")),
+    ("0.045", Decimal("0.045")),  # Без нижнего индекса - обычное число
+    ("0.000000000000000001", Decimal("0.000000000000000001")),
+    (" 42.0 ", Decimal("42.0")),
+    ("$1,000.5", Decimal("1000.5")),
+    ("<0.0₅1", Decimal("0.000001")),
+    ("", None),
+    ("-", None),
+    ("abc", None),
+    ("1.2.3", None),
+    ("0.0₄", None),
+]
+
+
+def legacy_normalize_value(value_str: str) -> str:
+    """Прежняя реализация normalize_value (результат - str(float))."""
+    original_value = value_str
+    value_str = value_str.replace(',', '').strip()
+    subscript_map = {
+        '₀': '0', '₁': '1', '₂': '2', '₃': '3', '₄': '4',
+        '₅': '5', '₆': '6', '₇': '7', '₈': '8', '₉': '9'
+    }
+
+    def convert_subscripts(s):
+        return ''.join(subscript_map.get(char, char) for char in s)
+
+    value_str = convert_subscripts(value_str)
+    match = re.match(r'^0\.0(\d)(\d+)$', value_str)
+    if match:
+        return f"0.{''.join(['0'] * int(match.group(1)))}{match.group(2)}"
+
+    multiplier = 1
+    suffix_match = re.search(r'([KMB])$', value_str.upper())
+    if suffix_match:
+        multiplier = {'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}[suffix_match.group(1)]
+        value_str = value_str[:-1]
+
+    cleaned_value = re.sub(r'[^\d\.]', '', value_str)
+    if re.fullmatch(r'\d+(\.\d+)?', cleaned_value):
+        return str(float(cleaned_value) * multiplier)
+    return original_value
+
+
+def random_digits(rng: random.Random, length: int) -> str:
+    return str(rng.randint(10 ** (length - 1), 10 ** length - 1))
+
+
+def generate_corpus(count: int, seed: int) -> List[Tuple[str, Decimal]]:
+    """Случайные балансы в трех форматах страницы Kuru вместе с точным значением."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        kind = rng.choice(('plain', 'suffix', 'subscript'))
+        if kind == 'plain':
+            value = Decimal(rng.randint(0, 10 ** rng.randint(1, 24))).scaleb(-rng.randint(0, 18))
+            corpus.append((f"{value:,f}", value))
+        elif kind == 'suffix':
+            suffix = rng.choice(tuple(SUFFIXES))
+            mantissa = Decimal(random_digits(rng, rng.randint(1, 6))).scaleb(-rng.randint(0, 3))
+            corpus.append((f"{mantissa:f}{suffix}", mantissa * SUFFIXES[suffix]))
+        else:
+            zeros = rng.randint(1, 20)
+            tail = random_digits(rng, rng.randint(1, 6))
+            text = '0.0' + str(zeros).translate(str.maketrans('0123456789', SUBSCRIPTS)) + tail
+            corpus.append((text, Decimal(f"0.{'0' * zeros}{tail}")))
+    return corpus
+
+
+def check(cases: List[Tuple[str, Decimal]], verbose_limit: int = 10) -> int:
+    """Проверяет значения и свойства парсера, возвращает количество расхождений."""
+    mismatches = 0
+    for text, expected in cases:
+        try:
+            result = normalize_value(text)
+        except ValueError:
+            result = None
+        ok = result == expected and (result is None or (
+            result >= 0 and normalize_value(format(result, 'f')) == result  # Повторный разбор не меняет значение
+        ))
+        if not ok:
+            mismatches += 1
+            if mismatches <= verbose_limit:
+                print(f"FAIL {text!r}: {result}, ожидалось {expected}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк normalize_value на балансах Kuru")
+    parser.add_argument("--corpus", type=int, default=5000, help="Размер случайного корпуса")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора корпуса")
+    parser.add_argument("--number", type=int, default=20, help="Количество прогонов корпуса при замере")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.corpus, args.seed)
+    mismatches = check(CASES) + check(corpus)
+    legacy_lossy = sum(1 for text, expected in corpus if Decimal(legacy_normalize_value(text)) != expected)
+    print(f"Проверено: {len(CASES)} случаев и {len(corpus)} сгенерированных значений, расхождений: {mismatches}")
+    print(f"Прежняя реализация неточна на {legacy_lossy} из {len(corpus)} значений корпуса")
+    if mismatches:
+        sys.exit(1)
+
+    texts = [text for text, _ in corpus]
+    legacy = timeit.timeit(lambda: [legacy_normalize_value(text) for text in texts], number=args.number)
+    fast = timeit.timeit(lambda: [normalize_value(text) for text in texts], number=args.number)
+    calls = args.number * len(texts)
+    print(f"{'Способ':<14}{'Всего, с':>10}{'мкс/вызов':>12}")
+    print(f"{'legacy':<14}{legacy:>10.3f}{legacy / calls * 1e6:>12.2f}")
+    print(f"{'fast-path':<14}{fast:>10.3f}{fast / calls * 1e6:>12.2f}")
+    print(f"Ускорение: x{legacy / fast:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Бенчмарк времени запуска: импорт точек входа под python -X importtime.
+
+Каждый модуль импортируется в отдельном процессе несколько раз, из вывода
+importtime берется суммарное время импорта модуля (медиана по повторам) и
+самые тяжелые вложенные импорты. С --history результат дописывается в JSONL-файл
+и сравнивается с предыдущей записью, чтобы видеть, какие изменения замедлили
+старт (например, selenium или hdwallet снова загружаются при импорте).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --modules main,database --repeat 7 --history benchmarks/startup_history.jsonl
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODULES = ['main', 'database', 'automation.daemon', 'scan_balances', 'kuru.balance_provider']
+# Строка importtime: "import time:  self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$')
+
+
+def measure(module: str) -> Tuple[int, Dict[str, int]]:
+    """
+    Импортирует модуль в новом процессе.
+
+    Returns:
+        (суммарное время импорта модуля в мкс, {вложенный модуль: суммарное время в мкс})
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True,
+                            env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'})
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} завершился с ошибкой:\n{result.stderr[-2000:]}")
+
+    total = 0
+    nested: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, depth, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if name == module and depth == 1:
+            total = cumulative
+        else:
+            nested[name] = max(nested.get(name, 0), cumulative)
+    return total, nested
+
+
+def run(modules: List[str], repeat: int, top: int) -> Dict[str, Dict]:
+    """Медиана времени импорта и самые тяжелые вложенные импорты по каждому модулю."""
+    report = {}
+    for module in modules:
+        totals = []
+        heaviest: Dict[str, List[int]] = {}
+        for _ in range(repeat):
+            total, nested = measure(module)
+            totals.append(total)
+            for name, cumulative in nested.items():
+                heaviest.setdefault(name, []).append(cumulative)
+        ranked = sorted(((name, statistics.median(times)) for name, times in heaviest.items()),
+                        key=lambda item: item[1], reverse=True)
+        report[module] = {
+            'median_ms': statistics.median(totals) / 1000,
+            'min_ms': min(totals) / 1000,
+            'heaviest': [(name, cumulative / 1000) for name, cumulative in ranked[:top]],
+        }
+    return report
+
+
+def load_previous(history: Path) -> Dict[str, Dict]:
+    """Последняя запись истории или пустой словарь."""
+    if not history.exists():
+        return {}
+    lines = [line for line in history.read_text(encoding='utf-8').splitlines() if line.strip()]
+    return json.loads(lines[-1])['modules'] if lines else {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время импорта точек входа (python -X importtime)")
+    parser.add_argument("--modules", default=",".join(DEFAULT_MODULES), help="Модули через запятую")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество процессов на модуль")
+    parser.add_argument("--top", type=int, default=5, help="Сколько тяжелых вложенных импортов показывать")
+    parser.add_argument("--history", type=Path, help="JSONL-файл истории замеров (дописывается)")
+    args = parser.parse_args()
+
+    modules = [module.strip() for module in args.modules.split(",") if module.strip()]
+    report = run(modules, args.repeat, args.top)
+    previous = load_previous(args.history) if args.history else {}
+
+    print(f"{'Модуль':<26}{'Медиана, мс':>12}{'Мин, мс':>10}{'Было, мс':>10}")
+    for module, stats in report.items():
+        before = previous.get(module, {}).get('median_ms')
+        before_text = f"{before:.1f}" if before is not None else "-"
+        print(f"{module:<26}{stats['median_ms']:>12.1f}{stats['min_ms']:>10.1f}{before_text:>10}")
+        for name, cumulative in stats['heaviest']:
+            print(f"    {name:<40}{cumulative:>8.1f} мс")
+
+    if args.history:
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'timestamp': datetime.now().isoformat(timespec='seconds'),
+                                'python': sys.version.split()[0], 'modules': report}, ensure_ascii=False) + "\n")
+        print(f"Результат добавлен в {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Бенчмарк и проверка StatusClassifier на таблице сообщений крана.
+
+Сравнивает прежний способ (re.search по каждому сырому шаблону при каждом
+вызове + отдельный поиск времени ожидания) с STATUS_CLASSIFIER (шаблоны
+скомпилированы заранее) и с одной общей альтернацией всех шаблонов. Замер идет
+на строках таблицы и на тех же строках в тексте размером со страницу крана
+(--page-lines строк текста перед сообщением).
+Перед замером каждая строка таблицы проверяется на ожидаемый статус и время
+ожидания; при расхождении скрипт завершается с кодом 1 (те же случаи проверяет
+tests/test_status_classifier.py).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_status_classifier
+    python -m benchmarks.bench_status_classifier --number 20000
+"""
+import argparse
+import re
+import sys
+import timeit
+from datetime import timedelta
+
+from faucet_morkie.faucet_morkie import STATUS_CLASSIFIER, STATUS_RULES
+
+# Шаблоны в прежнем виде (до StatusClassifier) - только для сравнения скорости
+LEGACY_PATTERNS = {
+    'limit_exceeded': [r'Too many requests', r'Claim limit exceeded', r'Claim limit reached',
+                       r'Try again in \d+h \d+m', r'Please try again later', r"You've already claimed. "],
+    'require_morkie_id': [r'You need a Morkie ID', r'Morkie ID required'],
+    'failed': [r'Transaction failed', r'Failed to process', r'Failed to send transaction',
+               r'Too many requests. Please try again later.',
+               r'Network error. Check your connection and try again.', r'error',
+               r'Server error. Please try again later.'],
+    'success': [r'Success!', r'Transaction:', r'Success! Check your wallet.'],
+}
+
+# (текст страницы, ожидаемый статус, ожидаемое время ожидания)
+CASES = [
+    ("Success! Check your wallet\nTransaction: 0xabab...abab", 'success', None),
+    ("Claim limit reached. Try again in 3h 12m", 'limit_exceeded', timedelta(hours=3, minutes=12)),
+    ("Claim limit exceeded. Try again in 5h", 'limit_exceeded', timedelta(hours=5)),
+    ("You've already claimed. Try again in 45m", 'limit_exceeded', timedelta(minutes=45)),
+    ("Too many requests. Please try again later.", 'limit_exceeded', None),
+    ("You need a Morkie ID to claim", 'require_morkie_id', None),
+    ("Morkie ID required", 'require_morkie_id', None),
+    ("Transaction failed", 'failed', None),
+    ("Failed to send transaction", 'failed', None),
+    ("Network error. Check your connection and try again.", 'failed', None),
+    # Правило limit_exceeded приоритетнее failed при любом порядке фраз (как в наблюдателе в странице)
+    ("Server error. Please try again later.", 'limit_exceeded', None),
+    ("Please try again later. Server error", 'limit_exceeded', None),
+    ("Unexpected error occurred", 'failed', None),
+    ("Success! No errors detected.\nTransaction: 0x12", 'success', None),
+    ("Claim MON\nGet testnet MON every 24 hours.\nProcessing...", 'unknown', None),
+    ("Claim MON\nGet testnet MON every 24 hours.\nClaim limit reached. Try again in 23h 59m",
+     'limit_exceeded', timedelta(hours=23, minutes=59)),
+]
+
+
+# Текст страницы крана вокруг сообщения о статусе
+PAGE_LINE = "Monad Testnet faucet. Connect your wallet and claim testnet MON tokens every day.\n"
+
+# Все шаблоны одной альтернацией именованных групп (вариант, от которого отказался StatusClassifier)
+ALTERNATION = re.compile('|'.join(f'(?P<rule{index}>{"|".join(f"(?:{pattern})" for pattern in patterns)})'
+                                  for index, (_, patterns) in enumerate(STATUS_RULES)), re.IGNORECASE)
+
+
+def alternation_classify(text: str):
+    """Статус по одной альтернации: наивысший приоритет среди всех совпадений (без времени ожидания)."""
+    indexes = [int(match.lastgroup[4:]) for match in ALTERNATION.finditer(text)]
+    return STATUS_RULES[min(indexes)][0] if indexes else 'unknown'
+
+
+def legacy_classify(text: str):
+    """Прежняя логика get_faucet_status: перебор сырых шаблонов и отдельный поиск ожидания."""
+    status = 'unknown'
+    for name, patterns in LEGACY_PATTERNS.items():
+        if any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns):
+            status = name
+            break
+    wait = None
+    if status == 'limit_exceeded' and (wait_match := re.search(r'in (\d+h \d+m|\d+h|\d+m)', text)):
+        hours = re.search(r'(\d+)h', wait_match.group(1))
+        minutes = re.search(r'(\d+)m', wait_match.group(1))
+        wait = timedelta(hours=int(hours.group(1)) if hours else 0, minutes=int(minutes.group(1)) if minutes else 0)
+    return status, wait
+
+
+def check_cases() -> int:
+    """Проверяет таблицу CASES, возвращает количество расхождений."""
+    mismatches = 0
+    for text, expected_status, expected_wait in CASES:
+        result = STATUS_CLASSIFIER.classify(text)
+        if result['status'] != expected_status or result['wait'] != expected_wait:
+            mismatches += 1
+            print(f"FAIL {text!r}: {result['status']}/{result['wait']}, ожидалось {expected_status}/{expected_wait}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк StatusClassifier на сообщениях крана")
+    parser.add_argument("--number", type=int, default=5000, help="Количество прогонов таблицы")
+    parser.add_argument("--page-lines", type=int, default=40, help="Строк текста страницы перед сообщением")
+    args = parser.parse_args()
+
+    mismatches = check_cases()
+    print(f"Проверено случаев: {len(CASES)}, расхождений: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+    methods = [('legacy', legacy_classify), ('alternation', alternation_classify),
+               ('classifier', STATUS_CLASSIFIER.classify)]
+    for title, texts, number in [
+        ('Сообщения', [text for text, _, _ in CASES], args.number),
+        (f'Страница ({args.page_lines} строк)', [PAGE_LINE * args.page_lines + text for text, _, _ in CASES],
+         max(1, args.number // max(1, args.page_lines))),
+    ]:
+        calls = number * len(texts)
+        results = {name: timeit.timeit(lambda: [method(text) for text in texts], number=number)
+                   for name, method in methods}
+        print(f"\n{title}\n{'Способ':<14}{'Всего, с':>10}{'мкс/вызов':>12}")
+        for name, elapsed in results.items():
+            print(f"{name:<14}{elapsed:>10.3f}{elapsed / calls * 1e6:>12.2f}")
+        print(f"Ускорение classifier относительно legacy: x{results['legacy'] / results['classifier']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Локальный сервер MoreLogin API для бенчмарков и нагрузочного теста.
+
+Реализует эндпоинты /api/env/page, /api/env/start и /api/env/close в формате
+MoreLogin, проверяет подпись запросов (X-Api-Id, X-Nonce-Id, Authorization =
+MD5(appId + nonceId + secretKey), как в requestHeader) и вместо браузерного
+профиля запускает headless Chromium с открытым debug-портом. Умеет добавлять
+задержку и случайные ошибки, чтобы нагрузочно тестировать BrowserManager и
+логику повторных запусков (benchmarks/load_test_morelogin.py).
+
+Nonce принимается, если его метка времени (первые 13 цифр, мс) отличается от
+текущего времени не больше NONCE_WINDOW_SECONDS; использованные nonce хранятся
+только в пределах этого окна, поэтому память не растет при длительной нагрузке.
+
+Запуск отдельным процессом (затем укажите BASEURL=http://127.0.0.1:40000 в .env):
+    python -m benchmarks.fake_morelogin --port 40000 --profiles 60 --latency 0.05,0.3 --failure-rate 0.05
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+
+from config import logger, APP_ID, APP_KEY
+from MoreLogin.base_func_morelogin import md5Encode
+
+NONCE_WINDOW_SECONDS = 300  # Допустимое расхождение метки времени nonce с текущим временем
+
+
+def find_free_port() -> int:
+    """Возвращает свободный TCP-порт на 127.0.0.1."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def find_chrome_binary() -> Optional[str]:
+    """Ищет исполняемый файл Chrome/Chromium (переменная BENCH_CHROME_BINARY или PATH)."""
+    candidates = [os.environ.get("BENCH_CHROME_BINARY"), "google-chrome", "chromium", "chromium-browser", "chrome"]
+    for candidate in candidates:
+        if candidate and (path := shutil.which(candidate)):
+            return path
+    return None
+
+
+def find_chromedriver() -> Optional[str]:
+    """Ищет chromedriver (переменная BENCH_CHROMEDRIVER или PATH)."""
+    candidate = os.environ.get("BENCH_CHROMEDRIVER")
+    if candidate and os.path.exists(candidate):
+        return candidate
+    return shutil.which("chromedriver")
+
+
+class MoreLoginSimulator:
+    """Симулятор MoreLogin: список профилей, проверка подписи и запущенные браузеры."""
+
+    def __init__(self,
+                 profiles: int = 10,
+                 app_id: str = APP_ID,
+                 secret_key: str = APP_KEY,
+                 validate_signature: bool = True,
+                 latency: Tuple[float, float] = (0.0, 0.0),
+                 failure_rate: float = 0.0,
+                 http_error_rate: float = 0.0,
+                 launch_browsers: bool = True,
+                 headless: bool = True,
+                 chrome_binary: Optional[str] = None,
+                 chromedriver: Optional[str] = None):
+        """
+        Args:
+            profiles: Количество профилей (имена P-1 ... P-N, как ожидает get_list_browser_profiles)
+            app_id: Ожидаемый X-Api-Id
+            secret_key: Секрет для проверки подписи (BrowserManager подписывает запросы APP_KEY)
+            validate_signature: Проверять подпись и уникальность nonce
+            latency: Диапазон (мин, макс) искусственной задержки ответа в секундах
+            failure_rate: Доля запусков профиля, завершающихся ответом с code != 0
+            http_error_rate: Доля запросов, завершающихся HTTP 500
+            launch_browsers: Запускать настоящий Chromium (False - только имитация debug-порта)
+            headless: Запускать Chromium в headless-режиме
+            chrome_binary: Путь к Chrome/Chromium
+            chromedriver: Путь к chromedriver, возвращаемый в поле webdriver
+        """
+        self.profiles = {str(1_000_000 + n): f"P-{n}" for n in range(1, profiles + 1)}
+        self.app_id = app_id
+        self.secret_key = secret_key
+        self.validate_signature = validate_signature
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.http_error_rate = http_error_rate
+        self.launch_browsers = launch_browsers
+        self.headless = headless
+        self.chrome_binary = chrome_binary or find_chrome_binary()
+        self.chromedriver = chromedriver or find_chromedriver() or ""
+
+        self.running: Dict[str, Tuple[Optional[subprocess.Popen], int, Optional[str]]] = {}
+        self.seen_nonces: Dict[str, float] = {}  # nonce -> время, после которого он отклоняется по метке времени
+        self._nonce_expiry: List[Tuple[float, str]] = []  # Куча (время истечения, nonce) для очистки seen_nonces
+        self.stats = {"requests": 0, "rejected": 0, "failures": 0, "http_errors": 0,
+                      "started": 0, "closed": 0, "max_running": 0}
+        self.lock = threading.Lock()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, port: int = 0) -> "MoreLoginSimulator":
+        """Запускает HTTP-сервер в фоновом потоке (port=0 - любой свободный порт)."""
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    payload = {}
+                code, body = simulator.handle(self.path, self.headers, payload)
+                raw = json.dumps(body).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, format, *args):
+                logger.debug(f" (MoreLoginSimulator) {self.address_string()} {format % args}")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logger.info(f" (MoreLoginSimulator.start), Симулятор MoreLogin запущен: {self.base_url}")
+        return self
+
+    def stop(self):
+        """Останавливает сервер и все запущенные браузеры."""
+        for env_id in list(self.running):
+            self.close_browser(env_id)
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def check_signature(self, headers: Mapping[str, str]) -> Optional[str]:
+        """Проверяет подпись запроса. Возвращает текст ошибки или None."""
+        app_id = headers.get("X-Api-Id", "")
+        nonce_id = headers.get("X-Nonce-Id", "")
+        authorization = headers.get("Authorization", "")
+        if app_id != self.app_id:
+            return f"Invalid X-Api-Id: {app_id}"
+        if not nonce_id:
+            return "Missing X-Nonce-Id"
+        if authorization != md5Encode(nonce_id, app_id, self.secret_key):
+            return "Invalid signature"
+        try:
+            nonce_time = int(nonce_id[:13]) / 1000  # generateNonceId: время в мс + случайный суффикс
+        except ValueError:
+            return f"Invalid X-Nonce-Id: {nonce_id}"
+        now = time.time()
+        if abs(now - nonce_time) > NONCE_WINDOW_SECONDS:
+            return f"Nonce expired: {nonce_id}"
+        with self.lock:
+            # Nonce старше окна отклоняются по метке времени, хранить их не нужно
+            while self._nonce_expiry and self._nonce_expiry[0][0] < now:
+                del self.seen_nonces[heapq.heappop(self._nonce_expiry)[1]]
+            if nonce_id in self.seen_nonces:
+                return f"Nonce already used: {nonce_id}"
+            expires = nonce_time + NONCE_WINDOW_SECONDS
+            self.seen_nonces[nonce_id] = expires
+            heapq.heappush(self._nonce_expiry, (expires, nonce_id))
+        return None
+
+    def handle(self, path: str, headers: Mapping[str, str], payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """Обрабатывает запрос к API и возвращает (HTTP-код, тело ответа)."""
+        with self.lock:
+            self.stats["requests"] += 1
+
+        low, high = self.latency
+        if high > 0:
+            time.sleep(random.uniform(low, high))
+
+        if self.validate_signature and (error := self.check_signature(headers)):
+            logger.warning(f" (MoreLoginSimulator.handle), Запрос {path} отклонен: {error}")
+            with self.lock:
+                self.stats["rejected"] += 1
+            return 200, {"code": 401, "msg": error, "data": None}
+
+        if self.http_error_rate and random.random() < self.http_error_rate:
+            with self.lock:
+                self.stats["http_errors"] += 1
+            return 500, {"code": 500, "msg": "Simulated internal server error", "data": None}
+
+        if path == "/api/env/page":
+            data_list = [{"id": env_id, "envName": name} for env_id, name in self.profiles.items()]
+            page_no = int(payload.get("pageNo", 1))
+            page_size = int(payload.get("pageSize", 100))
+            page = data_list[(page_no - 1) * page_size:page_no * page_size]
+            return 200, {"code": 0, "msg": "success", "data": {"dataList": page, "total": len(data_list)}}
+
+        env_id = str(payload.get("envId", ""))
+        if path in ("/api/env/start", "/api/env/close") and env_id not in self.profiles:
+            return 200, {"code": 404, "msg": f"Profile {env_id} not found", "data": None}
+
+        if path == "/api/env/start":
+            if self.failure_rate and random.random() < self.failure_rate:
+                with self.lock:
+                    self.stats["failures"] += 1
+                return 200, {"code": 500, "msg": "Simulated profile start failure", "data": None}
+            try:
+                debug_port = self.launch_browser(env_id)
+            except Exception as e:
+                logger.error(f" (MoreLoginSimulator.handle), Ошибка запуска браузера: {e}")
+                with self.lock:
+                    self.stats["failures"] += 1
+                return 200, {"code": 500, "msg": str(e), "data": None}
+            return 200, {"code": 0, "msg": "success",
+                         "data": {"envId": env_id, "debugPort": str(debug_port), "webdriver": self.chromedriver}}
+
+        if path == "/api/env/close":
+            self.close_browser(env_id)
+            return 200, {"code": 0, "msg": "success", "data": {"envId": env_id}}
+
+        return 404, {"code": 404, "msg": "Not found", "data": None}
+
+    def launch_browser(self, env_id: str) -> int:
+        """Запускает Chromium для профиля (или возвращает порт уже запущенного)."""
+        with self.lock:
+            if env_id in self.running:
+                process, debug_port, _ = self.running[env_id]
+                if process is None or process.poll() is None:
+                    return debug_port
+
+            debug_port = find_free_port()
+            if not self.launch_browsers:
+                self.running[env_id] = (None, debug_port, None)
+                self._count_started()
+                return debug_port
+
+            if not self.chrome_binary:
+                raise RuntimeError("Chrome не найден. Укажите путь в переменной BENCH_CHROME_BINARY")
+
+            user_data_dir = tempfile.mkdtemp(prefix=f"morelogin_sim_{env_id}_")
+            args = [
+                self.chrome_binary,
+                f"--remote-debugging-port={debug_port}",
+                f"--user-data-dir={user_data_dir}",
+                "--no-first-run",
+                "--no-default-browser-check",
+                "--no-sandbox",
+                "--disable-gpu",
+                "--disable-dev-shm-usage",
+                "--window-size=1280,900",
+                "about:blank",
+            ]
+            if self.headless:
+                args.insert(1, "--headless=new")
+            process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self.running[env_id] = (process, debug_port, user_data_dir)
+            self._count_started()
+
+        # Ждем, пока Chromium откроет debug-порт
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(("127.0.0.1", debug_port), timeout=0.2):
+                    break
+            except OSError:
+                if process.poll() is not None:
+                    self.close_browser(env_id)
+                    raise RuntimeError(f"Chromium завершился с кодом {process.returncode}")
+                time.sleep(0.1)
+        else:
+            self.close_browser(env_id)
+            raise RuntimeError(f"Chromium не открыл debug-порт {debug_port} за 15 секунд")
+
+        logger.debug(f" (MoreLoginSimulator.launch_browser), Профиль {env_id} запущен на порту {debug_port}")
+        return debug_port
+
+    def _count_started(self):
+        """Обновляет счетчики запусков (вызывается под self.lock)."""
+        self.stats["started"] += 1
+        self.stats["max_running"] = max(self.stats["max_running"], len(self.running))
+
+    def close_browser(self, env_id: str):
+        """Останавливает Chromium профиля и удаляет временный каталог."""
+        with self.lock:
+            entry = self.running.pop(env_id, None)
+            if entry:
+                self.stats["closed"] += 1
+        if not entry:
+            return
+        process, _, user_data_dir = entry
+        if process:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if user_data_dir:
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+        logger.debug(f" (MoreLoginSimulator.close_browser), Профиль {env_id} остановлен")
+
+
+def parse_range(value: str) -> Tuple[float, float]:
+    """Разбирает диапазон вида '0.05,0.3' или одно число '0.1'."""
+    parts = [float(part) for part in value.split(",")]
+    return (parts[0], parts[-1]) if parts else (0.0, 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный симулятор MoreLogin API")
+    parser.add_argument("--port", type=int, default=40000, help="Порт HTTP-сервера")
+    parser.add_argument("--profiles", type=int, default=60, help="Количество профилей P-1 ... P-N")
+    parser.add_argument("--latency", type=parse_range, default=(0.0, 0.0), help="Задержка ответа, сек: мин,макс")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Доля неудачных запусков профиля")
+    parser.add_argument("--http-error-rate", type=float, default=0.0, help="Доля ответов HTTP 500")
+    parser.add_argument("--no-browsers", action="store_true", help="Не запускать Chromium, только API")
+    parser.add_argument("--headful", action="store_true", help="Запускать Chromium с окном")
+    parser.add_argument("--no-signature", action="store_true", help="Не проверять подпись запросов")
+    args = parser.parse_args()
+
+    simulator = MoreLoginSimulator(
+        profiles=args.profiles,
+        validate_signature=not args.no_signature,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        http_error_rate=args.http_error_rate,
+        launch_browsers=not args.no_browsers,
+        headless=not args.headful,
+    ).start(port=args.port)
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f" (MoreLoginSimulator), Статистика: {simulator.stats}")
+    except KeyboardInterrupt:
+        logger.info(" (MoreLoginSimulator), Остановка симулятора")
+    finally:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
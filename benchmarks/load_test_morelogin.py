@@ -0,0 +1,135 @@
+"""
+Нагрузочный тест BrowserManager против локального MoreLogin API (benchmarks/fake_morelogin.py).
+
+Для каждого профиля выполняется цикл: запуск через /api/env/start (с повторными
+попытками, как в main_flow), опционально подключение WebDriver, и остановка
+через /api/env/close. Профили обрабатываются параллельно с заданным пределом.
+
+Запуск из корня проекта:
+    python -m benchmarks.load_test_morelogin --profiles 50 --concurrency 50
+    python -m benchmarks.load_test_morelogin --profiles 100 --no-browsers --latency 0.05,0.5 --failure-rate 0.1
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, Any, List
+
+import MoreLogin.browser_manager as browser_manager
+from benchmarks.fake_morelogin import MoreLoginSimulator, parse_range
+from config import logger
+from MoreLogin.browser_manager import BrowserManager
+
+MAX_START_ATTEMPTS = 4  # Как в main_flow: первая попытка + 3 перезапуска
+RETRY_DELAY = 0.5
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Возвращает перцентиль по методу ближайшего ранга."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def profile_cycle(env_id: str, semaphore: asyncio.Semaphore, attach_driver: bool) -> Dict[str, Any]:
+    """Запуск, (опционально) подключение драйвера и остановка одного профиля."""
+    result = {"env_id": env_id, "ok": False, "attempts": 0, "start_time": None, "close_time": None, "error": None}
+    async with semaphore:
+        for attempt in range(1, MAX_START_ATTEMPTS + 1):
+            result["attempts"] = attempt
+            started = time.perf_counter()
+            try:
+                # Методы BrowserManager блокирующие (requests), поэтому выполняем их в потоках
+                debug_url, driver_path = await asyncio.to_thread(
+                    asyncio.run, BrowserManager.start_browser_profile(env_id)
+                )
+                result["start_time"] = time.perf_counter() - started
+                break
+            except Exception as e:
+                result["error"] = str(e)
+                await asyncio.sleep(RETRY_DELAY * attempt)
+        else:
+            return result
+
+        try:
+            if attach_driver:
+                driver = await asyncio.to_thread(
+                    asyncio.run, BrowserManager.create_web_driver(debug_url, driver_path)
+                )
+                await asyncio.to_thread(driver.get, "about:blank")
+                await asyncio.to_thread(driver.quit)
+
+            closed = time.perf_counter()
+            await asyncio.to_thread(asyncio.run, BrowserManager.stop_browser_profile(env_id))
+            result["close_time"] = time.perf_counter() - closed
+            result["ok"] = True
+            result["error"] = None
+        except Exception as e:
+            result["error"] = str(e)
+    return result
+
+
+async def run_load_test(simulator: MoreLoginSimulator, concurrency: int, attach_driver: bool) -> List[Dict[str, Any]]:
+    """Запускает циклы для всех профилей симулятора."""
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [profile_cycle(env_id, semaphore, attach_driver) for env_id in simulator.profiles]
+    return await asyncio.gather(*tasks)
+
+
+def format_report(results: List[Dict[str, Any]], elapsed: float, simulator: MoreLoginSimulator) -> str:
+    """Формирует текстовый отчет нагрузочного теста."""
+    start_times = [r["start_time"] for r in results if r["start_time"] is not None]
+    close_times = [r["close_time"] for r in results if r["close_time"] is not None]
+    ok = sum(r["ok"] for r in results)
+    retries = sum(max(0, r["attempts"] - 1) for r in results)
+    lines = [
+        f"Профилей: {len(results)}, успешно: {ok}, с ошибкой: {len(results) - ok}, повторных запусков: {retries}",
+        f"Общее время: {elapsed:.2f} сек, пропускная способность: {len(results) / elapsed:.2f} профилей/сек",
+    ]
+    for name, values in (("start", start_times), ("close", close_times)):
+        if values:
+            lines.append(
+                f"{name:<6} p50={percentile(values, 50):.3f}s p95={percentile(values, 95):.3f}s "
+                f"max={max(values):.3f}s mean={statistics.mean(values):.3f}s"
+            )
+    lines.append(f"Статистика симулятора: {simulator.stats}")
+    errors = {r["error"] for r in results if r["error"]}
+    if errors:
+        lines.append(f"Ошибки: {sorted(errors)[:5]}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест BrowserManager против симулятора MoreLogin")
+    parser.add_argument("--profiles", type=int, default=50, help="Количество профилей")
+    parser.add_argument("--concurrency", type=int, default=50, help="Максимум одновременно запускаемых профилей")
+    parser.add_argument("--latency", type=parse_range, default=(0.0, 0.0), help="Задержка ответа API, сек: мин,макс")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Доля неудачных запусков профиля")
+    parser.add_argument("--http-error-rate", type=float, default=0.0, help="Доля ответов HTTP 500")
+    parser.add_argument("--no-browsers", action="store_true", help="Не запускать Chromium, только API")
+    parser.add_argument("--attach-driver", action="store_true", help="Подключать WebDriver к каждому профилю")
+    args = parser.parse_args()
+
+    simulator = MoreLoginSimulator(
+        profiles=args.profiles,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        http_error_rate=args.http_error_rate,
+        launch_browsers=not args.no_browsers,
+    ).start()
+    browser_manager.BASEURL = simulator.base_url
+
+    try:
+        started = time.perf_counter()
+        results = asyncio.run(run_load_test(simulator, args.concurrency, args.attach_driver and not args.no_browsers))
+        elapsed = time.perf_counter() - started
+        print(format_report(results, elapsed, simulator))
+    finally:
+        simulator.stop()
+        logger.debug(" (load_test_morelogin), Симулятор остановлен")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Локальный симулятор JSON-RPC узла Monad для проверки RpcBalanceProvider.
+
+Поддерживает одиночные и пакетные запросы eth_chainId, eth_blockNumber,
+eth_getBalance и eth_call для ERC-20 balanceOf/decimals/symbol, а также
+Multicall3 aggregate3/getEthBalance. Балансы хранятся в памяти и меняются
+через set_balance, чтобы имитировать свап.
+
+Запуск отдельным процессом:
+    python -m benchmarks.rpc_simulator --port 48545 --wallet 0x0F8009b1dE7fF721A66Eb36c64eA11b2b8847801
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import logger
+from networks import network_config
+from kuru.balance_provider import NATIVE_TOKEN, BALANCE_OF_SELECTOR, DECIMALS_SELECTOR, SYMBOL_SELECTOR
+from kuru.portfolio import MULTICALL3_ADDRESS, AGGREGATE3_SELECTOR, GET_ETH_BALANCE_SELECTOR
+
+
+def encode_string(value: str) -> str:
+    """Кодирует строку как ABI string (ответ symbol())."""
+    data = value.encode('utf-8')
+    padded = data.ljust((len(data) + 31) // 32 * 32, b'\x00')
+    return '0x' + (32).to_bytes(32, 'big').hex() + len(data).to_bytes(32, 'big').hex() + padded.hex()
+
+
+def decode_aggregate3_calls(calldata: str) -> List[Tuple[str, str]]:
+    """Разбирает входные данные aggregate3 в список (target, calldata hex)."""
+    data = bytes.fromhex(calldata[2 + len(AGGREGATE3_SELECTOR):])
+
+    def word(position: int) -> int:
+        return int.from_bytes(data[position:position + 32], 'big')
+
+    items_start = word(0) + 32
+    calls = []
+    for index in range(word(word(0))):
+        tuple_start = items_start + word(items_start + 32 * index)
+        target = '0x' + data[tuple_start + 12:tuple_start + 32].hex()
+        bytes_start = tuple_start + word(tuple_start + 64)
+        calls.append((target, '0x' + data[bytes_start + 32:bytes_start + 32 + word(bytes_start)].hex()))
+    return calls
+
+
+def encode_aggregate3_result(results: List[Tuple[bool, bytes]]) -> str:
+    """Кодирует ответ aggregate3: (bool success, bytes returnData)[]."""
+    heads, tails = [], []
+    offset = 32 * len(results)
+    for success, data in results:
+        padded = data.ljust((len(data) + 31) // 32 * 32, b'\x00')
+        tuple_hex = (int(success).to_bytes(32, 'big').hex() + (64).to_bytes(32, 'big').hex()
+                     + len(data).to_bytes(32, 'big').hex() + padded.hex())
+        heads.append(offset.to_bytes(32, 'big').hex())
+        tails.append(tuple_hex)
+        offset += len(tuple_hex) // 2
+    return ('0x' + (32).to_bytes(32, 'big').hex() + len(results).to_bytes(32, 'big').hex()
+            + ''.join(heads) + ''.join(tails))
+
+
+class RpcNodeSimulator:
+    """Симулятор RPC-узла: балансы MON и ERC-20 токенов в памяти."""
+
+    def __init__(self, tokens: Dict[str, Tuple[str, int]] = None, latency: float = 0.0):
+        """
+        Args:
+            tokens: {адрес токена: (symbol, decimals)}
+            latency: Искусственная задержка ответа в секундах
+        """
+        self.tokens = {address.lower(): meta for address, meta in (tokens or {}).items()}
+        self.latency = latency
+        self.balances: Dict[Tuple[str, str], int] = {}
+        self.block_number = 1
+        self.stats = {"http_requests": 0, "calls": 0}
+        self.lock = threading.Lock()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def rpc_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def set_balance(self, wallet_address: str, token: str, amount: int):
+        """Устанавливает баланс в минимальных единицах (wei) и увеличивает номер блока."""
+        with self.lock:
+            self.balances[(wallet_address.lower(), token.lower())] = amount
+            self.block_number += 1
+
+    def start(self, port: int = 0) -> "RpcNodeSimulator":
+        """Запускает HTTP-сервер в фоновом потоке (port=0 - любой свободный порт)."""
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"null")
+                except json.JSONDecodeError:
+                    payload = None
+                raw = json.dumps(simulator.handle(payload)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, format, *args):
+                logger.debug(f" (RpcNodeSimulator) {self.address_string()} {format % args}")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logger.info(f" (RpcNodeSimulator.start), Симулятор RPC-узла запущен: {self.rpc_url}")
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def handle(self, payload: Any) -> Any:
+        """Обрабатывает одиночный запрос или пакет запросов JSON-RPC."""
+        with self.lock:
+            self.stats["http_requests"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if isinstance(payload, list):
+            if not payload:
+                return {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Empty batch"}}
+            return [self.handle_call(call) for call in payload]
+        if isinstance(payload, dict):
+            return self.handle_call(payload)
+        return {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}
+
+    def handle_call(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            self.stats["calls"] += 1
+        answer = {"jsonrpc": "2.0", "id": call.get("id")}
+        method, params = call.get("method"), call.get("params") or []
+        try:
+            answer["result"] = self.dispatch(method, params)
+        except Exception as e:
+            answer["error"] = {"code": -32000, "message": str(e)}
+        return answer
+
+    def dispatch(self, method: str, params: list) -> str:
+        if method == "eth_chainId":
+            return hex(int(network_config['chain_id']))
+        if method == "eth_blockNumber":
+            return hex(self.block_number)
+        if method == "eth_getBalance":
+            return hex(self.balances.get((params[0].lower(), NATIVE_TOKEN), 0))
+        if method == "eth_call":
+            return self.eth_call(params[0]["to"].lower(), params[0].get("data", ""))
+        raise ValueError(f"Method {method} not supported")
+
+    def eth_call(self, to: str, data: str) -> str:
+        """Выполняет вызов контракта: ERC-20 токен или Multicall3."""
+        if to == MULTICALL3_ADDRESS.lower():
+            if data.startswith("0x" + GET_ETH_BALANCE_SELECTOR):
+                holder = "0x" + data[-40:]
+                return "0x" + self.balances.get((holder.lower(), NATIVE_TOKEN), 0).to_bytes(32, "big").hex()
+            if data.startswith("0x" + AGGREGATE3_SELECTOR):
+                results = []
+                for target, calldata in decode_aggregate3_calls(data):
+                    try:
+                        output = self.eth_call(target.lower(), calldata)
+                        results.append((True, bytes.fromhex(output[2:])))
+                    except ValueError:
+                        results.append((False, b""))
+                return encode_aggregate3_result(results)
+            raise ValueError("execution reverted")
+
+        if to not in self.tokens:
+            return "0x"  # Нет кода контракта по адресу
+        symbol, decimals = self.tokens[to]
+        if data.startswith(BALANCE_OF_SELECTOR):
+            holder = "0x" + data[len(BALANCE_OF_SELECTOR):][-40:]
+            return "0x" + self.balances.get((holder.lower(), to), 0).to_bytes(32, "big").hex()
+        if data.startswith(DECIMALS_SELECTOR):
+            return "0x" + decimals.to_bytes(32, "big").hex()
+        if data.startswith(SYMBOL_SELECTOR):
+            return encode_string(symbol)
+        raise ValueError("execution reverted")
+
+
+def main():
+    from kuru.tokens import toket_address_list
+
+    parser = argparse.ArgumentParser(description="Локальный симулятор JSON-RPC узла Monad")
+    parser.add_argument("--port", type=int, default=48545, help="Порт HTTP-сервера")
+    parser.add_argument("--wallet", help="Адрес кошелька, которому начислить тестовые балансы")
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа, сек")
+    args = parser.parse_args()
+
+    simulator = RpcNodeSimulator(
+        tokens={address: (f"TKN{index}", 18) for index, address in enumerate(toket_address_list, 1)},
+        latency=args.latency,
+    ).start(port=args.port)
+    if args.wallet:
+        simulator.set_balance(args.wallet, NATIVE_TOKEN, 12_500_000_000_000_000_000)
+        for address in toket_address_list:
+            simulator.set_balance(args.wallet, address, 1_000 * 10 ** 18)
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f" (RpcNodeSimulator), Статистика: {simulator.stats}")
+    except KeyboardInterrupt:
+        logger.info(" (RpcNodeSimulator), Остановка симулятора")
+    finally:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Офлайн-бенчмарк сценариев автоматизации без живых сайтов и MoreLogin.
+
+Поднимает локальный HTTP-сервер с копиями страниц faucet.morkie.xyz/monad,
+виджета свапа Kuru и экранов MetaMask (benchmarks/fixtures), локальный
+MoreLogin API (benchmarks/fake_morelogin.py) и прогоняет настоящий код
+MonadFaucet, KuruSwap и MetaMaskHelper в headless Chrome. Для каждого сценария
+выводится время выполнения и количество команд WebDriver.
+
+Запуск из корня проекта:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --flows faucet,kuru --repeat 5 --json bench_output.json
+
+Переменные окружения:
+    BENCH_CHROME_BINARY - путь к Chrome/Chromium (по умолчанию ищется в PATH)
+    BENCH_CHROMEDRIVER  - путь к chromedriver (по умолчанию ищется в PATH / Selenium Manager)
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Tuple
+
+import faucet_morkie.faucet_morkie as faucet_module
+import MoreLogin.browser_manager as browser_manager
+from benchmarks.fake_morelogin import MoreLoginSimulator
+from config import logger
+from faucet_morkie.faucet_morkie import MonadFaucet
+from kuru.kuru import KuruSwap, toket_address_list
+from meta_mask import MetaMaskHelper
+from MoreLogin.browser_manager import BrowserManager
+from utils import random_number_for_sell
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# Данные тестового кошелька (короткий адрес 0x0F80...7801 зашит в фикстуры)
+BENCH_WALLET = "0x0F8009b1dE7fF721A66Eb36c64eA11b2b8847801"
+BENCH_PASSWORD = "bench-password"
+BENCH_SEED = " ".join(["test"] * 11 + ["junk"])
+
+
+class CommandCounter:
+    """Подсчитывает команды WebDriver, отправленные через driver.execute()."""
+
+    def __init__(self, driver):
+        self.counts = Counter()
+        original_execute = driver.execute
+
+        def execute(driver_command, params=None):
+            self.counts[driver_command] += 1
+            return original_execute(driver_command, params)
+
+        # WebElement отправляет команды через parent.execute, поэтому достаточно подменить метод драйвера
+        driver.execute = execute
+
+    def reset(self):
+        self.counts.clear()
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+def start_fixture_server() -> ThreadingHTTPServer:
+    """Запускает HTTP-сервер со статическими фикстурами в фоновом потоке."""
+
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            logger.debug(f" (fixture_server) {format % args}")
+
+    handler = partial(QuietHandler, directory=str(FIXTURES_DIR))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def flow_faucet(driver, base_url: str) -> Tuple[bool, str]:
+    """Полный клейм в кране: MonadFaucet.process."""
+    faucet_module.FAUCET_URL = f"{base_url}/faucet/monad.html?result=success&delay=1500"
+    result = MonadFaucet.process(driver, BENCH_WALLET)
+    return result.get("status") == "success", result.get("status", "unknown")
+
+
+def flow_kuru(driver, base_url: str) -> Tuple[bool, str]:
+    """Открытие свапа Kuru, проверка кошелька, чтение балансов и ввод суммы."""
+    KuruSwap.SWAP_URL = f"{base_url}/kuru/swap.html"
+    kuru_swap = KuruSwap(driver)
+    if not kuru_swap.open_website(to_token=toket_address_list[0]):
+        return False, "open_website"
+    if not kuru_swap.connect_wallet(BENCH_WALLET):
+        return False, "connect_wallet"
+    token_info = kuru_swap.get_token_info()
+    if not token_info:
+        return False, "get_token_info"
+    quantity_for_sale = random_number_for_sell(
+        token_info["selling_token"]["symbol"], token_info["selling_token"]["number_tokens"]
+    )
+    quantity_will_purchase = kuru_swap.input_number_for_sell(quantity_for_sale)
+    return bool(quantity_will_purchase), f"{quantity_for_sale} -> {quantity_will_purchase}"
+
+
+def flow_metamask_unlock(driver, base_url: str) -> Tuple[bool, str]:
+    """Разблокировка MetaMask: MetaMaskHelper.starting_metamask на заблокированном кошельке."""
+    mm = MetaMaskHelper(driver)
+    mm.base_url = f"{base_url}/metamask/home.html?locked=1#"
+    ok = mm.starting_metamask(BENCH_SEED, BENCH_PASSWORD)
+    return ok, "unlocked" if ok else "locked"
+
+
+def flow_metamask_ready(driver, base_url: str) -> Tuple[bool, str]:
+    """MetaMaskHelper.starting_metamask, когда кошелек уже разблокирован (профиль из пула)."""
+    mm = MetaMaskHelper(driver)
+    mm.base_url = f"{base_url}/metamask/home.html#"
+    ok = mm.starting_metamask(BENCH_SEED, BENCH_PASSWORD)
+    return ok, "ready" if ok else "not ready"
+
+
+def flow_metamask_fill_seed(driver, base_url: str) -> Tuple[bool, str]:
+    """Ввод сид-фразы при импорте кошелька: MetaMaskHelper.fill_seed."""
+    mm = MetaMaskHelper(driver)
+    driver.get(f"{base_url}/metamask/home.html#import-srp")
+    ok = mm.fill_seed(BENCH_SEED)
+    confirm_enabled = driver.execute_script(
+        "return !document.querySelector('[data-testid=\"import-srp-confirm\"]').disabled;")
+    return ok and confirm_enabled, "filled" if ok and confirm_enabled else "not filled"
+
+
+def flow_metamask_network(driver, base_url: str) -> Tuple[bool, str]:
+    """Проверка сети, когда Monad Testnet уже активна."""
+    mm = MetaMaskHelper(driver)
+    driver.get(f"{base_url}/metamask/home.html#")
+    ok = mm.network_manager.ensure_monad_testnet_active("Monad")
+    return ok, "active" if ok else "not active"
+
+
+def flow_metamask_network_switch(driver, base_url: str) -> Tuple[bool, str]:
+    """Переключение на Monad Testnet из списка сетей."""
+    mm = MetaMaskHelper(driver)
+    driver.get(f"{base_url}/metamask/home.html?network=Ethereum%20Mainnet#")
+    ok = mm.network_manager.ensure_monad_testnet_active("Monad")
+    return ok, "switched" if ok else "not switched"
+
+
+FLOWS: Dict[str, Callable[[Any, str], Tuple[bool, str]]] = {
+    "faucet": flow_faucet,
+    "kuru": flow_kuru,
+    "metamask_unlock": flow_metamask_unlock,
+    "metamask_ready": flow_metamask_ready,
+    "metamask_fill_seed": flow_metamask_fill_seed,
+    "metamask_network": flow_metamask_network,
+    "metamask_network_switch": flow_metamask_network_switch,
+}
+
+
+def run_benchmarks(flows: List[str], repeat: int, implicit_wait: float) -> Dict[str, List[Dict[str, Any]]]:
+    """Прогоняет выбранные сценарии и возвращает замеры по каждому запуску."""
+    fixture_server = start_fixture_server()
+    base_url = f"http://127.0.0.1:{fixture_server.server_address[1]}"
+    simulator = MoreLoginSimulator(profiles=1).start()
+    browser_manager.BASEURL = simulator.base_url
+
+    driver = None
+    env_id = None
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    try:
+        env_id, _, _ = asyncio.run(BrowserManager.get_list_browser_profiles(1))
+        debug_url, driver_path = asyncio.run(BrowserManager.start_browser_profile(env_id))
+        driver = asyncio.run(BrowserManager.create_web_driver(debug_url, driver_path))
+        driver.implicitly_wait(implicit_wait)
+        counter = CommandCounter(driver)
+
+        for name in flows:
+            for run in range(1, repeat + 1):
+                counter.reset()
+                start = time.perf_counter()
+                try:
+                    ok, detail = FLOWS[name](driver, base_url)
+                except Exception as e:
+                    ok, detail = False, f"{type(e).__name__}: {e}"
+                elapsed = time.perf_counter() - start
+                results.setdefault(name, []).append({
+                    "run": run,
+                    "ok": ok,
+                    "detail": detail,
+                    "wall_time": round(elapsed, 3),
+                    "commands": counter.total,
+                    "command_counts": dict(counter.counts.most_common()),
+                })
+                logger.info(f" (run_benchmarks), {name} #{run}: {elapsed:.2f} сек, "
+                            f"команд WebDriver: {counter.total}, результат: {detail}")
+    finally:
+        if driver:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning(f" (run_benchmarks), Ошибка закрытия драйвера: {e}")
+        if env_id:
+            asyncio.run(BrowserManager.stop_browser_profile(env_id))
+        simulator.stop()
+        fixture_server.shutdown()
+        fixture_server.server_close()
+
+    return results
+
+
+def format_report(results: Dict[str, List[Dict[str, Any]]]) -> str:
+    """Формирует текстовую таблицу по результатам бенчмарка."""
+    lines = [
+        f"{'Сценарий':<26}{'OK':>6}{'Среднее, с':>12}{'Мин, с':>10}{'Макс, с':>10}{'Команд':>9}  Топ команд",
+        "-" * 110,
+    ]
+    for name, runs in results.items():
+        times = [r["wall_time"] for r in runs]
+        commands = Counter()
+        for r in runs:
+            commands.update(r["command_counts"])
+        top = ", ".join(f"{cmd}={count // len(runs)}" for cmd, count in commands.most_common(3))
+        lines.append(
+            f"{name:<26}{sum(r['ok'] for r in runs):>3}/{len(runs):<2}"
+            f"{statistics.mean(times):>12.2f}{min(times):>10.2f}{max(times):>10.2f}"
+            f"{statistics.mean(r['commands'] for r in runs):>9.0f}  {top}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарк сценариев faucet, Kuru и MetaMask")
+    parser.add_argument("--flows", default=",".join(FLOWS),
+                        help=f"Сценарии через запятую (по умолчанию все): {', '.join(FLOWS)}")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество запусков каждого сценария")
+    parser.add_argument("--implicit-wait", type=float, default=10,
+                        help="Неявное ожидание драйвера в секундах (как в main_flow)")
+    parser.add_argument("--json", dest="json_path", help="Сохранить подробные результаты в JSON-файл")
+    args = parser.parse_args()
+
+    flows = [name.strip() for name in args.flows.split(",") if name.strip()]
+    if unknown := [name for name in flows if name not in FLOWS]:
+        parser.error(f"Неизвестные сценарии: {unknown}")
+
+    results = run_benchmarks(flows, args.repeat, args.implicit_wait)
+    print(format_report(results))
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        logger.info(f" (run_benchmarks), Результаты сохранены: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,23 @@
+import json
+import logging
 import random
-import sys
+import threading
 import traceback
 import yaml
 import os
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Any, Optional, Tuple
 from environs import Env
 from logger_setup import setup_logging
 
 
 CONFIG_YAML = "config.yaml"  # Название файла конфигурации, в корне проекта
 CONFIG_YAML_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), CONFIG_YAML)
+# Разобранный config.yaml в JSON: при неизменном файле (mtime и размер) YAML не разбирается повторно
+CONFIG_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".config_cache.json")
+BALANCE_SOURCES = ("rpc", "dom")
 
 
 def convert_windows_path_to_unix(path: str) -> str:
@@ -41,13 +49,290 @@ def load_yaml_config(config_path: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-# Загружаем конфигурацию из YAML
-config_data = load_yaml_config(CONFIG_YAML_PATH)
+def load_yaml_config_cached(config_path: str = CONFIG_YAML_PATH,
+                            cache_path: str = CONFIG_CACHE_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Загружает config.yaml через JSON-кэш.
+
+    Кэш действителен, пока у config.yaml те же mtime и размер; иначе YAML разбирается
+    заново и кэш перезаписывается. Ошибки кэша не мешают загрузке.
+    """
+    try:
+        stat = os.stat(config_path)
+    except OSError:
+        return load_yaml_config(config_path)
+    key = [stat.st_mtime_ns, stat.st_size]
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file_cache:
+            cached = json.load(file_cache)
+        if cached.get("key") == key:
+            return cached["data"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass  # Кэша нет или он поврежден
+
+    data = load_yaml_config(config_path)
+    if data is not None:
+        try:
+            with open(cache_path, "w", encoding="utf-8") as file_cache:
+                json.dump({"key": key, "data": data}, file_cache, ensure_ascii=False)
+        except (OSError, TypeError, ValueError):
+            pass  # Кэш необязателен (например, нет прав на запись или значения не сериализуются в JSON)
+    return data
+
+
+class SettingsError(ValueError):
+    """Ошибка проверки настроек config.yaml"""
+    pass
+
+
+def _section(data: Dict[str, Any], name: str) -> Dict[str, Any]:
+    section = data.get(name) or {}
+    if not isinstance(section, dict):
+        raise SettingsError(f"{name}: ожидается раздел с настройками, получено {section!r}")
+    return section
+
+
+def _flag(section: Dict[str, Any], key: str, default: bool) -> bool:
+    value = section.get(key, default)
+    if not isinstance(value, bool):
+        raise SettingsError(f"{key}: ожидается true/false, получено {value!r}")
+    return value
+
+
+def _number(section: Dict[str, Any], key: str, default, minimum: float = 0):
+    value = section.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < minimum:
+        raise SettingsError(f"{key}: ожидается число не меньше {minimum}, получено {value!r}")
+    return value
+
+
+def _range(section: Dict[str, Any], min_key: str, max_key: str, min_default, max_default, minimum: float = 0):
+    low, high = _number(section, min_key, min_default, minimum), _number(section, max_key, max_default, minimum)
+    if low > high:
+        raise SettingsError(f"{min_key} ({low}) больше {max_key} ({high})")
+    return low, high
+
+
+def _names(value, key: str) -> Tuple[str, ...]:
+    """Список имен из YAML-списка или строки через запятую."""
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, (list, tuple)):
+        raise SettingsError(f"{key}: ожидается список или строка через запятую, получено {value!r}")
+    return tuple(str(name).strip() for name in value if str(name).strip())
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """
+    Проверенные настройки config.yaml.
+
+    Создается один раз на версию файла (get_settings), паузы сразу переведены в timedelta,
+    суммы - в Decimal, списки активностей разобраны.
+    """
+    log_level: str
+    # GLOBAL_SETTINGS
+    auto_mode: bool
+    mode_close_profile: bool
+    mix_profiles: bool
+    profile_delay_enabled: bool
+    profile_delay_min: float
+    profile_delay_max: float
+    min_interval_minutes: int
+    max_interval_minutes: int
+    max_records_per_profile: int
+    daemon_enabled: bool
+    daemon_max_concurrent_profiles: int
+    daemon_jitter_seconds: float
+    daemon_retry: timedelta
+    daemon_rescan: timedelta
+    warm_pool_enabled: bool
+    warm_pool_max_sessions: int
+    warm_pool_memory_budget_mb: float
+    warm_pool_profile_base_mb: float
+    warm_pool_max_idle: timedelta
+    network_check_ttl: timedelta
+    network_via_provider: bool
+    network_helper_port: int
+    # ACTIVITY_SETTINGS
+    auto_process_unexpected_status: bool
+    success_wait_time: timedelta
+    default_activities: Tuple[str, ...]
+    parallel_activities: bool
+    activity_plugins: Tuple[str, ...]
+    # KURU_ACTIVITY_SETTINGS
+    min_percent_mon: int
+    max_percent_mon: int
+    min_percent_token: int
+    max_percent_token: int
+    min_wait_between_swap: timedelta
+    max_wait_between_swap: timedelta
+    kuru_balance_source: str
+    min_mon_balance_for_swap: Decimal
+    balance_cache_ttl: timedelta
+
+    @classmethod
+    def from_yaml_data(cls, data: Dict[str, Any]) -> "Settings":
+        """Проверяет разобранный config.yaml; при ошибке - SettingsError с именем параметра."""
+        if not isinstance(data, dict):
+            raise SettingsError("config.yaml пуст или не является словарем настроек")
+        global_settings = _section(data, "GLOBAL_SETTINGS")
+        profile_delay = _section(global_settings, "PROFILE_DELAY")
+        daemon = _section(global_settings, "DAEMON")
+        warm_pool = _section(global_settings, "WARM_POOL")
+        network = _section(global_settings, "NETWORK")
+        activity = _section(data, "ACTIVITY_SETTINGS")
+        success_wait = _section(activity, "SUCCESS_WAIT_TIME") or {"HOURS": 24, "MINUTES": 3}
+        kuru = _section(data, "KURU_ACTIVITY_SETTINGS")
+
+        log_level = str(data.get("LOG_LEVEL", "DEBUG")).upper()
+        min_interval, max_interval = _range(global_settings, "MIN_INTERVAL_MINUTES", "MAX_INTERVAL_MINUTES", 60, 150)
+        delay_min, delay_max = _range(profile_delay, "MIN", "MAX", 10, 60)
+        min_percent_mon, max_percent_mon = _range(kuru, "MIN_PERCENT_MON", "MAX_PERCENT_MON", 5, 20)
+        min_percent_token, max_percent_token = _range(kuru, "MIN_PERCENT_TOKEN", "MAX_PERCENT_TOKEN", 95, 98)
+        min_swap_wait, max_swap_wait = _range(kuru, "MIN_WAIT_TIME_BETWEEN_SWAP", "MAX_WAIT_TIME_BETWEEN_SWAP", 240, 360)
+        if max_percent_mon > 100 or max_percent_token > 100:
+            raise SettingsError("Процент свапа не может быть больше 100")
+
+        balance_source = kuru.get("BALANCE_SOURCE", "rpc")
+        if balance_source not in BALANCE_SOURCES:
+            raise SettingsError(f"BALANCE_SOURCE: ожидается одно из {BALANCE_SOURCES}, получено {balance_source!r}")
+        try:
+            min_mon_balance = Decimal(str(kuru.get("MIN_MON_BALANCE_FOR_SWAP", 0.2)))
+        except InvalidOperation:
+            raise SettingsError(f"MIN_MON_BALANCE_FOR_SWAP: ожидается число, "
+                                f"получено {kuru.get('MIN_MON_BALANCE_FOR_SWAP')!r}")
+
+        return cls(
+            log_level=log_level,
+            auto_mode=_flag(global_settings, "AUTO_MODE", False),
+            mode_close_profile=_flag(global_settings, "MODE_CLOSE_PROFILE", True),
+            mix_profiles=_flag(global_settings, "MIX_PROFILES", True),
+            profile_delay_enabled=_flag(profile_delay, "ENABLED", False),
+            profile_delay_min=delay_min,
+            profile_delay_max=delay_max,
+            min_interval_minutes=min_interval,
+            max_interval_minutes=max_interval,
+            max_records_per_profile=_number(activity, "MAX_RECORDS_PER_PROFILE",
+                                            global_settings.get("MAX_RECORDS_PER_PROFILE", 35), 1),
+            daemon_enabled=_flag(daemon, "ENABLED", False),
+            daemon_max_concurrent_profiles=_number(daemon, "MAX_CONCURRENT_PROFILES", 1, 1),
+            daemon_jitter_seconds=_number(daemon, "JITTER_SECONDS", 600),
+            daemon_retry=timedelta(minutes=_number(daemon, "RETRY_MINUTES", 30)),
+            daemon_rescan=timedelta(minutes=_number(daemon, "RESCAN_MINUTES", 10)),
+            warm_pool_enabled=_flag(warm_pool, "ENABLED", False),
+            warm_pool_max_sessions=_number(warm_pool, "MAX_SESSIONS", 3, 1),
+            warm_pool_memory_budget_mb=_number(warm_pool, "MEMORY_BUDGET_MB", 4096),
+            warm_pool_profile_base_mb=_number(warm_pool, "PROFILE_BASE_MB", 400),
+            warm_pool_max_idle=timedelta(minutes=_number(warm_pool, "MAX_IDLE_MINUTES", 30)),
+            network_check_ttl=timedelta(hours=_number(network, "CHECK_TTL_HOURS", 24)),
+            network_via_provider=_flag(network, "VIA_PROVIDER", True),
+            network_helper_port=int(_number(network, "HELPER_PORT", 8765)),
+            auto_process_unexpected_status=_flag(activity, "AUTO_PROCESS_UNEXPECTED_STATUS", True),
+            success_wait_time=timedelta(hours=_number(success_wait, "HOURS", 24),
+                                        minutes=_number(success_wait, "MINUTES", 0)),
+            default_activities=_names(activity.get("DEFAULT_ACTIVITIES", ""), "DEFAULT_ACTIVITIES"),
+            parallel_activities=_flag(activity, "PARALLEL_ACTIVITIES", True),
+            activity_plugins=_names(activity.get("ACTIVITY_PLUGINS") or [], "ACTIVITY_PLUGINS"),
+            min_percent_mon=min_percent_mon,
+            max_percent_mon=max_percent_mon,
+            min_percent_token=min_percent_token,
+            max_percent_token=max_percent_token,
+            min_wait_between_swap=timedelta(minutes=min_swap_wait),
+            max_wait_between_swap=timedelta(minutes=max_swap_wait),
+            kuru_balance_source=balance_source,
+            min_mon_balance_for_swap=min_mon_balance,
+            balance_cache_ttl=timedelta(minutes=_number(kuru, "BALANCE_CACHE_TTL_MINUTES", 30)),
+        )
+
+    def random_swap_wait(self) -> timedelta:
+        """Случайная пауза после свапа (целые минуты) в пределах MIN/MAX_WAIT_TIME_BETWEEN_SWAP."""
+        low = int(self.min_wait_between_swap.total_seconds() // 60)
+        high = int(self.max_wait_between_swap.total_seconds() // 60)
+        return timedelta(minutes=random.randint(low, high))
+
+
+_settings: Optional[Settings] = None
+_settings_key: Optional[Tuple[int, int]] = None
 
-# Настройки логирования
-LOG_LEVEL = config_data.get("LOG_LEVEL", "DEBUG") if config_data else "DEBUG"
-logger = setup_logging(log_level=LOG_LEVEL)
-logger.info(f"LOG_LEVEL: {LOG_LEVEL}")
+
+def get_settings() -> Settings:
+    """
+    Текущие настройки с перезагрузкой при изменении config.yaml.
+
+    Проверка изменения - один os.stat; файл перечитывается (через JSON-кэш) только при
+    новых mtime/размере. Если измененный файл не проходит проверку, остаются прежние
+    настройки, а ошибка пишется в лог.
+    """
+    global _settings, _settings_key
+    try:
+        stat = os.stat(CONFIG_YAML_PATH)
+        key = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        key = None
+    if _settings is not None and (key is None or key == _settings_key):
+        return _settings
+
+    try:
+        settings = Settings.from_yaml_data(load_yaml_config_cached())
+    except SettingsError as e:
+        if _settings is None:
+            raise
+        logger.error(f" (get_settings), Изменения config.yaml не применены, используются прежние настройки: {e}")
+        _settings_key = key  # Не перечитываем файл до следующего изменения
+        return _settings
+
+    if _settings is not None:
+        logger.info(" (get_settings), config.yaml изменен, настройки перезагружены")
+    _settings, _settings_key = settings, key
+    return settings
+
+
+class ConfigError(RuntimeError):
+    """Нет .env или config.yaml либо в них ошибка"""
+    pass
+
+
+# Логгер без обработчиков: импорт config не открывает app.log и не запускает поток QueueListener.
+# Вывод подключает init_logging() - явно из точки входа или при первой записи в лог.
+logger = logging.getLogger('main.py')
+_logging_lock = threading.Lock()
+
+
+class _InitLoggingOnFirstRecord(logging.Handler):
+    """Вызывает init_logging() при первой записи в лог и передает запись настроенным обработчикам."""
+
+    def emit(self, record: logging.LogRecord):
+        init_logging()
+        logger.handle(record)
+
+
+_init_logging_handler = _InitLoggingOnFirstRecord()
+logger.addHandler(_init_logging_handler)
+logger.setLevel(logging.DEBUG)  # Уровень по config.yaml установит setup_logging
+
+
+def init_logging() -> logging.Logger:
+    """
+    Настраивает вывод логов по config.yaml (консоль, app.log, поток QueueListener).
+
+    Повторные вызовы ничего не делают.
+    """
+    with _logging_lock:
+        if _init_logging_handler not in logger.handlers:
+            return logger
+        logger.removeHandler(_init_logging_handler)
+        data = load_yaml_config_cached(CONFIG_YAML_PATH) or {}
+        log_level = data.get("LOG_LEVEL", "DEBUG")
+        setup_logging(log_level=log_level,
+                      file_level=data.get("LOG_FILE_LEVEL", "DEBUG"),  # Уровень app.log
+                      json_lines=bool(data.get("LOG_JSON", False)),  # Дополнительно app.jsonl
+                      max_bytes=int(data.get("LOG_MAX_MB", 10) * 1024 * 1024),
+                      backup_count=int(data.get("LOG_BACKUP_COUNT", 5)),
+                      per_profile=bool(data.get("LOG_PER_PROFILE", False)),  # logs/profiles/profile_<N>.log
+                      run_events=bool(data.get("LOG_RUN_EVENTS", True)))  # logs/runs/<дата>/<run_id>.jsonl
+    logger.info(f"LOG_LEVEL: {log_level}")
+    return logger
 
 
 class Config:
@@ -63,9 +348,8 @@ class Config:
         env = Env()
         env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
         if not os.path.exists(env_path):
-            logger.error("Файл .env не найден. Проверьте, что он существует в корне проекта.")
-            sys.exit(1)
-        env.read_env()
+            raise ConfigError("Файл .env не найден. Проверьте, что он существует в корне проекта.")
+        env.read_env(env_path)
         return env
 
     def _load_env_variables(self):
@@ -85,77 +369,93 @@ class Config:
         # self.db_password = self.env.str("DB_PASSWORD")
         # self.db_user = self.env.str("DB_USER")
         self.db_name = self.env.str("DB_NAME")
+        self.db_file = f"{self.db_name}.sqlite3"  # Для SQLite Database и PostgreSQL
 
     def _load_yaml_settings(self):
         """Загружает настройки из YAML файла."""
+        config_data = load_yaml_config_cached(CONFIG_YAML_PATH)
         if not config_data:
-            logger.error("Не удалось загрузить настройки из config.yaml. Проверьте, что он существует в корне проекта.")
-            sys.exit(1)
+            raise ConfigError("Не удалось загрузить настройки из config.yaml. "
+                              "Проверьте, что он существует в корне проекта.")
+        try:
+            self.settings = get_settings()
+        except SettingsError as e:
+            raise ConfigError(f"Ошибка в config.yaml: {e}") from e
 
-        # Глобальные настройки
+        # Исходные разделы YAML (для кода, читающего произвольные ключи)
         self.global_settings = config_data.get("GLOBAL_SETTINGS", {})
-        self.mode_close_profile = self.global_settings.get("MODE_CLOSE_PROFILE", True)
-        self.mix_profiles = self.global_settings.get("MIX_PROFILES", True)
-        self.profile_delay = self.global_settings.get("PROFILE_DELAY")
-        self.auto_mode = self.global_settings.get("AUTO_MODE", False)
-        self.min_interval_minutes = self.global_settings.get("MIN_INTERVAL_MINUTES", 60)  # Минимальный интервал между запусками (в минутах)
-        self.max_interval_minutes = self.global_settings.get("MAX_INTERVAL_MINUTES", 150)  # Минимальный интервал между запусками (в минутах)
-
-        # Настройки активности
         self.activity_settings = config_data.get("ACTIVITY_SETTINGS", {})
-        self.auto_process_unexpected_status = self.activity_settings.get("AUTO_PROCESS_UNEXPECTED_STATUS", True)
-        self.success_wait_time = self.activity_settings.get("SUCCESS_WAIT_TIME", {"HOURS": 24, "MINUTES": 3})
-        self.max_records_per_profile = self.activity_settings.get("MAX_RECORDS_PER_PROFILE", 35)
+        self.kuru_activity_settings = config_data.get("KURU_ACTIVITY_SETTINGS", {})
 
         # Экспортируем настройки активности
         self.ACTIVITY_SETTINGS = self.activity_settings
 
-        # Настройки обработки активностей Kuru
-        self.kuru_activity_settings = config_data.get("KURU_ACTIVITY_SETTINGS", {})
+
+_config: Optional[Config] = None
+
+
+def get_config() -> Config:
+    """Конфигурация из .env и config.yaml; читается при первом обращении, без .env - ConfigError."""
+    global _config
+    if _config is None:
+        _config = Config()
+    return _config
+
+
+# Значения из .env: читаются при первом обращении (from config import APP_ID), а не при импорте config
+_ENV_VALUES = {
+    "config": lambda config: config,
+    "BASEURL": lambda config: config.baseurl,  # Используем порт из .env файла
+    "SECRET_KEY": lambda config: config.secret_key,
+    "APP_ID": lambda config: config.app_id,
+    "APP_KEY": lambda config: config.app_key,
+    "DATA_BASE_PATH": lambda config: config.file_path,
+    "WORKSHEET_NAME": lambda config: config.worksheet_name,
+    # Настройки базы данных
+    "DB_NAME": lambda config: config.db_file,
+    "GLOBAL_SETTINGS": lambda config: config.global_settings,  # Глобальные настройки скрипта
+    "ACTIVITY_SETTINGS": lambda config: config.activity_settings,  # Настройки обработки активностей MonadFaucet
+}
+
+# Настройки из YAML (значения при первом обращении; для изменений config.yaml на лету используйте get_settings())
+_SETTINGS_VALUES = {
+    "settings": lambda settings: settings,
+    "MODE_CLOSE_PROFILE": lambda settings: settings.mode_close_profile,  # Закрывать профиль после выполнения
+    "MIX_PROFILES": lambda settings: settings.mix_profiles,  # Перемешивать профили при обработке нескольких
+    "PROFILE_DELAY": lambda settings: {'ENABLED': settings.profile_delay_enabled, 'MIN': settings.profile_delay_min,
+                                       'MAX': settings.profile_delay_max},  # Задержка между профилями
+    "AUTO_MODE": lambda settings: settings.auto_mode,  # Автоматический запуск скрипта
+    "MIN_INTERVAL_MINUTES": lambda settings: settings.min_interval_minutes,  # Минимальный интервал между запусками
+    "MAX_INTERVAL_MINUTES": lambda settings: settings.max_interval_minutes,  # Максимальный интервал между запусками
+    # Постоянный режим: один процесс запускает профили по мере наступления их времени (без Task Scheduler)
+    "DAEMON_MODE": lambda settings: settings.daemon_enabled,
+    # Настройки обработки активностей MonadFaucet
+    "AUTO_PROCESS_UNEXPECTED_STATUS": lambda settings: settings.auto_process_unexpected_status,
+    "SUCCESS_WAIT_TIME": lambda settings: settings.success_wait_time,  # timedelta
+    "MAX_RECORDS_PER_PROFILE": lambda settings: settings.max_records_per_profile,
+    "PARALLEL_ACTIVITIES": lambda settings: settings.parallel_activities,  # Активности в отдельных вкладках
+    "DEFAULT_ACTIVITIES": lambda settings: list(settings.default_activities),
+    # Настройки обработки активностей Kuru
+    "MIN_PERCENT_MON": lambda settings: settings.min_percent_mon,
+    "MAX_PERCENT_MON": lambda settings: settings.max_percent_mon,
+    "MIN_PERCENT_TOKEN": lambda settings: settings.min_percent_token,
+    "MAX_PERCENT_TOKEN": lambda settings: settings.max_percent_token,
+    "KURU_BALANCE_SOURCE": lambda settings: settings.kuru_balance_source,  # rpc - из блокчейна, dom - со страницы
+    # Минимальный баланс MON для свапа (проверяется по таблице balances до запуска браузера)
+    "MIN_MON_BALANCE_FOR_SWAP": lambda settings: settings.min_mon_balance_for_swap,
+}
 
 
-# Создаем экземпляр конфигурации
-config = Config()
-
-# Экспортируем все необходимые переменные
-BASEURL = config.baseurl  # Используем порт из .env файла
-SECRET_KEY = config.secret_key
-APP_ID = config.app_id
-APP_KEY = config.app_key
-DATA_BASE_PATH = config.file_path
-WORKSHEET_NAME = config.worksheet_name
-
-# Настройки базы данных
-DB_NAME = f"{config.db_name}.sqlite3"  # Для SQLite Database и PostgreSQL
-# DB_USER = config.db_user  # Для PostgreSQL
-# DB_PASSWORD = config.db_password  # Для PostgreSQL
-# DB_HOST = config.db_host  # Для PostgreSQL
-# DB_PORT = config.db_port  # Для PostgreSQL
-
-# Настройки из YAML
-GLOBAL_SETTINGS = config.global_settings # Глобальные настройки скрипта
-ACTIVITY_SETTINGS = config.activity_settings # Настройки обработки активностей MonadFaucet
-MODE_CLOSE_PROFILE = config.mode_close_profile  # Закрывать профиль после выполнения: TRUE/FALSE
-MIX_PROFILES = config.mix_profiles  # Перемешивать профили при обработке нескольких: TRUE/FALSE
-PROFILE_DELAY = config.profile_delay   # Задержка между профилями
-AUTO_MODE = config.auto_mode  # Автоматический запуск скрипта: TRUE/FALSE
-MIN_INTERVAL_MINUTES = config.min_interval_minutes   # Минимальный интервал между запусками main.py (в минутах)
-MAX_INTERVAL_MINUTES = config.max_interval_minutes  # Максимальный интервал между запусками (в минутах)
-
-# Настройки обработки активностей MonadFaucet
-AUTO_PROCESS_UNEXPECTED_STATUS = config.auto_process_unexpected_status
-SUCCESS_WAIT_TIME = config.success_wait_time
-MAX_RECORDS_PER_PROFILE = config.max_records_per_profile
-
-# Получаем значение из конфигурации и преобразуем в список
-# logger.debug(f"Activity settings from config: {config.activity_settings}")
-DEFAULT_ACTIVITIES = [activity.strip() for activity in config.activity_settings.get("DEFAULT_ACTIVITIES", "").split(",") if activity.strip()]
-logger.debug(f"Processed DEFAULT_ACTIVITIES: {DEFAULT_ACTIVITIES}")
-
-# Настройки обработки активностей Kuru
-MIN_PERCENT_MON = config.kuru_activity_settings.get("MIN_PERCENT_MON")
-MAX_PERCENT_MON = config.kuru_activity_settings.get("MAX_PERCENT_MON")
-MIN_PERCENT_TOKEN = config.kuru_activity_settings.get("MIN_PERCENT_TOKEN")
-MAX_PERCENT_TOKEN = config.kuru_activity_settings.get("MAX_PERCENT_TOKEN")
-MIN_WAIT_TIME_BETWEEN_SWAP = config.kuru_activity_settings.get("MIN_WAIT_TIME_BETWEEN_SWAP")
-MAX_WAIT_TIME_BETWEEN_SWAP = config.kuru_activity_settings.get("MAX_WAIT_TIME_BETWEEN_SWAP")
+def __getattr__(name: str):
+    """Экспортируемые значения .env и config.yaml вычисляются при первом обращении и запоминаются."""
+    if name in _ENV_VALUES:
+        value = _ENV_VALUES[name](get_config())
+    elif name in _SETTINGS_VALUES:
+        try:
+            value = _SETTINGS_VALUES[name](get_settings())
+        except SettingsError as e:
+            raise ConfigError(f"Ошибка в config.yaml: {e}") from e
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
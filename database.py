@@ -1,21 +1,21 @@
+import logging
 import sqlite3
 import sys
 from datetime import datetime, timedelta
 import json
 from pprint import pprint
-from typing import Optional, List, Dict, TypedDict, Any, Tuple, Union
+from typing import Optional, List, Dict, TypedDict, Any, Sequence, Tuple, Union
 from contextlib import contextmanager
-from config import DB_NAME, logger, config, DEFAULT_ACTIVITIES, MIN_WAIT_TIME_BETWEEN_SWAP, MAX_WAIT_TIME_BETWEEN_SWAP
-from onchaingm.onchaingm import Onchaingm
-from faucet_morkie.faucet_morkie import MonadFaucet
+from decimal import Decimal
+from config import get_config, logger, get_settings
+from logger_setup import bind_log_context
 import random
 import os
 
-from kuru import kuru
-from utils import convert_minutes_to_time
+from kuru.balance_provider import NATIVE_TOKEN, RpcBalanceProvider, BalanceProviderError
+from activity_executor import TabActivityExecutor
+from activity_registry import balance_is_enough, load_activity_plugins, get_activity, order_for_session, session_score
 
-logger.debug(f"Путь к БД активностей: {os.path.abspath(DB_NAME)}")
-logger.debug(f"Доступ на запись БД активностей: {os.access(DB_NAME, os.W_OK)}")
 
 class ActivityRecord(TypedDict):
     row: int
@@ -33,8 +33,9 @@ class DatabaseError(Exception):
 
 
 class SQLiteDatabase:
-    def __init__(self, db_path: str = DB_NAME):
-        self.db_path = db_path
+    def __init__(self, db_path: Optional[str] = None, balance_provider: RpcBalanceProvider = None):
+        self.db_path = db_path or get_config().db_file  # По умолчанию DB_NAME из .env
+        self.balance_provider = balance_provider  # Создается при первом обновлении балансов
         try:
             self._initialize_db()
         except Exception as e:
@@ -57,7 +58,11 @@ class SQLiteDatabase:
                     self._create_tables(conn)
                     logger.update(f"База данных '{self.db_path}' успешно инициализирована")
                 else:
-                    logger.debug(f"База данных '{self.db_path}' уже инициализирована")
+                    logger.debug("База данных '%s' уже инициализирована", self.db_path)
+
+                # Таблицы балансов и сетей добавлены позже activities, создаем их и в существующих БД
+                self._create_balances_table(conn)
+                self._create_profile_networks_table(conn)
             except sqlite3.Error as e:
                 logger.error(f"Ошибка инициализации базы данных: {e}")
                 raise DatabaseError(f"Failed to initialize database: {e}")
@@ -69,7 +74,7 @@ class SQLiteDatabase:
         try:
             conn = sqlite3.connect(self.db_path)
             conn.row_factory = sqlite3.Row
-            logger.debug(f"Установлено соединение с базой данных: {self.db_path}")
+            logger.debug("Установлено соединение с базой данных: %s", self.db_path)
             yield conn
         except sqlite3.Error as e:
             logger.error(f"Ошибка соединения с базой данных: {e}")
@@ -115,6 +120,200 @@ class SQLiteDatabase:
             logger.error(f"Ошибка создания таблиц: {e}")
             raise DatabaseError(f"Failed to create tables: {e}")
 
+    def _create_balances_table(self, conn):
+        """Создает таблицу последних известных балансов кошельков (заполняется scan_balances.py)"""
+        try:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS balances (
+                        wallet_address TEXT NOT NULL,
+                        token_address TEXT NOT NULL,
+                        profile_number INTEGER,
+                        symbol TEXT NOT NULL,
+                        amount TEXT NOT NULL,
+                        block_number INTEGER,
+                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (wallet_address, token_address)
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_balances_profile ON balances(profile_number)")
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка создания таблицы balances: {e}")
+            raise DatabaseError(f"Failed to create balances table: {e}")
+
+    def _create_profile_networks_table(self, conn):
+        """Создает таблицу сетей, уже настроенных в MetaMask профилей"""
+        try:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS profile_networks (
+                        env_id TEXT NOT NULL,
+                        chain_id TEXT NOT NULL,
+                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (env_id, chain_id)
+                    )
+                """)
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка создания таблицы profile_networks: {e}")
+            raise DatabaseError(f"Failed to create profile_networks table: {e}")
+
+    def is_network_configured(self, env_id: str, chain_id: str) -> bool:
+        """Сеть настроена и выбрана в MetaMask профиля не раньше NETWORK.CHECK_TTL_HOURS назад"""
+        ttl = get_settings().network_check_ttl
+        if not ttl:
+            return False
+        fresh_since = (datetime.now() - ttl).strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute("""
+                    SELECT 1 FROM profile_networks WHERE env_id = ? AND chain_id = ? AND timestamp >= ?
+                """, (str(env_id), str(chain_id), fresh_since))
+                return cursor.fetchone() is not None
+        except (sqlite3.Error, DatabaseError) as e:
+            logger.error(f"Ошибка чтения сети профиля {env_id}: {e}")
+            return False
+
+    def mark_network_configured(self, env_id: str, chain_id: str, configured: bool = True):
+        """Запоминает (или забывает при configured=False), что сеть настроена в MetaMask профиля"""
+        try:
+            with self._get_connection() as conn:
+                with conn:
+                    if configured:
+                        conn.execute("""
+                            INSERT INTO profile_networks (env_id, chain_id, timestamp)
+                            VALUES (?, ?, strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'))
+                            ON CONFLICT(env_id, chain_id) DO UPDATE SET timestamp = excluded.timestamp
+                        """, (str(env_id), str(chain_id)))
+                    else:
+                        conn.execute("DELETE FROM profile_networks WHERE env_id = ? AND chain_id = ?",
+                                     (str(env_id), str(chain_id)))
+        except (sqlite3.Error, DatabaseError) as e:
+            logger.error(f"Ошибка сохранения сети профиля {env_id}: {e}")
+
+    def upsert_balances(self, balances: List[Dict[str, Any]]):
+        """
+        Сохраняет балансы кошельков (новые строки или обновление существующих).
+
+        Args:
+            balances: Список словарей с ключами wallet_address, token_address, profile_number,
+                      symbol, amount (str), block_number
+        """
+        with self._get_connection() as conn:
+            self.upsert_balances_with_connection(conn, balances)
+
+    def upsert_balances_with_connection(self, conn, balances: List[Dict[str, Any]]):
+        """Сохраняет балансы кошельков в рамках существующего соединения"""
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO balances (wallet_address, token_address, profile_number, symbol, amount,
+                                          block_number, timestamp)
+                    VALUES (lower(:wallet_address), lower(:token_address), :profile_number, :symbol, :amount,
+                            :block_number, strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'))
+                    ON CONFLICT(wallet_address, token_address) DO UPDATE SET
+                        profile_number = excluded.profile_number,
+                        symbol = excluded.symbol,
+                        amount = excluded.amount,
+                        block_number = excluded.block_number,
+                        timestamp = excluded.timestamp
+                """, balances)
+            logger.update(f"Сохранено балансов: {len(balances)}")
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка сохранения балансов: {e}")
+            raise DatabaseError(f"Failed to save balances: {e}")
+
+    def get_wallet_balance_with_connection(self, conn, wallet_address: str,
+                                           token_address: str = NATIVE_TOKEN) -> Optional[Decimal]:
+        """Возвращает последний отсканированный баланс токена кошелька или None, если скана не было"""
+        cursor = conn.execute("""
+            SELECT amount FROM balances WHERE wallet_address = lower(?) AND token_address = lower(?)
+        """, (wallet_address, token_address))
+        row = cursor.fetchone()
+        return Decimal(row[0]) if row else None
+
+    def get_fresh_balances_with_connection(self, conn, profiles: List[Tuple[int, str]],
+                                           token_address: str = NATIVE_TOKEN) -> Dict[str, Optional[Decimal]]:
+        """
+        Возвращает балансы токена для профилей, перечитывая из блокчейна только отсутствующие
+        и устаревшие (старше BALANCE_CACHE_TTL_MINUTES) значения - одним пакетным JSON-RPC запросом.
+
+        Args:
+            profiles: Список (номер профиля, адрес кошелька)
+
+        Returns:
+            {адрес кошелька в нижнем регистре: Decimal или None, если баланс неизвестен}
+        """
+        fresh_since = (datetime.now() - get_settings().balance_cache_ttl).strftime('%Y-%m-%d %H:%M:%S')
+        cursor = conn.execute("""
+            SELECT wallet_address, amount, timestamp FROM balances WHERE token_address = lower(?)
+        """, (token_address,))
+        cached = {row['wallet_address']: row for row in cursor.fetchall()}
+
+        balances = {}
+        stale = []
+        for profile_number, wallet_address in profiles:
+            row = cached.get(wallet_address.lower())
+            balances[wallet_address.lower()] = Decimal(row['amount']) if row else None
+            if not row or row['timestamp'] < fresh_since:
+                stale.append((profile_number, wallet_address))
+
+        if not stale:
+            return balances
+
+        try:
+            self.balance_provider = self.balance_provider or RpcBalanceProvider()
+            fetched = self.balance_provider.get_wallets_balance([wallet for _, wallet in stale], token_address)
+        except BalanceProviderError as e:
+            # Без RPC используем последние известные балансы, решение остается за активностью
+            logger.warning(f"Не удалось обновить балансы {len(stale)} кошельков: {e}")
+            return balances
+
+        symbol = self.balance_provider.token_meta[token_address.lower()]['symbol']
+        rows = []
+        for profile_number, wallet_address in stale:
+            if wallet_address not in fetched:
+                continue
+            balances[wallet_address.lower()] = fetched[wallet_address]
+            rows.append({
+                'wallet_address': wallet_address,
+                'token_address': token_address,
+                'profile_number': profile_number,
+                'symbol': symbol,
+                'amount': format(fetched[wallet_address].normalize(), 'f'),
+                'block_number': None,
+            })
+        if rows:
+            self.upsert_balances_with_connection(conn, rows)
+        logger.debug("Балансы обновлены из блокчейна: %s из %s устаревших", len(rows), len(stale))
+        return balances
+
+    def filter_activities_by_balance_with_connection(self, conn, candidates: List[Tuple[int, str, List[str]]]):
+        """
+        Убирает из списков активностей кандидатов те, для которых не хватает баланса
+        (required_balance плагина активности). Списки изменяются на месте.
+
+        Балансы берутся из таблицы balances и перечитываются из блокчейна только у кандидатов,
+        где они устарели. Если баланс неизвестен, активность остается.
+
+        Args:
+            candidates: Список (номер профиля, адрес кошелька, список активностей)
+        """
+        for activity_type, plugin in load_activity_plugins().items():
+            if not plugin.required_balance:
+                continue
+            token_address, min_balance = plugin.required_balance()
+            # Адрес нового профиля появляется в DB.xlsx после первого входа в MetaMask - баланс неизвестен
+            profiles = [(row, wallet) for row, wallet, activities in candidates if activity_type in activities and wallet]
+            if not profiles:
+                continue
+            balances = self.get_fresh_balances_with_connection(conn, profiles, token_address)
+            for row, wallet_address, activities in candidates:
+                balance = balances.get(wallet_address.lower()) if wallet_address else None
+                if activity_type in activities and balance is not None and not balance_is_enough(balance, min_balance):
+                    logger.debug("Профиль %s: баланс %s не больше %s, %s пропущен",
+                                 row, balance, min_balance, activity_type)
+                    activities.remove(activity_type)
+
     def _validate_activity_data(self, data: Dict):
         """Проверяет обязательные поля"""
         required = ['activity_type', 'status', 'wallet_address']
@@ -191,15 +390,17 @@ class SQLiteDatabase:
         try:
             if not activity_types:
                 activity_types = default_activities
-                logger.debug(f"Using default activities: {activity_types}")
+                logger.debug("Using default activities: %s", activity_types)
             else:
-                logger.debug(f"Using provided activities: {activity_types}")
+                logger.debug("Using provided activities: %s", activity_types)
 
-            # Проверяем наличие записей для профиля
-            check_query = "SELECT COUNT(*) as count FROM activities WHERE profile_number = ?"
-            cursor = conn.execute(check_query, (row,))
-            count = cursor.fetchone()['count']
-            logger.debug(f"Total records for profile {row}: {count}")
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                # Количество записей профиля нужно только для отладочного лога
+                check_query = "SELECT COUNT(*) as count FROM activities WHERE profile_number = ?"
+                cursor = conn.execute(check_query, (row,))
+                count = cursor.fetchone()['count']
+                logger.debug("Total records for profile %s: %s", row, count)
 
             # Динамически формируем SQL-запрос
             query = f"""
@@ -216,17 +417,18 @@ class SQLiteDatabase:
 
             # Выполняем запрос с правильным количеством параметров
             params = [row] + activity_types  # Создаем список параметров: [row, activity_type1, activity_type2, ...]
-            logger.debug(f"Executing query with params: {params}")
+            logger.debug("Executing query with params: %s", params)
             cursor = conn.execute(query, params)
             last_activities = cursor.fetchall()
 
             # Подробное логирование результатов
-            if last_activities:
-                logger.debug(f"Found {len(last_activities)} activities for profile {row}:")
+            if debug and last_activities:
+                logger.debug("Found %s activities for profile %s:", len(last_activities), row)
                 for activity in last_activities:
-                    logger.debug(f"Activity: type={activity['activity_type']}, status={activity['status']}, timestamp={activity['timestamp']}")
-            else:
-                logger.debug(f"No activities found for profile {row} with types {activity_types}")
+                    logger.debug("Activity: type=%s, status=%s, timestamp=%s",
+                                 activity['activity_type'], activity['status'], activity['timestamp'])
+            elif debug:
+                logger.debug("No activities found for profile %s with types %s", row, activity_types)
 
 
             if not last_activities:
@@ -239,13 +441,13 @@ class SQLiteDatabase:
             # Добавляем отсутствующие активности
             missing_activities = [at for at in activity_types if at not in found_activity_types]
             if missing_activities:
-                logger.debug(f"Добавляем отсутствующие активности для выполнения: {missing_activities}")
+                logger.debug("Добавляем отсутствующие активности для выполнения: %s", missing_activities)
                 activity_type_carry_out_list.extend(missing_activities)
 
 
             # Преобразуем записи в удобный формат
             parsed_activities = [self._parse_activity_record(activity) for activity in last_activities]
-            logger.debug(f"Parsed activities for profile {row}: {parsed_activities}")
+            logger.debug("Parsed activities for profile %s: %s", row, parsed_activities)
 
             current_time = datetime.now()
 
@@ -255,20 +457,18 @@ class SQLiteDatabase:
                 if activity['status'] == 'success':
                     try:
                         last_success_time = datetime.strptime(activity['timestamp'], '%Y-%m-%d %H:%M:%S')
-                        if activity['activity_type'] == 'Monad_Faucet_Portal':
-                            next_allowed_time = last_success_time + timedelta(hours=24, minutes=3)
-                        elif activity['activity_type'] == 'Kuru_Swap':
-                            random_time = random.randint(MIN_WAIT_TIME_BETWEEN_SWAP, MAX_WAIT_TIME_BETWEEN_SWAP)
-                            hours, minutes = convert_minutes_to_time(random_time)
-                            next_allowed_time = last_success_time + timedelta(hours=hours, minutes=minutes)
-                        else:
+                        # Пауза после успеха задается плагином активности (activity_registry)
+                        plugin = get_activity(activity['activity_type'])
+                        if not plugin:
                             logger.warning(f"Неизвестный тип активности: {activity['activity_type']}")
                             continue  # или обработка по умолчанию
+                        next_allowed_time = plugin.next_allowed_time(last_success_time)
 
                         if current_time >= next_allowed_time:
-                            logger.debug(f"Waiting time passed since last success, {activity['activity_type']} activity will be carried out")
+                            logger.debug("Waiting time passed since last success, %s activity will be carried out",
+                                         activity['activity_type'])
                             activity_type_carry_out_list.append(activity['activity_type'])
-                        logger.debug(f"Waiting until {next_allowed_time.strftime('%Y-%m-%d %H:%M:%S')}")
+                        logger.debug("Waiting until %s", next_allowed_time)
 
                     except ValueError as e:
                         logger.error(f"Invalid timestamp format, {activity['activity_type']} activity will be carried out")
@@ -280,10 +480,11 @@ class SQLiteDatabase:
                         if activity['next_attempt']:
                             next_attempt = datetime.strptime(activity['next_attempt'], '%Y-%m-%d %H:%M:%S')
                             if current_time >= next_attempt:
-                                logger.debug(f"Next attempt time reached, {activity['activity_type']} activity will be carried out")
+                                logger.debug("Next attempt time reached, %s activity will be carried out",
+                                             activity['activity_type'])
                                 activity_type_carry_out_list.append(activity['activity_type'])
 
-                            logger.debug(f"Waiting until next attempt: {next_attempt.strftime('%Y-%m-%d %H:%M:%S')}")
+                            logger.debug("Waiting until next attempt: %s", next_attempt)
                         else:
                             logger.warning(f"No next_attempt time for limit_exceeded status in {activity['activity_type']}, activity will be carried out")
                             activity_type_carry_out_list.append(activity['activity_type'])
@@ -294,13 +495,13 @@ class SQLiteDatabase:
 
 
                 elif activity['status'] == 'error' or activity['status'] not in ['success', 'limit_exceeded']:
-                    logger.debug(f"Неожиданный статус для Профиля № {row}: {activity['status']}")
-                    if hasattr(config, 'activity_settings') and config.activity_settings.get(
-                            'AUTO_PROCESS_UNEXPECTED_STATUS', True):
-                        logger.debug(f"Unexpected status: {activity['status']}, {activity['activity_type']} activity will be carried out")
+                    logger.debug("Неожиданный статус для Профиля № %s: %s", row, activity['status'])
+                    if get_settings().auto_process_unexpected_status:
+                        logger.debug("Unexpected status: %s, %s activity will be carried out",
+                                     activity['status'], activity['activity_type'])
                         activity_type_carry_out_list.append(activity['activity_type'])
-
-                    logger.debug(f"Unexpected status: {activity['status']} (auto-processing disabled)")
+                    else:
+                        logger.debug("Unexpected status: %s (auto-processing disabled)", activity['status'])
 
             return True, activity_type_carry_out_list
 
@@ -308,10 +509,98 @@ class SQLiteDatabase:
             logger.error(f"Ошибка базы данных в should_process_activity_with_connection: {e}")
             return True, activity_type_carry_out_list
 
+    def get_next_eligible_time_with_connection(self, conn, row: int, activity_types: Optional[List[str]],
+                                               default_activities: Optional[List[str]]) -> datetime:
+        """
+        Время, когда у профиля наступит ближайшая активность (правила те же, что в should_process_activity).
+
+        Активность без записей или с неожиданным статусом доступна сразу (текущее время),
+        после успеха - по паузе плагина, после limit_exceeded - по next_attempt.
+        """
+        activity_types = activity_types or default_activities
+        current_time = datetime.now()
+        if not activity_types:
+            return current_time
+
+        query = f"""
+            SELECT * FROM activities AS a
+            WHERE profile_number = ?
+            AND activity_type IN ({', '.join(['?' for _ in activity_types])})
+            AND timestamp = (
+                SELECT MAX(timestamp) FROM activities AS sub
+                WHERE sub.profile_number = a.profile_number
+                AND sub.activity_type = a.activity_type
+            )
+        """
+        last_activities = {record['activity_type']: record for record in conn.execute(query, [row] + activity_types)}
+
+        due_times = []
+        for activity_type in activity_types:
+            activity = last_activities.get(activity_type)
+            if activity is None:
+                return current_time  # Активность еще не выполнялась
+            try:
+                if activity['status'] == 'success':
+                    plugin = get_activity(activity_type)
+                    if not plugin:
+                        continue
+                    last_success_time = datetime.strptime(activity['timestamp'], '%Y-%m-%d %H:%M:%S')
+                    due_times.append(plugin.next_allowed_time(last_success_time))
+                elif activity['status'] == 'limit_exceeded' and activity['next_attempt']:
+                    due_times.append(datetime.strptime(activity['next_attempt'], '%Y-%m-%d %H:%M:%S'))
+                elif activity['status'] == 'limit_exceeded' or get_settings().auto_process_unexpected_status:
+                    return current_time
+            except ValueError:
+                return current_time  # Неверный формат времени - активность выполняется, как в should_process
+
+        return min(due_times) if due_times else current_time + timedelta(days=1)
+
+    def get_profiles_schedule(self, activity_types=None,
+                              profiles: Optional[Sequence[Tuple[int, Optional[str]]]] = None
+                              ) -> List[Tuple[int, str, datetime]]:
+        """
+        Профили со временем их ближайшей активности: [(row, wallet_address, next_time), ...].
+
+        Args:
+            profiles: Профили DB.xlsx [(row, wallet_address), ...]; профиль без записей в activities
+                доступен сразу. По умолчанию - профили, у которых уже есть записи в activities.
+        """
+        try:
+            with self._get_connection() as conn:
+                if profiles is None:
+                    cursor = conn.execute("""
+                        SELECT profile_number, MAX(wallet_address) as wallet_address
+                        FROM activities
+                        GROUP BY profile_number
+                        ORDER BY profile_number
+                    """)
+                    profiles = [(profile['profile_number'], profile['wallet_address']) for profile in cursor.fetchall()]
+                return [
+                    (row, wallet_address,
+                     self.get_next_eligible_time_with_connection(
+                         conn, row, activity_types, list(get_settings().default_activities)))
+                    for row, wallet_address in profiles
+                ]
+        except (sqlite3.Error, DatabaseError) as e:
+            logger.error(f"Ошибка при расчете расписания профилей: {str(e)}")
+            return []
+
+    def get_profile_activities(self, row: int, wallet_address: str, activity_types=None) -> List[str]:
+        """Активности профиля, готовые к выполнению сейчас, с учетом баланса (пустой список - запуск не нужен)."""
+        with self._get_connection() as conn:
+            should_process, activity_type_carry_out_list = self.should_process_activity_with_connection(
+                conn, row, wallet_address, activity_types, list(get_settings().default_activities)
+            )
+            if not should_process:
+                return []
+            candidates = [(row, wallet_address, list(activity_type_carry_out_list or []))]
+            self.filter_activities_by_balance_with_connection(conn, candidates)
+            return candidates[0][2]
+
     def insert_activity_with_connection(self, conn, row: int, activity_data: Dict[str, Any]):
         """Вставляет активность с указанием номера строки используя существующее соединение"""
         try:
-            logger.debug(f"Начало вставки данных для Профиля № {row}")
+            logger.debug("Начало вставки данных для Профиля № %s", row)
 
             self._validate_activity_data(activity_data)
             activity_data['profile_number'] = row
@@ -347,7 +636,7 @@ class SQLiteDatabase:
 
             # Подтверждение транзакции
             conn.commit()
-            logger.debug(f"Транзакция подтверждена для Профиля № {row}")
+            logger.debug("Транзакция подтверждена для Профиля № %s", row)
 
             message = activity_data.get('message', '')
             logger.update(f"Активность успешно добавлена для Профиля № {row}: {activity_data['activity_type']} - {activity_data['status']} - {message}")
@@ -359,7 +648,7 @@ class SQLiteDatabase:
             """)
             inserted_row = cursor.fetchone()
             if inserted_row:
-                logger.debug(f"Проверка вставленной записи: {dict(inserted_row)}")
+                logger.debug("Проверка вставленной записи: %s", dict(inserted_row))
             else:
                 logger.error("Не удалось найти вставленную запись")
 
@@ -421,9 +710,9 @@ class SQLiteDatabase:
         Возвращает кортеж (нужно_ли_выполнять, причина)
         """
         try:
-            logger.debug(f"DEFAULT_ACTIVITIES before call: {DEFAULT_ACTIVITIES}")
+            logger.debug("DEFAULT_ACTIVITIES before call: %s", get_settings().default_activities)
             with self._get_connection() as conn:
-                return self.should_process_activity_with_connection(conn, row, wallet_address, activity_types, DEFAULT_ACTIVITIES)
+                return self.should_process_activity_with_connection(conn, row, wallet_address, activity_types, list(get_settings().default_activities))
         except DatabaseError as e:
             logger.error(f"Ошибка базы данных в should_process_activity для Профиля № {row}: {e}")
             return True, f"Database error: {e}"
@@ -487,42 +776,55 @@ class SQLiteDatabase:
                     logger.info("В базе нет профилей для обработки")
                     return None
 
-                eligible_profiles = []
+                candidates = []
                 for profile in all_profiles:
                     row, wallet_address = profile['profile_number'], profile['wallet_address']
 
                     # Используем существующую логику проверки
                     should_process, activity_type_carry_out_list = self.should_process_activity_with_connection(
-                        conn, row, wallet_address, activity_types, DEFAULT_ACTIVITIES
+                        conn, row, wallet_address, activity_types, list(get_settings().default_activities)
                     )
-
                     if should_process and activity_type_carry_out_list:
-                        eligible_profiles.append((row, wallet_address, activity_type_carry_out_list))
-                        logger.debug(f"Профиль {row} подходит для обработки:{activity_type_carry_out_list}")
+                        candidates.append((row, wallet_address, list(activity_type_carry_out_list)))
+                    else:
+                        logger.debug("Профиль %s не подходит для обработки!", row)
+
+                # Отсеиваем активности, для которых не хватает баланса, до запуска браузера
+                self.filter_activities_by_balance_with_connection(conn, candidates)
+
+                eligible_profiles = []
+                for row, wallet_address, activities in candidates:
+                    if activities:
+                        eligible_profiles.append((row, wallet_address, activities))
+                        logger.debug("Профиль %s подходит для обработки:%s", row, activities)
                         # Sent to Telegram
                     else:
-                        logger.debug(f"Профиль {row} не подходит для обработки!")
-                        # return True
+                        logger.debug("Профиль %s не подходит для обработки!", row)
 
                 if not eligible_profiles:
                     logger.info("Нет профилей, готовых к обработке")
                     # Sent to Telegram
                     return None
 
+                # Ценность сессии: сколько полезной работы выполнится за один запуск браузера
+                scores = [session_score(activities) for _, _, activities in eligible_profiles]
+
                 selected_profiles_for_processing = []
-                for row in eligible_profiles:
-                    selected_profile_for_processing = f'{row[0]}        |  {row[1][:6]}...{row[1][-4:]} | {row[2]}'
+                for row, score in zip(eligible_profiles, scores):
+                    selected_profile_for_processing = (f'{row[0]}        |  {row[1][:6]}...{row[1][-4:]} | {row[2]} '
+                                                       f'| {score:.2f}')
                     selected_profiles_for_processing.append(selected_profile_for_processing)
-                    logger.debug(f'Выбран профиль для обработки: {selected_profile_for_processing}')
+                    logger.debug('Выбран профиль для обработки: %s', selected_profile_for_processing)
 
                 formatted_selected_profiles_for_processing = ",\n".join(selected_profiles_for_processing)
                 logger.info(f'Выбранные профили для обработки: {len(selected_profiles_for_processing)} шт.\n'
-                            f'Профиль  |     Адрес      |       Активности\n'
+                            f'Профиль  |     Адрес      |       Активности       | Ценность\n'
                             f'{formatted_selected_profiles_for_processing}\n')
                 # Sent to Telegram
 
-                # Выбираем случайный профиль из подходящих
-                selected_row, selected_wallet, activity_type_carry_out_list = random.choice(eligible_profiles)
+                # Выбираем случайный профиль из подходящих, чаще - с более ценной сессией
+                selected_row, selected_wallet, activity_type_carry_out_list = random.choices(
+                    eligible_profiles, weights=[score or 1e-6 for score in scores])[0]
                 return selected_row, selected_wallet, activity_type_carry_out_list
 
         except sqlite3.Error as e:
@@ -541,61 +843,81 @@ def process_activity(driver, wallet_mm_from_browser_extension, row, activity_typ
 
             # Проверяем, нужно ли выполнять активность
             should_process, activity_type_carry_out_list = db.should_process_activity_with_connection(
-                conn, row, wallet_mm_from_browser_extension, activity_types, DEFAULT_ACTIVITIES
+                conn, row, wallet_mm_from_browser_extension, activity_types, list(get_settings().default_activities)
             )
 
             if not should_process:
                 logger.update(f"Пропуск активности для Профиль № {row}.")
                 return False
 
-            # Обрабатываем каждую активность
-            for activity_type in activity_types or DEFAULT_ACTIVITIES:
+            # Активности без достаточного баланса не выполняем (балансы уже актуальны после выбора профиля)
+            activity_type_carry_out_list = list(activity_type_carry_out_list or [])
+            db.filter_activities_by_balance_with_connection(
+                conn, [(row, wallet_mm_from_browser_extension, activity_type_carry_out_list)])
+
+            # Собираем активности сессии: более ценные в минуту - раньше, с учетом зависимостей after
+            for activity_type in activity_type_carry_out_list:
+                if not get_activity(activity_type):
+                    logger.warning(f"Неизвестный тип активности: {activity_type}")
+            activities = order_for_session(activity_type_carry_out_list)
+            for activity in activities:
+                logger.info(f"Активность {activity.name} для Профиля № {row} (~{activity.expected_duration:.0f} сек, "
+                            f"газ ~{activity.cost} MON)")
+
+            if get_settings().parallel_activities and len(activities) > 1:
+                # Каждая активность в своей вкладке, драйвер передается между ними в точках ожидания
+                outcomes = TabActivityExecutor(driver).run(activities, wallet_mm_from_browser_extension)
+            else:
+                outcomes = {}
+                for activity in activities:
+                    try:
+                        with bind_log_context(activity=activity.name):
+                            outcomes[activity.name] = {
+                                'result': activity.run(driver, wallet_mm_from_browser_extension), 'error': None}
+                    except Exception as e:
+                        outcomes[activity.name] = {'result': None, 'error': e}
+
+            # Сохраняем результаты (соединение с БД используется только в этом потоке)
+            for activity_type, outcome in outcomes.items():
+                result = outcome['result']
                 try:
-                    if activity_type in activity_type_carry_out_list:
-                        logger.info(f"Активность {activity_type} для Профиля № {row}")
-
-                        if activity_type == 'Monad_Faucet_Portal':
-                            result = MonadFaucet.process(driver, wallet_mm_from_browser_extension)
-                        elif activity_type == 'Kuru_Swap':
-                            result = kuru(driver, wallet_mm_from_browser_extension)
-                        else:
-                            logger.warning(f"Неизвестный тип активности: {activity_type}")
-                            continue
-
-                        # Сохраняем результат
-                        logger.debug(
-                            f"Начало сохранения результата активности {activity_type} в БД для Профиля № {row}")
-                        if result:
-                            # Убедимся, что результат содержит все обязательные поля
-                            if not all(key in result for key in ['activity_type', 'status', 'wallet_address']):
-                                logger.warning(f"Результат активности {activity_type} не содержит обязательные поля")
-                                # Добавляем обязательные поля, если их нет
-                                result.update({
-                                    'activity_type': activity_type,
-                                    'wallet_address': wallet_mm_from_browser_extension,
-                                    'status': result.get('status', 'error')
-                                })
-
-                            db.insert_activity_with_connection(conn, row, result)
-                            logger.debug(
-                                f"Результат активности {activity_type} успешно сохранен в БД для Профиля № {row}\n"
-                                f"Результат: {result}")
-                            # Sent to Telegram
-                        else:
-                            logger.warning(f"Активность {activity_type} не вернула результат для Профиля № {row}")
-                            # Sent to Telegram
-                            # Создаем запись об ошибке
-                            error_data = {
+                    if outcome['error']:
+                        raise outcome['error']
+
+                    # Сохраняем результат
+                    logger.debug(
+                        f"Начало сохранения результата активности {activity_type} в БД для Профиля № {row}")
+                    if result:
+                        # Убедимся, что результат содержит все обязательные поля
+                        if not all(key in result for key in ['activity_type', 'status', 'wallet_address']):
+                            logger.warning(f"Результат активности {activity_type} не содержит обязательные поля")
+                            # Добавляем обязательные поля, если их нет
+                            result.update({
                                 'activity_type': activity_type,
-                                'status': 'error',
                                 'wallet_address': wallet_mm_from_browser_extension,
-                                'next_attempt': None,
-                                'details': {
-                                    'error': 'No result returned from activity',
-                                    'timestamp': datetime.now().isoformat()
-                                }
+                                'status': result.get('status', 'error')
+                            })
+
+                        db.insert_activity_with_connection(conn, row, result)
+                        logger.debug(
+                            f"Результат активности {activity_type} успешно сохранен в БД для Профиля № {row}\n"
+                            f"Результат: {result}")
+                        # Sent to Telegram
+                    else:
+                        logger.warning(f"Активность {activity_type} не вернула результат для Профиля № {row}")
+                        # Sent to Telegram
+                        # Создаем запись об ошибке
+                        error_data = {
+                            'activity_type': activity_type,
+                            'status': 'error',
+                            'wallet_address': wallet_mm_from_browser_extension,
+                            'next_attempt': None,
+                            'details': {
+                                'error': 'No result returned from activity',
+                                'timestamp': datetime.now().isoformat()
                             }
-                            db.insert_activity_with_connection(conn, row, error_data)
+                        }
+                        db.insert_activity_with_connection(conn, row, error_data)
 
                 except Exception as e:
                     logger.error(f"Error processing активности {activity_type} for Профиль № {row}: {e}")
@@ -693,7 +1015,7 @@ def print_all_records(db_path):
 if __name__ == "__main__":
     # Если файл запущен напрямую, показываем содержимое базы данных
     check_database_content()
-    # print_all_records(os.path.abspath(DB_NAME))
+    # print_all_records(os.path.abspath(get_config().db_file))
 
     db = SQLiteDatabase()
     # info = db.get_profiles_status(rows=[1,2,3,4,5,6,7,8,9,10])
@@ -9,14 +9,51 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.wait import WebDriverWait
 
 from SeleniumUtilities.selenium_utilities import SeleniumUtilities
-from config import logger
+from config import logger, get_settings
 from meta_mask import MetaMaskHelper
+from status_classifier import StatusClassifier
+from activity_executor import wait_point, is_cooperative
+from activity_registry import ActivityPlugin, register_activity
 
 # Constants
 MAX_RETRIES = 5
 BASE_RETRY_DELAY = 3
 FAUCET_URL = "https://faucet.morkie.xyz/monad"
 MORKIE_ID_URL = "https://morkie.xyz/id"
+STATUS_TIMEOUT = 25  # Ожидание ответа крана, сек (меньше стандартного script timeout WebDriver - 30 сек)
+STATUS_POLL_INTERVAL = 1  # Интервал опроса статуса при параллельном выполнении активностей, сек
+
+# Правила статусов крана в порядке приоритета (используются и в браузере, и в Python).
+# Общий шаблон r'\berror\b' вынесен в конец, чтобы не перекрывать точные сообщения.
+STATUS_RULES = [
+    ('limit_exceeded', [
+        r'Too many requests',
+        r'Claim limit exceeded',
+        r'Claim limit reached',
+        r'Try again(?= in \d)',
+        r'Please try again later',
+        r"You've already claimed",
+    ]),
+    ('require_morkie_id', [
+        r'You need a Morkie ID',
+        r'Morkie ID required',
+    ]),
+    ('failed', [
+        r'Transaction failed',
+        r'Failed to process',
+        r'Failed to send transaction',
+        r'Network error\. Check your connection and try again\.',
+        r'Server error\. Please try again later\.',
+    ]),
+    ('success', [
+        r'Success!',
+        r'Transaction:',
+    ]),
+    ('failed', [
+        r'\berror\b',
+    ]),
+]
+STATUS_CLASSIFIER = StatusClassifier(STATUS_RULES)
 
 
 class MonadFaucet:
@@ -84,37 +121,7 @@ class MonadFaucet:
 
     @staticmethod
     def get_faucet_status(driver: Any, main_block) -> Dict[str, Any]:
-        """Определяет статус транзакции, используя find_text()."""
-
-        STATUS_PATTERNS = {
-            'limit_exceeded': [
-                r'Too many requests',
-                r'Claim limit exceeded',
-                r'Claim limit reached',
-                r'Try again in \d+h \d+m',
-                r'Please try again later',
-                r"You've already claimed. ",
-            ],
-            'require_morkie_id': [
-                r'You need a Morkie ID',
-                r'Morkie ID required'
-            ],
-            'failed': [
-                r'Transaction failed',
-                r'Failed to process',
-                r'Failed to send transaction',
-                r'Too many requests. Please try again later.',
-                r'Network error. Check your connection and try again.',
-                r'error',
-                r'Server error. Please try again later.'
-            ],
-            'success': [
-                r'Success!',
-                r'Transaction:',
-                r'Success! Check your wallet.'
-            ]
-        }
-
+        """Определяет статус транзакции по тексту main_block за один проход STATUS_CLASSIFIER."""
         # Дожидаемся, что внутри main_block есть хотя бы один элемент
         wait = WebDriverWait(driver, timeout=10)
 
@@ -125,34 +132,19 @@ class MonadFaucet:
         )
 
         try:
-            message_text = []
-
-            # выбираем элемент если удачный клейм
-            xpath_selector = "//div[contains(@class, 'bg-green-900/40') and contains(., 'Success! Check your wallet') and .//span[text()='Transaction:']]"
-            el = SeleniumUtilities.find_element_safely(driver, By.XPATH, xpath_selector)
-            if el:
-                # print(f'el.text: {el.text}')
-                message_text.append(el.text)
-                # logger.info(f"Message text el.text: {message_text[0]}")  # Для отладки
-            else:  # если не удачный клейм, используем обычный метод
-                text_result = SeleniumUtilities.find_text(main_block, list(sum(STATUS_PATTERNS.values(), [])))
-                logger.debug(f' (get_faucet_status), text_result: {text_result}')
-                message_text.append(text_result['elements'][0].text)
-                # logger.info(f"Message text ['elements'][0].text: {message_text[0]}")  # Для отладки
-            # logger.info(f"Message text: {message_text}")  # Для отладки
-            result = {'message': message_text[0], 'status': 'unknown'}
-
-            # 📌 Проверяем статус по шаблонам
-            for status, patterns in STATUS_PATTERNS.items():
-                if any(re.search(pattern, message_text[0], re.IGNORECASE) for pattern in patterns):
-                    result['status'] = status
-                    break
-
-            # ⏳ Если статус 'limit_exceeded', извлекаем время ожидания
-            if result['status'] == 'limit_exceeded':
-                if (wait_match := re.search(r'in (\d+h \d+m|\d+h|\d+m)', message_text[0])):
-                    if (wait_delta := MonadFaucet.parse_wait_time(wait_match.group(1))):
-                        result["next_attempt"] = (datetime.now() + wait_delta).strftime("%Y-%m-%d %H:%M:%S")
+            classified = STATUS_CLASSIFIER.classify(main_block.text)
+            if classified['status'] == 'unknown':
+                # Сообщение может быть отрисовано вне main_block (toast/модальное окно)
+                classified = STATUS_CLASSIFIER.classify(driver.find_element(By.TAG_NAME, 'body').text)
+            logger.debug(' (get_faucet_status), classified: %s', classified)
+            result = {'message': classified['message'], 'status': classified['status']}
+
+            # ⏳ Если статус 'limit_exceeded', добавляем время ожидания
+            if result['status'] == 'limit_exceeded' and classified['wait']:
+                wait_delta = classified['wait']
+                result['wait'] = {'hours': wait_delta.seconds // 3600 + wait_delta.days * 24,
+                                  'minutes': wait_delta.seconds % 3600 // 60}
+                result["next_attempt"] = (datetime.now() + wait_delta).strftime("%Y-%m-%d %H:%M:%S")
 
             # 🔗 Если статус 'success', ищем транзакцию
             elif result['status'] == 'success':
@@ -167,6 +159,119 @@ class MonadFaucet:
             logger.error("Status check failed: %s", str(e))
             return {'status': 'error', 'message': str(e)}
 
+    @staticmethod
+    def watch_faucet_status(driver: Any, main_block, timeout: float = STATUS_TIMEOUT) -> bool:
+        """
+        Устанавливает в странице MutationObserver на main_block до нажатия Claim.
+
+        Наблюдатель проверяет каждый добавленный/измененный текст по STATUS_RULES
+        и сохраняет первый найденный статус в window.__faucetStatus. Время ожидания
+        из "Try again in Xh Ym" и ссылка на транзакцию разбираются сразу в браузере.
+        """
+        try:
+            driver.execute_script("""
+                var block = arguments[0], timeout = arguments[2] * 1000;
+                var patterns = arguments[1].map(function (entry) {
+                    return [entry[0], entry[1].map(function (p) { return new RegExp(p, 'i'); })];
+                });
+                var state = window.__faucetStatus = {result: null, callbacks: []};
+                var observer, timer;
+
+                function finish(result) {
+                    if (state.result) { return; }
+                    state.result = result;
+                    observer.disconnect();
+                    clearTimeout(timer);
+                    state.callbacks.forEach(function (callback) { callback(result); });
+                }
+
+                function match(text) {
+                    for (var i = 0; i < patterns.length; i++) {
+                        if (patterns[i][1].some(function (regex) { return regex.test(text); })) {
+                            return patterns[i][0];
+                        }
+                    }
+                    return null;
+                }
+
+                function parse(status, text) {
+                    var result = {status: status, message: text.trim()};
+                    var wait = text.match(/in (\\d+h \\d+m|\\d+h|\\d+m)/);
+                    if (wait) {
+                        var hours = wait[1].match(/(\\d+)h/), minutes = wait[1].match(/(\\d+)m/);
+                        result.wait = {hours: hours ? parseInt(hours[1], 10) : 0,
+                                       minutes: minutes ? parseInt(minutes[1], 10) : 0};
+                    }
+                    var link = block.querySelector("a[href*='tx/']");
+                    if (link) { result.transaction = link.href; }
+                    return result;
+                }
+
+                observer = new MutationObserver(function (mutations) {
+                    for (var i = 0; i < mutations.length; i++) {
+                        var mutation = mutations[i];
+                        var nodes = mutation.type === 'characterData' ? [mutation.target] : mutation.addedNodes;
+                        for (var j = 0; j < nodes.length; j++) {
+                            var text = nodes[j].textContent || '';
+                            var status = text && match(text);
+                            if (status) { finish(parse(status, text)); return; }
+                        }
+                    }
+                });
+                observer.observe(block, {childList: true, subtree: true, characterData: true});
+                timer = setTimeout(function () { finish({status: 'timeout', message: ''}); }, timeout);
+            """, main_block, STATUS_RULES, timeout)
+            return True
+        except Exception as e:
+            logger.error(f' (watch_faucet_status), Не удалось установить наблюдатель: {e}')
+            return False
+
+    @staticmethod
+    def wait_faucet_status(driver: Any) -> Optional[Dict[str, Any]]:
+        """
+        Ждет статус от наблюдателя watch_faucet_status одним execute_async_script.
+
+        При параллельном выполнении активностей (TabActivityExecutor) статус опрашивается
+        с паузами wait_point, чтобы на время ожидания ответа крана драйвер был свободен.
+
+        Returns:
+            Словарь статуса в формате get_faucet_status или None, если статус не появился.
+        """
+        try:
+            if is_cooperative():
+                deadline = time.monotonic() + STATUS_TIMEOUT + 1
+                while True:
+                    # false - наблюдатель еще ждет, null - наблюдателя нет
+                    data = driver.execute_script(
+                        "var state = window.__faucetStatus; return state ? (state.result || false) : null;")
+                    if data is not False:
+                        break
+                    if time.monotonic() > deadline:
+                        data = None
+                        break
+                    wait_point(STATUS_POLL_INTERVAL)
+            else:
+                data = driver.execute_async_script("""
+                    var done = arguments[arguments.length - 1], state = window.__faucetStatus;
+                    if (!state) { done(null); return; }
+                    if (state.result) { done(state.result); } else { state.callbacks.push(done); }
+                """)
+        except Exception as e:
+            logger.error(f' (wait_faucet_status), Ошибка ожидания статуса: {e}')
+            return None
+
+        if not data or data['status'] == 'timeout':
+            logger.debug(' (wait_faucet_status), Статус не получен: %s', data)
+            return None
+
+        result = {'message': data['message'], 'status': data['status']}
+        if data.get('wait'):
+            result['wait'] = data['wait']
+            wait_delta = timedelta(hours=data['wait']['hours'], minutes=data['wait']['minutes'])
+            result['next_attempt'] = (datetime.now() + wait_delta).strftime("%Y-%m-%d %H:%M:%S")
+        if data['status'] == 'success' and data.get('transaction'):
+            result['transaction'] = data['transaction'].split('/tx/')[-1][:64]
+        return result
 
     @staticmethod
     def process_claim(driver: Any, wallet_address: str) -> Dict[str, Any]:
@@ -174,7 +279,7 @@ class MonadFaucet:
         attempt = 0
         while attempt < MAX_RETRIES:
             attempt += 1
-            logger.debug(f' (process_claim), Attempt №: {attempt}')
+            logger.debug(' (process_claim), Attempt №: %s', attempt)
             try:
                 # Initial page load
                 driver.get(FAUCET_URL)
@@ -189,40 +294,36 @@ class MonadFaucet:
                     timeout=5
                 )
 
-                # Получаем высоту всей страницы
-                scroll_height = driver.execute_script("return document.body.scrollHeight")
-
-                # Прокручиваем вниз на 50% ------------
-                # driver.execute_script(f"window.scrollTo(0, {scroll_height * 0.5});")
-
-                # Плавная прокрутка на 50% ------------
-                for i in range(0, int(scroll_height * 0.5), 50):
-                    driver.execute_script(f"window.scrollTo(0, {i});")
-                    time.sleep(0.01)  # Эффект плавности
+                # Плавная прокрутка на 50% (вся анимация выполняется в браузере) ------------
+                SeleniumUtilities.smooth_scroll(driver, fraction=0.5)
 
                 logger.debug('Шаг 1: Нажимаем кнопку Claim')
                 text_btn = 'Claim'
                 if not SeleniumUtilities.find_click_button(main_block, text_btn):
-                    logger.debug(f' (process_claim), Не удачное нажатие на кнопку: {text_btn}')
+                    logger.debug(' (process_claim), Не удачное нажатие на кнопку: %s', text_btn)
                 logger.info('Шаг 1: Нажали кнопку Claim - успешно!')
 
                 logger.debug('Шаг 2: Вводим адрес в поле для ввода')
                 locator = (By.XPATH, "//input[@type='text' and starts-with(@placeholder, 'Enter your EVM Address')]")
                 if not SeleniumUtilities.fill_field(driver, locator, wallet_address):
-                    logger.debug(f' (process_claim), Не удачный ввод в поле для адреса')
+                    logger.debug(' (process_claim), Не удачный ввод в поле для адреса')
                 logger.info('Шаг 2: Адрес в поле для ввода введен - успешно!')
 
                 logger.debug('Шаг 3: Нажимаем кнопку Claim')
+                # Наблюдатель ставим до клика, чтобы не пропустить быстрый ответ крана
+                watching = MonadFaucet.watch_faucet_status(driver, main_block)
                 text_btn = 'Claim'
                 if not SeleniumUtilities.find_click_button(main_block, text_btn):
-                    logger.debug(f' (process_claim), Не удачное нажатие на кнопку: {text_btn}')
+                    logger.debug(' (process_claim), Не удачное нажатие на кнопку: %s', text_btn)
 
-                time.sleep(5)  # Wait for transaction processing
                 # if SeleniumUtilities.handle_element_obstruction(driver, main_block):
                 #     logger.debug("Мешающие окна закрыты, проверяем результат...")
 
                 logger.debug('Шаг 4: Ожидаем статуса транзакции')
-                result = MonadFaucet.get_faucet_status(driver, main_block)
+                result = MonadFaucet.wait_faucet_status(driver) if watching else None
+                if not result:
+                    # Запасной вариант: поиск сообщения по тексту в main_block
+                    result = MonadFaucet.get_faucet_status(driver, main_block)
                 if result:
                     logger.info('Шаг 2: Статус транзакции получен - успешно!')
 
@@ -242,14 +343,14 @@ class MonadFaucet:
                 if result['status'] == 'failed' and attempt < MAX_RETRIES + 1:
                     delay = MonadFaucet.exponential_backoff(attempt)
                     logger.warning("Claim failed, retrying in %.1f seconds...", delay)
-                    time.sleep(delay)
+                    wait_point(delay)
                     continue  # переходит сразу к следующему кругу цикла.
 
                 # Retriable errors
                 if result['status'] == 'error' and attempt < MAX_RETRIES + 1:
                     delay = MonadFaucet.exponential_backoff(attempt)
                     logger.warning("Claim with error, retrying in %.1f seconds...", delay)
-                    time.sleep(delay)
+                    wait_point(delay)
                     continue  # переходит сразу к следующему кругу цикла.
 
                 return result
@@ -265,7 +366,7 @@ class MonadFaucet:
                         'activity_type': "Monad_Faucet_Portal"
                     }
                 delay = MonadFaucet.exponential_backoff(attempt)
-                time.sleep(delay)
+                wait_point(delay)
                 continue  # переходит сразу к следующему кругу цикла.
 
         return {
@@ -306,3 +407,11 @@ class MonadFaucet:
                 'message': str(e),
                 'wallet_address': wallet_address
             }
+
+
+register_activity(ActivityPlugin(
+    'Monad_Faucet_Portal', MonadFaucet.process,
+    cooldown=lambda: get_settings().success_wait_time,
+    expected_duration=45,  # Загрузка страницы + ответ крана (STATUS_TIMEOUT)
+    value=2.0,  # Пополняет MON, нужный для остальных активностей
+))
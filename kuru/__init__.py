@@ -1,2 +1,3 @@
 # kuru/__init__.py
-from .kuru import kuru, KuruSwap
\ No newline at end of file
+# Пакет без импортов при загрузке: kuru.balance_provider и kuru.portfolio используются без браузера
+# (database.py, scan_balances.py), а kuru.kuru с selenium импортируется явно: from kuru.kuru import kuru
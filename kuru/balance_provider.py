@@ -0,0 +1,181 @@
+"""
+Источники балансов кошелька для свапов Kuru.
+
+RpcBalanceProvider читает баланс нативного MON (eth_getBalance) и ERC-20 токенов
+(balanceOf через eth_call) одним пакетным JSON-RPC запросом к
+network_config['default_rpc_url']. Значения возвращаются как Decimal с учетом
+decimals() токена, поэтому сравнение балансов до и после свапа точное.
+"""
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Sequence
+
+import requests
+
+from amounts import from_base_units
+from config import logger
+from networks import network_config
+
+NATIVE_TOKEN = '0x0000000000000000000000000000000000000000'
+NATIVE_SYMBOL = network_config['currency_symbol']
+NATIVE_DECIMALS = 18
+
+# Селекторы функций ERC-20
+BALANCE_OF_SELECTOR = '0x70a08231'  # balanceOf(address)
+DECIMALS_SELECTOR = '0x313ce567'  # decimals()
+SYMBOL_SELECTOR = '0x95d89b41'  # symbol()
+
+
+class BalanceProviderError(Exception):
+    """Ошибка получения балансов"""
+    pass
+
+
+def encode_address(address: str) -> str:
+    """Кодирует адрес как 32-байтный аргумент ABI."""
+    return address.lower().replace('0x', '').rjust(64, '0')
+
+
+def decode_string(result: str) -> str:
+    """Декодирует ответ symbol(): ABI string или bytes32."""
+    data = bytes.fromhex(result[2:])
+    if len(data) >= 64:
+        length = int.from_bytes(data[32:64], 'big')
+        return data[64:64 + length].decode('utf-8', errors='ignore')
+    return data.rstrip(b'\x00').decode('utf-8', errors='ignore')
+
+
+def balance_call(wallet_address: str, token: str) -> Dict[str, Any]:
+    """JSON-RPC вызов баланса: eth_getBalance для MON, balanceOf для ERC-20 токена."""
+    if token.lower() == NATIVE_TOKEN:
+        return {'method': 'eth_getBalance', 'params': [wallet_address, 'latest']}
+    data = BALANCE_OF_SELECTOR + encode_address(wallet_address)
+    return {'method': 'eth_call', 'params': [{'to': token, 'data': data}, 'latest']}
+
+
+class BalanceProvider(ABC):
+    """Базовый интерфейс источника балансов."""
+
+    @abstractmethod
+    def get_balances(self, wallet_address: str, tokens: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Возвращает балансы кошелька по адресам токенов.
+
+        Args:
+            wallet_address: Адрес кошелька
+            tokens: Адреса токенов (NATIVE_TOKEN - нативный MON)
+
+        Returns:
+            {token_address: {'symbol': str, 'number_tokens': Decimal, 'decimals': int}}
+        """
+
+
+class RpcBalanceProvider(BalanceProvider):
+    """Балансы из блокчейна пакетными JSON-RPC запросами."""
+
+    def __init__(self, rpc_url: str = None, timeout: float = 10, session: requests.Session = None):
+        self.rpc_url = rpc_url or network_config['default_rpc_url']
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        # Метаданные токенов (symbol, decimals) не меняются - кешируем на время работы
+        self.token_meta: Dict[str, Dict[str, Any]] = {
+            NATIVE_TOKEN: {'symbol': NATIVE_SYMBOL, 'decimals': NATIVE_DECIMALS}
+        }
+
+    def batch_call(self, calls: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Отправляет пакет JSON-RPC вызовов одним HTTP-запросом.
+
+        Args:
+            calls: Список {'method': str, 'params': list}
+
+        Returns:
+            Результаты в порядке вызовов (None для вызовов, вернувших ошибку)
+        """
+        payload = [{'jsonrpc': '2.0', 'id': i, **call} for i, call in enumerate(calls)]
+        try:
+            response = self.session.post(self.rpc_url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            answers = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise BalanceProviderError(f'RPC request to {self.rpc_url} failed: {e}') from e
+
+        if isinstance(answers, dict):  # Узел вернул одну ошибку на весь пакет
+            raise BalanceProviderError(f'RPC batch rejected: {answers.get("error")}')
+
+        results: List[Optional[str]] = [None] * len(calls)
+        for answer in answers:
+            if 'error' in answer:
+                logger.warning(f' (RpcBalanceProvider.batch_call), RPC error: {answer["error"]}')
+                continue
+            results[answer['id']] = answer.get('result')
+        return results
+
+    def load_token_meta(self, tokens: Sequence[str]) -> List[str]:
+        """
+        Загружает symbol() и decimals() для еще неизвестных токенов одним пакетом.
+
+        Токен без decimals() (не ERC-20, ошибка узла) пропускается с предупреждением и
+        запрашивается снова при следующем вызове; остальные токены не затрагиваются.
+
+        Returns:
+            Токены из tokens с известными метаданными, в исходном порядке
+        """
+        unknown = [token for token in tokens if token.lower() not in self.token_meta]
+        if not unknown:
+            return list(tokens)
+        calls = []
+        for token in unknown:
+            calls.append({'method': 'eth_call', 'params': [{'to': token, 'data': DECIMALS_SELECTOR}, 'latest']})
+            calls.append({'method': 'eth_call', 'params': [{'to': token, 'data': SYMBOL_SELECTOR}, 'latest']})
+        results = self.batch_call(calls)
+        for index, token in enumerate(unknown):
+            decimals, symbol = results[2 * index], results[2 * index + 1]
+            if not decimals or decimals == '0x':
+                logger.warning(f' (RpcBalanceProvider.load_token_meta), Токен {token} не вернул decimals(), пропущен')
+                continue
+            self.token_meta[token.lower()] = {
+                'symbol': decode_string(symbol) if symbol and symbol != '0x' else token[:10],
+                'decimals': int(decimals, 16),
+            }
+        return [token for token in tokens if token.lower() in self.token_meta]
+
+    def get_balances(self, wallet_address: str, tokens: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        if missing := set(tokens) - set(self.load_token_meta(tokens)):
+            raise BalanceProviderError(f'No decimals() for tokens {sorted(missing)}')
+
+        results = self.batch_call([balance_call(wallet_address, token) for token in tokens])
+
+        balances = {}
+        for token, raw in zip(tokens, results):
+            if raw is None:
+                raise BalanceProviderError(f'No balance returned for token {token}')
+            meta = self.token_meta[token.lower()]
+            amount = int(raw, 16) if raw != '0x' else 0
+            balances[token] = {
+                'symbol': meta['symbol'],
+                'number_tokens': from_base_units(amount, meta['decimals']),
+                'decimals': meta['decimals'],
+            }
+        logger.debug(f' (RpcBalanceProvider.get_balances), {wallet_address}: {balances}')
+        return balances
+
+    def get_wallets_balance(self, wallets: Sequence[str], token: str = NATIVE_TOKEN,
+                            batch_size: int = 100) -> Dict[str, Decimal]:
+        """
+        Баланс одного токена для нескольких кошельков пакетами по batch_size вызовов.
+
+        Returns:
+            {wallet_address: Decimal} (кошельки, для которых узел вернул ошибку, отсутствуют)
+        """
+        if not self.load_token_meta([token]):
+            raise BalanceProviderError(f'Token {token} did not return decimals()')
+        decimals = self.token_meta[token.lower()]['decimals']
+        balances = {}
+        for start in range(0, len(wallets), batch_size):
+            chunk = wallets[start:start + batch_size]
+            results = self.batch_call([balance_call(wallet, token) for wallet in chunk])
+            for wallet, raw in zip(chunk, results):
+                if raw is not None:
+                    balances[wallet] = from_base_units(int(raw, 16) if raw != '0x' else 0, decimals)
+        return balances
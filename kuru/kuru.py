@@ -1,18 +1,19 @@
 from datetime import datetime, timedelta
 import random
-from config import MIN_WAIT_TIME_BETWEEN_SWAP, MAX_WAIT_TIME_BETWEEN_SWAP
+from config import get_settings
 import re
 import time
 from pprint import pprint
 
 # Работа с типами данных
-from typing import Dict, Any, Optional, Tuple, List
+from decimal import Decimal
+from typing import Dict, Any, Optional, Tuple, List, TypedDict, NotRequired
 
 # Работа с URL
 from urllib.parse import urlparse, parse_qs, urlencode
 
 # Selenium
-from selenium.common import WebDriverException, NoSuchElementException
+from selenium.common import WebDriverException, NoSuchElementException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.expected_conditions import title_contains
 from selenium.webdriver.support.wait import WebDriverWait
@@ -22,25 +23,23 @@ from meta_mask import MetaMaskHelper, compare_addresses
 from SeleniumUtilities.selenium_utilities import SeleniumUtilities
 from config import logger
 from utils import adjust_window_position, random_number_for_sell
-
-toket_address_list = [
-'0xf817257fed379853cDe0fa4F97AB987181B1E5Ea',
-'0x3a98250F98Dd388C211206983453837C8365BDc1',
-'0xfe140e1dce99be9f4f15d657cd9b7bf622270c50',
-'0xe0590015a873bf326bd645c3e1266d4db41c4e6b',
-'0x0f0bdebf0f83cd1ee3974779bcb7315f9808c714',
-'0xb5a30b0fdc5ea94a52fdc42e3e9760cb8449fb37',
-# '0xcf5a6076cfa32686c0df13abada2b40dec133f1d',  # WBTC
-'0xabd7afa2161eb7254c0a9dbb5fe79216b7c28e03',
-# '0x39e95286dd43f8da34cbda8e4b656da9f53ca644',  #AXO
-'0x743cef7ccc8ac56605c8404607142e5b35efa11d',
-'0x268e4e24e0051ec27b3d27a95977e71ce6875a05',
-'0x4c10428ed0410dfb2de62fc007f7c1105ae861e9',
-'0x2bb4219b8e85c111613f3ee192a115676f230d35',
-'0x8507f576eb214d172012065d58cfb38a4540b0a6',
-'0x859fb36f3fe7e22b37dd99b501f891377ddc9c33',
-'0x53abd7e17c8939558bfa80a721e01633a3ef9d5c',
+from amounts import DEFAULT_DECIMALS, amount_delta, format_amount, to_base_units
+from activity_executor import wait_point
+from activity_registry import ActivityPlugin, balance_is_enough, register_activity
+from kuru.balance_provider import BalanceProvider, BalanceProviderError, NATIVE_TOKEN
+from kuru.portfolio import PortfolioSnapshotService, snapshot_to_details, diff_snapshots
+from kuru.tokens import toket_address_list
+from status_classifier import StatusClassifier
+
+# Сообщения страницы Kuru о результате свапа в порядке приоритета (для details при ошибке свапа)
+SWAP_STATUS_RULES = [
+    ('rejected', [r'User (?:rejected|denied)', r'rejected the request']),
+    ('insufficient_balance', [r'Insufficient (?:balance|funds|liquidity)', r'exceeds balance']),
+    ('failed', [r'Transaction (?:failed|reverted)', r'Swap failed', r'execution reverted', r'Slippage']),
+    ('success', [r'Swap (?:successful|complete)', r'Transaction (?:confirmed|successful)']),
+    ('failed', [r'\berror\b']),
 ]
+SWAP_STATUS_CLASSIFIER = StatusClassifier(SWAP_STATUS_RULES)
 
 
 def extract_swap_addresses(url: str) -> List[str]:
@@ -62,60 +61,62 @@ def extract_swap_addresses(url: str) -> List[str]:
     return []  # Если параметры отсутствуют, возвращаем пустой список
 
 
-def normalize_value(value_str: str) -> str:
-    original_value = value_str
-    value_str = value_str.replace(',', '').strip()
-
-    # Карта нижних индексов
-    subscript_map = {
-        '₀': '0', '₁': '1', '₂': '2', '₃': '3', '₄': '4',
-        '₅': '5', '₆': '6', '₇': '7', '₈': '8', '₉': '9'
-    }
-
-    # Преобразуем нижние индексы в обычные цифры
-    def convert_subscripts(s):
-        return ''.join(subscript_map.get(char, char) for char in s)
-
-    value_str = convert_subscripts(value_str)
-
-    # Обработка специального формата: 0.0ₙXYZ → 0. + n нулей + XYZ
-    match = re.match(r'^0\.0(\d)(\d+)$', value_str)
-    if match:
-        zero_count = int(match.group(1))
-        rest = match.group(2)
-        cleaned_value = f"0.{''.join(['0'] * zero_count)}{rest}"
-        logger.debug(f"(normalize_value), Специальный формат: '{original_value}' → '{cleaned_value}'")
-        return cleaned_value
-
-    # Обработка суффиксов K, M, B
-    multiplier = 1
-    suffix_match = re.search(r'([KMB])$', value_str.upper())
-    if suffix_match:
-        suffix = suffix_match.group(1)
-        if suffix == 'K':
-            multiplier = 1_000
-        elif suffix == 'M':
-            multiplier = 1_000_000
-        elif suffix == 'B':
-            multiplier = 1_000_000_000
-        value_str = value_str[:-1]
-
-    # Удаляем всё лишнее кроме цифр и точки
-    cleaned_value = re.sub(r'[^\d\.]', '', value_str)
-
-    # Защита от ложных преобразований: если cleaned_value уже валидное число, не трогаем
-    if re.fullmatch(r'\d+(\.\d+)?', cleaned_value):
-        try:
-            normalized = float(cleaned_value) * multiplier
-            logger.debug(f"(normalize_value), Исходное: '{original_value}' → '{normalized}'")
-            return str(normalized)
-        except ValueError:
-            logger.error(f"(normalize_value), Ошибка преобразования: '{cleaned_value}' из '{original_value}'")
-            return original_value
+# Нижние индексы сокращенной записи мелких балансов (0.0₄52) и разделители разрядов
+SUBSCRIPT_DIGITS = str.maketrans('₀₁₂₃₄₅₆₇₈₉', '0123456789')
+BALANCE_SEPARATORS = str.maketrans('', '', ', \u00a0\u202f')
+BALANCE_MULTIPLIERS = {'': 1, 'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}
+BALANCE_PATTERN = re.compile(
+    r'[$~≈<]*(?:0\.0(?P<zeros>[₀-₉]+)(?P<tail>\d+)|(?P<number>\d+(?:\.\d*)?|\.\d+)(?P<suffix>[KMBkmb]?))'
+)
+
+
+def normalize_value(value_str: str) -> Decimal:
+    """
+    Преобразует баланс со страницы Kuru в Decimal за один проход скомпилированного шаблона.
+
+    Форматы: '1,234.56', '1.2K' / '3M' / '1B', '0.0₄52' (после '0.' четыре нуля, затем 52 = 0.000052).
+
+    Raises:
+        ValueError: Строка не является балансом
+    """
+    match = BALANCE_PATTERN.fullmatch(value_str.translate(BALANCE_SEPARATORS))
+    if not match:
+        # Во время загрузки виджета это ожидаемо: get_token_info опрашивает страницу повторно
+        logger.debug("(normalize_value), Не удалось интерпретировать: %r", value_str)
+        raise ValueError(f"Unrecognized balance: {value_str!r}")
+
+    if match['zeros']:
+        tail = match['tail']
+        return Decimal(int(tail)).scaleb(-(int(match['zeros'].translate(SUBSCRIPT_DIGITS)) + len(tail)))
+    return Decimal(match['number']) * BALANCE_MULTIPLIERS[match['suffix'].upper()]
+
+
+class TokenBalance(TypedDict):
+    symbol: str
+    number_tokens: Decimal
+    decimals: NotRequired[int]  # Известно только для балансов из блокчейна
+
+
+class TokenInfo(TypedDict):
+    selling_token: TokenBalance
+    buying_token: TokenBalance
+
+
+def base_units_delta(before: TokenBalance, after: TokenBalance) -> int:
+    """Изменение баланса в целых базовых единицах токена (decimals из блокчейна, иначе DEFAULT_DECIMALS)."""
+    decimals = after.get('decimals', before.get('decimals', DEFAULT_DECIMALS))
+    return to_base_units(after['number_tokens'], decimals) - to_base_units(before['number_tokens'], decimals)
+
 
-    # Если не удалось распознать — возвращаем исходное
-    logger.warning(f"(normalize_value), Не удалось интерпретировать: '{original_value}'")
-    return original_value
+def swap_applied(before: "TokenInfo", after: "TokenInfo") -> bool:
+    """Свап отразился в балансах: продаваемого токена стало меньше, покупаемого - больше (в базовых единицах)."""
+    return (base_units_delta(before['selling_token'], after['selling_token']) < 0 and
+            base_units_delta(before['buying_token'], after['buying_token']) > 0)
+
+
+def selling_balance_changed(before: "TokenInfo", after: "TokenInfo") -> bool:
+    """Баланс продаваемого токена отличается от снимка до свапа (страница или узел увидели транзакцию)."""
+    return base_units_delta(before['selling_token'], after['selling_token']) != 0
 
 
 class KuruSwap:
@@ -134,16 +135,47 @@ class KuruSwap:
         'balance': "flex items-center space-x-2 visible",
         }
 
-    def __init__(self, driver):
+    # Адрес страницы свапа (переопределяется в бенчмарках на локальную копию)
+    SWAP_URL = 'https://www.kuru.io/swap'
+
+    # Ожидание балансов в get_token_info: общий дедлайн и интервал опроса DOM, сек
+    TOKEN_INFO_DEADLINE = 30
+    TOKEN_INFO_POLL_INTERVAL = 0.5
+    # Ожидание балансов после свапа (до изменения баланса продаваемого токена), сек
+    SWAP_BALANCE_DEADLINE = 90
+    # Интервал опроса узла после свапа (eth_blockNumber; снимок перечитывается только на новом блоке), сек
+    ONCHAIN_POLL_INTERVAL = 1
+
+    # Символы (span.w-max: продаваемый, курс, покупаемый) и пары (тикер, баланс) из блоков балансов
+    TOKEN_SNAPSHOT_SCRIPT = """
+        var symbols = Array.from(document.getElementsByClassName('w-max')).map(function (el) {
+            return el.innerText.trim();
+        });
+        var balances = [];
+        document.querySelectorAll('.flex.items-center.space-x-2.visible').forEach(function (block) {
+            var span = block.querySelector('span');
+            var ticker = block.querySelector('div[class="max-w-16 truncate undefined"]');
+            if (span && ticker) {
+                balances.push([ticker.innerText.trim(), span.innerText.trim()]);
+            }
+        });
+        return {symbols: symbols, balances: balances};
+    """
+
+    def __init__(self, driver, balance_provider: Optional[BalanceProvider] = None):
         """
         Инициализация KuruSwap.
 
         Args:
             driver: WebDriver - экземпляр драйвера
+            balance_provider: Источник балансов (None - балансы читаются со страницы)
         """
         self.current_url = None
         self.driver = driver
         self.metamask = MetaMaskHelper(driver)
+        self.balance_provider = balance_provider
+        self.wallet_address = None  # Заполняется после успешного connect_wallet
+        self.token_info_status = None  # Результат последнего get_token_info: success / timeout / error
 
 
     def open_website(self, from_token='0x0000000000000000000000000000000000000000',
@@ -158,7 +190,7 @@ class KuruSwap:
         Returns:
             bool: True если сайт успешно открыт, False в случае ошибки.
         """
-        BASE_URL = f'https://www.kuru.io/swap?from={from_token}&to={to_token}'
+        BASE_URL = f'{self.SWAP_URL}?from={from_token}&to={to_token}'
 
         try:
             logger.info(f'Opening website: {BASE_URL}')
@@ -190,7 +222,7 @@ class KuruSwap:
         """
         try:
             while True:
-                time.sleep(3)
+                wait_point(3)
                 element = SeleniumUtilities.find_which_selector(
                     self.driver,
                     By.XPATH,
@@ -209,7 +241,7 @@ class KuruSwap:
                         return False
 
                 text_in_element = element.text
-                logger.debug(f'Found element text: {text_in_element}')
+                logger.debug('Found element text: %s', text_in_element)
 
                 if text_in_element == 'Connect wallet':
                     if not self._handle_connect_wallet_click(element):
@@ -217,6 +249,7 @@ class KuruSwap:
                 else:
                     if compare_addresses(mm_address, text_in_element):
                         logger.info(f'MetaMask address {mm_address} connected to site: https://www.kuru.io/')
+                        self.wallet_address = mm_address
                         return True
 
         except Exception as e:
@@ -237,7 +270,7 @@ class KuruSwap:
             element.click()
             logger.debug('Clicked on <Connect wallet> button')
 
-            time.sleep(3)
+            wait_point(3)
             dialog_block = SeleniumUtilities.find_element_safely(
                 self.driver,
                 By.XPATH,
@@ -249,8 +282,9 @@ class KuruSwap:
                 logger.error("Dialog block not found")
                 return False
 
+            window_kuru = self.driver.current_window_handle
             current_windows = self.driver.window_handles
-            logger.debug(f'Current windows: {current_windows}')
+            logger.debug('Current windows: %s', current_windows)
 
             if not SeleniumUtilities.find_and_click_child_by_text(dialog_block, 'MetaMask', partial_match=False):
                 logger.error("Failed to click MetaMask button")
@@ -267,7 +301,8 @@ class KuruSwap:
                 logger.error("Failed to complete MetaMask connection")
                 return False
 
-            self.driver.switch_to.window(current_windows[-1])
+            # Вкладка Kuru не обязательно последняя: рядом могут работать другие активности
+            self.driver.switch_to.window(window_kuru)
             logger.info("Connection completed successfully")
             return True
 
@@ -275,108 +310,140 @@ class KuruSwap:
             logger.error(f'Error handling connect wallet click: {str(e)}')
             return False
 
-    def get_token_info(self) -> Dict[str, Dict[str, Any]]:
+    def _read_token_snapshot(self) -> Optional[TokenInfo]:
         """
-        Получает информацию о токенах для свопа.
+        Читает символы и балансы обоих токенов одним execute_script.
 
         Returns:
-            Dict[str, Dict[str, Any]]: Информация о токенах в формате:
-            {
-                'selling_token': {
-                    'symbol': str,
-                    'number_tokens': float,
-                },
-                'buying_token': {
-                    'symbol': str,
-                    'number_tokens': float
-                },
-                'element_refresh': WebElement  # Элемент для обновления котировки
-            }
+            TokenInfo, если виджет свапа полностью отрисован и балансы распознаны, иначе None.
         """
-        while True:
-            try:
+        snapshot = self.driver.execute_script(self.TOKEN_SNAPSHOT_SCRIPT)
+        symbols, balances = snapshot['symbols'], snapshot['balances']
+        if len(symbols) < 3 or len(balances) < 2 or not all(value for _, value in balances[:2]):
+            logger.debug(' (get_token_info), Виджет свапа еще не готов: %s', snapshot)
+            return None
 
-                time.sleep(3)
-                token_exist = {'selling_token': {}, 'buying_token': {}}
-                class_path = 'w-max'
-                els_symbol_list = SeleniumUtilities.find_elements_safely(
-                    self.driver,
-                    By.CLASS_NAME,
-                    class_path
-                )
+        try:
+            number_tokens = [normalize_value(value) for _, value in balances[:2]]
+        except ValueError:
+            logger.debug(' (get_token_info), Балансы еще не распознаны: %s', balances[:2])
+            return None
 
-                logger.debug(f' (get_token_info), Found token symbols: {els_symbol_list[0].text.strip()}, and: {els_symbol_list[2].text.strip()}')
-
-                selling_symbol = token_exist['selling_token']['symbol'] = els_symbol_list[0].text.strip()
-                buying_symbol = token_exist['buying_token']['symbol'] = els_symbol_list[2].text.strip()
-
-                # Получаем балансы токенов и элемент обновления
-                def extract_token_values(driver):
-                    results  = []
-                    time.sleep(5)
-                    blocks = SeleniumUtilities.get_elements(driver, 'flex items-center space-x-2 visible')
-
-                    if blocks:
-                        logger.debug(f"(get_token_info), Найдено блоков: {len(blocks)}")
-
-                    for block in blocks:
-                        # Проверка наличия <span>
-                        try:
-                            span_element = block.find_element(By.TAG_NAME, 'span')
-                            span_value = normalize_value(span_element.text.strip())
-                        except NoSuchElementException:
-                            logger.error(f" (get_token_info, extract_token_values), Не найден <span> в блоке")
-                            continue
-
-                        # Проверка наличия <div class="max-w-16 truncate undefined">
-                        try:
-                            token_element = block.find_element(
-                                By.XPATH, './/div[@class="max-w-16 truncate undefined"]'
-                            )
-                            token_name = token_element.text.strip()
-                        except NoSuchElementException:
-                            logger.error(f" (get_token_info, extract_token_values), Не найден криптовалютный тикер (truncate)")
-                            continue
-                        results .append((token_name, span_value))
-
-                    return results
-
-                # Пример использования
-                els_info_list = extract_token_values(self.driver)
-                logger.debug(f"(get_token_info), Результат парсинга: {els_info_list}")
-
-                number_tokens_selling = els_info_list[0][1]
-                logger.debug(f"(get_token_info), number_tokens_selling: {number_tokens_selling}")
-                number_tokens_buying = els_info_list[1][1]
-                logger.debug(f'(get_token_info), number_tokens_buying: {number_tokens_buying}')
-
-                # Проверка наличия токенов
-                number_tokens_selling = float(number_tokens_selling.replace(',', '') if number_tokens_selling not in [None, 0, '0'] else 0.0)
-                token_exist.setdefault('selling_token', {})['number_tokens'] = number_tokens_selling
-
-                if number_tokens_selling == 0.0000:
-                    logger.info(f" (get_token_info), Токенов {selling_symbol} в кошельке нет")
-                else:
-                    logger.info(f' (get_token_info), Токены есть в кошельке, можно продать: {number_tokens_selling} {selling_symbol}')
+        return {
+            'selling_token': {'symbol': symbols[0], 'number_tokens': number_tokens[0]},
+            'buying_token': {'symbol': symbols[2], 'number_tokens': number_tokens[1]},
+        }
 
-                # Обработка баланса buying token. Проверяем наличие данных и корректно преобразуем в float
-                number_tokens_buying = float(number_tokens_buying.replace(',', '') if number_tokens_buying not in [None, 0, '0'] else 0.0)
+    def _get_token_info_onchain(self) -> Optional[TokenInfo]:
+        """
+        Получает балансы пары токенов из открытого URL свапа через balance_provider.
 
-                # Безопасное присваивание в `token_exist`
-                token_exist.setdefault('buying_token', {})['number_tokens'] = number_tokens_buying
+        Returns:
+            TokenInfo с точными балансами (Decimal) или None, если пару или балансы получить не удалось.
+        """
+        addresses = extract_swap_addresses(self.driver.current_url)
+        if len(addresses) != 2:
+            logger.warning(f' (get_token_info), В URL нет пары токенов: {self.driver.current_url}')
+            return None
+        try:
+            balances = self.balance_provider.get_balances(self.wallet_address, addresses)
+        except BalanceProviderError as e:
+            logger.warning(f' (get_token_info), Балансы из блокчейна не получены: {e}')
+            return None
+        from_token, to_token = addresses
+        return {'selling_token': balances[from_token], 'buying_token': balances[to_token]}
+
+    def _wait_onchain_balance_change(self, current: TokenInfo, changed_from: TokenInfo,
+                                     deadline: float) -> Optional[TokenInfo]:
+        """
+        Опрашивает узел, пока транзакция свапа не попадет в блок и баланс продаваемого токена не изменится.
 
-                # Логирование результата
-                if number_tokens_buying == 0.0000:
-                    logger.info(f" (get_token_info), Токенов {buying_symbol} в кошельке нет")
-                else:
-                    logger.info(f' (get_token_info), Токены есть в кошельке, можно продать: {number_tokens_buying} {buying_symbol}')
+        Returns:
+            TokenInfo после свапа или None, если за deadline секунд баланс не изменился (token_info_status='timeout').
+        """
+        end = time.monotonic() + deadline
+        while not selling_balance_changed(changed_from, current):
+            if time.monotonic() >= end:
+                self.token_info_status = 'timeout'
+                logger.error(f' (get_token_info), Транзакция свапа не отразилась в блокчейне за {deadline} сек, '
+                             f'баланс {current["selling_token"]["symbol"]}: {current["selling_token"]["number_tokens"]}')
+                return None
+            wait_point(self.ONCHAIN_POLL_INTERVAL)
+            current = self._get_token_info_onchain() or current
+        return current
+
+    def get_token_info(self, deadline: float = None, changed_from: Optional[TokenInfo] = None) -> Optional[TokenInfo]:
+        """
+        Получает информацию о токенах для свопа.
+
+        Если задан balance_provider, балансы читаются из блокчейна по адресам токенов из URL.
+        Иначе (или при ошибке RPC) опрашивает DOM до тех пор, пока два подряд прочитанных снимка виджета не совпадут
+        (балансы догрузились и перестали меняться), но не дольше deadline секунд.
 
+        После свапа передается changed_from - балансы до него: снимок принимается, только когда баланс
+        продаваемого токена отличается от changed_from, иначе виджет еще показывает балансы до свапа.
+        Балансы из блокчейна при этом опрашиваются до включения транзакции в блок; если баланс не изменился
+        за deadline, возвращается None со статусом 'timeout' (свап не проверен, а не "не прошел").
+
+        Args:
+            deadline: Общее время ожидания в секундах (по умолчанию TOKEN_INFO_DEADLINE)
+            changed_from: Балансы до свапа, от которых должен отличаться результат
+
+        Returns:
+            TokenInfo в формате:
+            {
+                'selling_token': {'symbol': str, 'number_tokens': Decimal},
+                'buying_token': {'symbol': str, 'number_tokens': Decimal}
+            }
+            или None; причина сохраняется в self.token_info_status ('timeout' или 'error').
+        """
+        if self.balance_provider and self.wallet_address:
+            if (token_exist := self._get_token_info_onchain()) and changed_from:
+                token_exist = self._wait_onchain_balance_change(token_exist, changed_from,
+                                                                deadline or self.TOKEN_INFO_DEADLINE)
+                if not token_exist:
+                    return None
+            if token_exist:
+                self.token_info_status = 'success'
+                logger.info(f' (get_token_info), Балансы из блокчейна: {token_exist}')
                 return token_exist
+            logger.warning(' (get_token_info), Читаем балансы со страницы')
+
+        deadline = deadline or self.TOKEN_INFO_DEADLINE
+        previous = {}
 
-            except Exception as e:
-                logger.error(f' (get_token_info), Error getting token info: {str(e)}')
-                continue
-                # return {'selling_token': {}, 'buying_token': {}}
+        def stable_snapshot(driver) -> Optional[TokenInfo]:
+            current = self._read_token_snapshot()
+            if current and current == previous.get('snapshot') and (
+                    changed_from is None or selling_balance_changed(changed_from, current)):
+                return current
+            previous['snapshot'] = current
+            return None
+
+        try:
+            token_exist = WebDriverWait(
+                self.driver, deadline, poll_frequency=self.TOKEN_INFO_POLL_INTERVAL
+            ).until(stable_snapshot)
+        except TimeoutException:
+            self.token_info_status = 'timeout'
+            reason = 'Баланс продаваемого токена не изменился' if changed_from else 'Балансы не получены'
+            logger.error(f' (get_token_info), {reason} за {deadline} сек, '
+                         f'последний снимок: {previous.get("snapshot")}')
+            return None
+        except Exception as e:
+            self.token_info_status = 'error'
+            logger.error(f' (get_token_info), Error getting token info: {str(e)}')
+            return None
+
+        self.token_info_status = 'success'
+        for side in ('selling_token', 'buying_token'):
+            symbol, number_tokens = token_exist[side]['symbol'], token_exist[side]['number_tokens']
+            if number_tokens == 0.0:
+                logger.info(f" (get_token_info), Токенов {symbol} в кошельке нет")
+            else:
+                logger.info(f' (get_token_info), Токены есть в кошельке, можно продать: {number_tokens} {symbol}')
+
+        return token_exist
 
     def input_number_for_sell(self, number):
         css_selector_selling = 'input[placeholder]'
@@ -384,22 +451,21 @@ class KuruSwap:
         elements_input = SeleniumUtilities.find_elements_safely(self.driver, By.CSS_SELECTOR, css_selector_selling)
         if elements_input[0]:
             elements_input[0].clear()
-            if elements_input[0].send_keys(number):
-                logger.debug(f" (input_number_for_sell), Вставка значения: {number} успешна")
-                time.sleep(3)
+            if elements_input[0].send_keys(format_amount(number)):
+                logger.debug(" (input_number_for_sell), Вставка значения: %s успешна", number)
+                wait_point(3)
                 logger.debug(
                     f" (input_number_for_sell),  elements_input[0]: {elements_input[0].get_attribute('value')}")
         else:
             logger.error("Не удалось найти элементы для ввода числа 1")
-        time.sleep(3)
+        wait_point(3)
         elements_input = SeleniumUtilities.find_elements_safely(self.driver, By.CSS_SELECTOR, css_selector_selling)
         text_button = 'Swap'
         element_btn = SeleniumUtilities.find_button_by_text(self.driver, text_button)
         if element_btn and element_btn.is_enabled() and element_btn.is_displayed():
             if elements_input[1]:
-                logger.debug(f" (input_number_for_sell),  elements_input[1]: {elements_input[1].get_attribute('value')}")
-
                 quantity_will_purchase = elements_input[1].get_attribute('value')
+                logger.debug(" (input_number_for_sell),  elements_input[1]: %s", quantity_will_purchase)
                 logger.info(f' (input_number_for_sell), При продаже: {number}, получим: {quantity_will_purchase}')
                 return quantity_will_purchase
             else:
@@ -412,9 +478,10 @@ class KuruSwap:
     def swap(self, token_info_swap: Dict[str, Dict[str, Any]]):
         number_tokens_selling = token_info_swap['selling_token']['number_tokens']
         selling_symbol = token_info_swap['selling_token']['symbol']
+        selling_decimals = token_info_swap['selling_token'].get('decimals', DEFAULT_DECIMALS)
 
         quantity_for_sale = token_info_swap['selling_token']['quantity_for_sale'] = random_number_for_sell(
-            selling_symbol, number_tokens_selling
+            selling_symbol, number_tokens_selling, selling_decimals
         )
         quantity_will_purchase = self.input_number_for_sell(quantity_for_sale)
         if not quantity_will_purchase:
@@ -422,9 +489,9 @@ class KuruSwap:
             return False
 
         window_kuru = self.driver.current_window_handle
-        logger.debug(f' (swap), Current opened Kuru tab: {window_kuru}')
+        logger.debug(' (swap), Current opened Kuru tab: %s', window_kuru)
         current_windows = self.driver.window_handles
-        logger.debug(f' (swap), Current opened tabs: {current_windows}')
+        logger.debug(' (swap), Current opened tabs: %s', current_windows)
 
         token_info_swap['buying_token']['quantity_will_purchase'] = quantity_will_purchase
 
@@ -432,15 +499,17 @@ class KuruSwap:
         attempt = 0
         while attempt < max_attempts:
             attempt += 1
-            logger.debug(f' (KuruSwap.swap), Attempt swap №: {attempt}')
-            time.sleep(3)
+            logger.debug(' (KuruSwap.swap), Attempt swap №: %s', attempt)
+            # Паузы через wait_point: при параллельных активностях драйвер на это время свободен
+            wait_point(3)
+            current_windows = self.driver.window_handles  # Окна, открытые другими активностями во время паузы
 
             text_button = 'Swap'
             element_btn = SeleniumUtilities.find_button_by_text(self.driver, text_button, timeout=20)
             if element_btn and element_btn.is_enabled() and element_btn.is_displayed():
                 if not SeleniumUtilities.click_safely(element_btn):
                     logger.error(" (swap), Failed to click button <Swap>")
-                    time.sleep(2)
+                    wait_point(2)
                     continue
 
                 # Обработка окон MetaMask
@@ -460,7 +529,7 @@ class KuruSwap:
                         if new_windows:
                             new_window_mm = new_windows[0]
                             self.driver.switch_to.window(new_window_mm)
-                            logger.debug(f' (swap), New tab MetaMask is opened: {new_window_mm}')
+                            logger.debug(' (swap), New tab MetaMask is opened: %s', new_window_mm)
                         else:
                             break
                     except:
@@ -473,7 +542,7 @@ class KuruSwap:
                         button_element = SeleniumUtilities.find_button_by_text(self.driver, text_btn)
                         if button_element:
                             button_element.click()
-                            logger.debug(f" (swap), MetaMask tab. Clicked button {text_btn} successfully")
+                            logger.debug(" (swap), MetaMask tab. Clicked button %s successfully", text_btn)
                             confirmation_count += 1
 
                             # Закрываем окно MetaMask после подтверждения
@@ -487,7 +556,7 @@ class KuruSwap:
                         break
 
                     # Небольшая пауза между подтверждениями
-                    time.sleep(2)
+                    wait_point(2)
 
                 if confirmation_count > 0:
                     logger.info(f"Successfully processed {confirmation_count} MetaMask confirmations")
@@ -516,7 +585,10 @@ def kuru(driver, mm_address):
     # global next_attempt, result_data
     try:
         # Создаем экземпляр класса для работы с Kuru Swap
-        kuru_swap = KuruSwap(driver)
+        # Снимки портфеля (MON + все токены toket_address_list) одним Multicall3-вызовом
+        portfolio = PortfolioSnapshotService(toket_address_list) if get_settings().kuru_balance_source == 'rpc' else None
+        portfolio_before = None
+        kuru_swap = KuruSwap(driver, balance_provider=portfolio)
         result_data = {
             'activity_type': 'Kuru_Swap',
             'status': 'error',
@@ -527,7 +599,7 @@ def kuru(driver, mm_address):
 
         # Открываем сайт
         random_address = random.choice(toket_address_list)
-        logger.debug(f"Случайный токен: {random_address}")
+        logger.debug("Случайный токен: %s", random_address)
 
         if not kuru_swap.open_website(to_token=random_address):
             logger.error("Failed to open website Kuru")
@@ -540,41 +612,66 @@ def kuru(driver, mm_address):
             result_data['details'] = {'error': 'Failed to connect wallet'}
             return result_data
 
+        def add_portfolio(details: Dict[str, Any]) -> Dict[str, Any]:
+            """Добавляет в details снимки портфеля до/после и изменения балансов."""
+            if not portfolio_before:
+                return details
+            try:
+                portfolio_after = portfolio.snapshot(mm_address)
+            except BalanceProviderError as e:
+                logger.warning(f' (kuru), Снимок портфеля после свапов не получен: {e}')
+                return details
+            details['portfolio'] = {
+                'before': snapshot_to_details(portfolio_before),
+                'after': snapshot_to_details(portfolio_after),
+                'changes': diff_snapshots(portfolio_before, portfolio_after),
+            }
+            return details
+
+        if portfolio:
+            try:
+                portfolio_before = portfolio.snapshot(mm_address)
+            except BalanceProviderError as e:
+                logger.warning(f' (kuru), Снимок портфеля не получен, балансы будут прочитаны со страницы: {e}')
+                kuru_swap.balance_provider = None
+
         # Получаем информацию по токенам до первого свапа
         token_info_before_swap = kuru_swap.get_token_info()
         if not token_info_before_swap:
             logger.error("Failed to get initial token info")
-            result_data['details'] = {'error': 'Failed to get initial token info'}
+            result_data['details'] = {'error': f'Failed to get initial token info: {kuru_swap.token_info_status}'}
             return result_data
 
         # Первый свап (продажа MON или другого токена)
         first_swap_details = {}
-        if token_info_before_swap['selling_token']['number_tokens'] > 0.2 and \
+        if balance_is_enough(token_info_before_swap['selling_token']['number_tokens'], get_settings().min_mon_balance_for_swap) and \
                 token_info_before_swap['selling_token']['symbol'].lower() == 'mon':
 
             if not kuru_swap.swap(token_info_before_swap):
                 logger.error(f"Failed to swap {token_info_before_swap['selling_token']['symbol']} tokens")
-                result_data['details'] = {'error': f'First swap failed: from: {token_info_before_swap["selling_token"]["symbol"]} to: {token_info_before_swap["buying_token"]["symbol"]}'}
+                result_data['details'] = {'error': f'First swap failed: from: {token_info_before_swap["selling_token"]["symbol"]} to: {token_info_before_swap["buying_token"]["symbol"]}',
+                                          **SWAP_STATUS_CLASSIFIER.page_details(driver)}
                 # Sent to Telegram
                 return result_data
             # Sent to Telegram
             logger.info(f'First swap successful,\n'
                         f' from: {token_info_before_swap["selling_token"]["symbol"]} to: {token_info_before_swap["buying_token"]["symbol"]}')
 
-            # Получаем информацию после первого свапа
-            token_info_after_swap = kuru_swap.get_token_info()
+            # Получаем информацию после первого свапа: ждем, пока баланс продаваемого токена изменится
+            token_info_after_swap = kuru_swap.get_token_info(kuru_swap.SWAP_BALANCE_DEADLINE,
+                                                             changed_from=token_info_before_swap)
             if not token_info_after_swap:
                 logger.error("Failed to get token info after first swap")
-                result_data['details'] = {'error': 'Failed to get token info after first swap'}
+                result_data['details'] = {'error': f'Failed to get token info after first swap: {kuru_swap.token_info_status}'}
                 # Sent to Telegram
                 return result_data
 
             # Вычисляем изменения после первого свапа
-            sold_tokens = token_info_before_swap['selling_token']['number_tokens'] - \
-                          token_info_after_swap['selling_token']['number_tokens']
+            sold_tokens = -amount_delta(token_info_before_swap['selling_token']['number_tokens'],
+                                        token_info_after_swap['selling_token']['number_tokens'])
 
-            bought_tokens = token_info_after_swap['buying_token']['number_tokens'] - \
-                            token_info_before_swap['buying_token']['number_tokens']
+            bought_tokens = amount_delta(token_info_before_swap['buying_token']['number_tokens'],
+                                         token_info_after_swap['buying_token']['number_tokens'])
 
             logger.info(f'First swap: \n'
                         f'Продано токенов: {sold_tokens} {token_info_before_swap['selling_token']['symbol']} tokens\n'
@@ -582,10 +679,10 @@ def kuru(driver, mm_address):
 
             first_swap_details = {
                 'first_swap': {
-                    'sold_before_after': f'{token_info_before_swap["selling_token"]["number_tokens"]} - {token_info_after_swap["selling_token"]["number_tokens"]}',
-                    'sold_tokens_symbol': f'{sold_tokens} {token_info_before_swap["selling_token"]["symbol"]}',
-                    'bought_before_after': f'{token_info_before_swap["buying_token"]["number_tokens"]} - {token_info_after_swap["buying_token"]["number_tokens"]}',
-                    'bought_tokens_symbol': f'{bought_tokens} {token_info_after_swap["buying_token"]["symbol"]}',
+                    'sold_before_after': f'{format_amount(token_info_before_swap["selling_token"]["number_tokens"])} - {format_amount(token_info_after_swap["selling_token"]["number_tokens"])}',
+                    'sold_tokens_symbol': f'{format_amount(sold_tokens)} {token_info_before_swap["selling_token"]["symbol"]}',
+                    'bought_before_after': f'{format_amount(token_info_before_swap["buying_token"]["number_tokens"])} - {format_amount(token_info_after_swap["buying_token"]["number_tokens"])}',
+                    'bought_tokens_symbol': f'{format_amount(bought_tokens)} {token_info_after_swap["buying_token"]["symbol"]}',
                 }
             }
             # Sent to Telegram
@@ -612,25 +709,25 @@ def kuru(driver, mm_address):
                 result_data['details'] = {'error': 'Failed to connect wallet'}
                 return result_data
 
-            # Получаем информацию для обратного свапа
-            time.sleep(3)
-            token_info_before_reverse_swap = kuru_swap.get_token_info()
-            if not token_info_before_reverse_swap:
-                logger.error("Failed to get token info for reverse swap")
-                result_data['details'] = {**first_swap_details, 'error': 'Failed to connect wallet'}
-                return result_data
-
             # Выполняем обратный свап
             max_attempts = 5
             attempt = 0
             while attempt < max_attempts:
                 attempt += 1
-                logger.debug(f'Attempt for reverse swap №: {attempt}')
-                time.sleep(3)
+                logger.debug('Attempt for reverse swap №: %s', attempt)
+                wait_point(3)
+
+                # Балансы перед каждой попыткой: предыдущая могла пройти в блокчейне, хотя свап вернул ошибку
+                token_info_before_reverse_swap = kuru_swap.get_token_info()
+                if not token_info_before_reverse_swap:
+                    logger.error("Failed to get token info for reverse swap")
+                    result_data['details'] = {**first_swap_details, 'error': f'Failed to get token info for reverse swap: {kuru_swap.token_info_status}'}
+                    return result_data
 
                 if not kuru_swap.swap(token_info_before_reverse_swap):
                     logger.error(
-                        f"Failed to reverse swap {token_info_before_reverse_swap['selling_token']['symbol']} tokens")
+                        f"Failed to reverse swap {token_info_before_reverse_swap['selling_token']['symbol']} tokens "
+                        f"{SWAP_STATUS_CLASSIFIER.page_details(driver)}")
                     continue
                 logger.info(f'Reverse swap successful,\n'
                             f' from: {token_info_before_reverse_swap["selling_token"]["symbol"]} to: {token_info_before_reverse_swap["buying_token"]["symbol"]}')
@@ -638,65 +735,59 @@ def kuru(driver, mm_address):
 
                 # Получаем финальную информацию после обратного свапа
                 driver.refresh()
-                time.sleep(3)
-                token_info_after_reverse_swap = kuru_swap.get_token_info()
+                wait_point(3)
+                token_info_after_reverse_swap = kuru_swap.get_token_info(kuru_swap.SWAP_BALANCE_DEADLINE,
+                                                                         changed_from=token_info_before_reverse_swap)
                 if not token_info_after_reverse_swap:
                     logger.error("Failed to get token info after reverse swap")
-                    result_data['details'] = {**first_swap_details, 'error': 'Failed to get token info after reverse swap'}
+                    result_data['details'] = {**first_swap_details, 'error': f'Failed to get token info after reverse swap: {kuru_swap.token_info_status}'}
                     # Sent to Telegram
                     return result_data
 
                 # Вычисляем изменения после обратного свапа
-                reverse_sold_tokens = token_info_before_reverse_swap['selling_token']['number_tokens'] - \
-                                      token_info_after_reverse_swap['selling_token']['number_tokens']
+                reverse_sold_tokens = -amount_delta(token_info_before_reverse_swap['selling_token']['number_tokens'],
+                                                    token_info_after_reverse_swap['selling_token']['number_tokens'])
 
-                reverse_bought_tokens = token_info_after_reverse_swap['buying_token']['number_tokens'] - \
-                                        token_info_before_reverse_swap['buying_token']['number_tokens']
+                reverse_bought_tokens = amount_delta(token_info_before_reverse_swap['buying_token']['number_tokens'],
+                                                     token_info_after_reverse_swap['buying_token']['number_tokens'])
                 logger.info(
                     f'Обратный свап. Продано токенов: {reverse_sold_tokens} {token_info_before_reverse_swap['selling_token']['symbol']} tokens')
                 logger.info(f'Обратный свап. Куплено токенов: {reverse_bought_tokens} {token_info_after_reverse_swap['buying_token']['symbol']} tokens')
                 # Sent to Telegram
 
                 # Проверяем, что свапы были успешными
-                if (token_info_before_swap['selling_token']['number_tokens'] >
-                        token_info_after_swap['selling_token']['number_tokens'] and
-                        token_info_before_swap['buying_token']['number_tokens'] <
-                        token_info_after_swap['buying_token']['number_tokens'] and
-                        token_info_before_reverse_swap['selling_token']['number_tokens'] >
-                        token_info_after_reverse_swap['selling_token']['number_tokens'] and
-                        token_info_before_reverse_swap['buying_token']['number_tokens'] <
-                        token_info_after_reverse_swap['buying_token']['number_tokens']):
+                if (swap_applied(token_info_before_swap, token_info_after_swap) and
+                        swap_applied(token_info_before_reverse_swap, token_info_after_reverse_swap)):
                     # Успешное выполнение
-                    wait_minutes = random.randint(MIN_WAIT_TIME_BETWEEN_SWAP, MAX_WAIT_TIME_BETWEEN_SWAP)
-                    next_attempt = (datetime.now() + timedelta(minutes=wait_minutes)).strftime("%Y-%m-%d %H:%M:%S")
+                    next_attempt = (datetime.now() + get_settings().random_swap_wait()).strftime("%Y-%m-%d %H:%M:%S")
 
                     result_data.update({
                         'status': 'success',
                         'next_attempt': next_attempt,
-                        'details': {
+                        'details': add_portfolio({
                             **first_swap_details,
                             'second_swap': {
-                                'sold_before_after': f'{token_info_before_reverse_swap["selling_token"]["number_tokens"]} - {token_info_after_reverse_swap["selling_token"]["number_tokens"]}',
-                                'sold_tokens_symbol': f'{reverse_sold_tokens} {token_info_before_reverse_swap["selling_token"]["symbol"]}',
-                                'bought_before_after': f'{token_info_before_reverse_swap["buying_token"]["number_tokens"]} - {token_info_after_reverse_swap["buying_token"]["number_tokens"]}',
-                                'bought_tokens_symbol': f'{reverse_bought_tokens} {token_info_after_reverse_swap["buying_token"]["symbol"]}',
+                                'sold_before_after': f'{format_amount(token_info_before_reverse_swap["selling_token"]["number_tokens"])} - {format_amount(token_info_after_reverse_swap["selling_token"]["number_tokens"])}',
+                                'sold_tokens_symbol': f'{format_amount(reverse_sold_tokens)} {token_info_before_reverse_swap["selling_token"]["symbol"]}',
+                                'bought_before_after': f'{format_amount(token_info_before_reverse_swap["buying_token"]["number_tokens"])} - {format_amount(token_info_after_reverse_swap["buying_token"]["number_tokens"])}',
+                                'bought_tokens_symbol': f'{format_amount(reverse_bought_tokens)} {token_info_after_reverse_swap["buying_token"]["symbol"]}',
                             }
-                        }
+                        })
                     })
                     return result_data
                 else:
                     logger.error(f"Swap completed but token amounts didn't change as expected. Attempt for reverse swap №: {attempt}")
-                    result_data['details'] = {'error': f'Swap completed but token amounts didn\'t change as expected, Attempt for reverse swap №: {attempt}'}
+                    result_data['details'] = {'error': f'Swap completed but token amounts didn\'t change as expected, Attempt for reverse swap №: {attempt}',
+                                              **SWAP_STATUS_CLASSIFIER.page_details(driver)}
                     continue
 
             # Если не удалось выполнить обратный свап после всех попыток
-            wait_minutes = random.randint(MIN_WAIT_TIME_BETWEEN_SWAP, MAX_WAIT_TIME_BETWEEN_SWAP)
-            next_attempt = (datetime.now() + timedelta(minutes=wait_minutes)).strftime("%Y-%m-%d %H:%M:%S")
+            next_attempt = (datetime.now() + get_settings().random_swap_wait()).strftime("%Y-%m-%d %H:%M:%S")
             # next_attempt = (datetime.now() + timedelta(minutes=10)).strftime("%Y-%m-%d %H:%M:%S")
             result_data.update({
                 'status': 'error',
                 'next_attempt': next_attempt,
-                'details': {**first_swap_details, 'error': 'Reverse swap failed after max attempts'}
+                'details': add_portfolio({**first_swap_details, 'error': 'Reverse swap failed after max attempts'})
             })
             return result_data
 
@@ -709,4 +800,14 @@ def kuru(driver, mm_address):
     except Exception as e:
         logger.error(f'Error in kuru function: {str(e)}')
         result_data['details'] = {'error': str(e)}
-        return result_data
\ No newline at end of file
+        return result_data
+
+
+register_activity(ActivityPlugin(
+    'Kuru_Swap', kuru,
+    cooldown=lambda: get_settings().random_swap_wait(),
+    required_balance=lambda: (NATIVE_TOKEN, get_settings().min_mon_balance_for_swap),
+    expected_duration=240,  # Прямой и обратный свап с подтверждениями MetaMask
+    cost=Decimal('0.02'),  # Газ двух свапов, MON
+    after=('Monad_Faucet_Portal',),  # Свап после пополнения MON краном в той же сессии
+))
@@ -0,0 +1,164 @@
+"""
+Снимки портфеля кошелька через Multicall3.
+
+Балансы MON и всех отслеживаемых ERC-20 токенов читаются одним eth_call к
+Multicall3.aggregate3 на зафиксированном блоке. Снимок кешируется по номеру
+блока: пока блок не изменился, повторные запросы балансов обходятся одним
+eth_blockNumber.
+"""
+from typing import Dict, Any, List, Sequence, Tuple
+
+from amounts import from_base_units
+from config import logger
+from kuru.balance_provider import (BalanceProvider, BalanceProviderError, RpcBalanceProvider, NATIVE_TOKEN,
+                                   BALANCE_OF_SELECTOR, encode_address)
+
+# Multicall3 развернут по одному адресу во всех EVM-сетях, включая Monad Testnet
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+AGGREGATE3_SELECTOR = '82ad56cb'  # aggregate3((address,bool,bytes)[])
+GET_ETH_BALANCE_SELECTOR = '4d2301cc'  # getEthBalance(address)
+
+
+def encode_aggregate3(calls: Sequence[Tuple[str, str]]) -> str:
+    """
+    Кодирует вызов aggregate3 для списка (target, calldata hex) с allowFailure=true.
+    """
+    heads, tails = [], []
+    offset = 32 * len(calls)
+    for target, calldata in calls:
+        data = bytes.fromhex(calldata.replace('0x', ''))
+        padded = data.ljust((len(data) + 31) // 32 * 32, b'\x00')
+        tuple_hex = (encode_address(target) + (1).to_bytes(32, 'big').hex() + (96).to_bytes(32, 'big').hex()
+                     + len(data).to_bytes(32, 'big').hex() + padded.hex())
+        heads.append(offset.to_bytes(32, 'big').hex())
+        tails.append(tuple_hex)
+        offset += len(tuple_hex) // 2
+    return ('0x' + AGGREGATE3_SELECTOR + (32).to_bytes(32, 'big').hex() + len(calls).to_bytes(32, 'big').hex()
+            + ''.join(heads) + ''.join(tails))
+
+
+def decode_aggregate3(result: str) -> List[Tuple[bool, bytes]]:
+    """Декодирует ответ aggregate3: список (success, returnData)."""
+    data = bytes.fromhex(result.replace('0x', ''))
+
+    def word(position: int) -> int:
+        return int.from_bytes(data[position:position + 32], 'big')
+
+    array_start = word(0)
+    count = word(array_start)
+    items_start = array_start + 32
+    decoded = []
+    for index in range(count):
+        tuple_start = items_start + word(items_start + 32 * index)
+        success = bool(word(tuple_start))
+        bytes_start = tuple_start + word(tuple_start + 32)
+        length = word(bytes_start)
+        decoded.append((success, data[bytes_start + 32:bytes_start + 32 + length]))
+    return decoded
+
+
+class PortfolioSnapshotService(BalanceProvider):
+    """Снимки балансов кошелька по всем отслеживаемым токенам одним Multicall3-вызовом."""
+
+    def __init__(self, tokens: Sequence[str], rpc: RpcBalanceProvider = None,
+                 multicall_address: str = MULTICALL3_ADDRESS):
+        """
+        Args:
+            tokens: Адреса отслеживаемых ERC-20 токенов (MON добавляется автоматически)
+            rpc: JSON-RPC клиент (по умолчанию network_config['default_rpc_url'])
+            multicall_address: Адрес контракта Multicall3
+        """
+        self.rpc = rpc or RpcBalanceProvider()
+        self.multicall_address = multicall_address
+        self.tokens = [NATIVE_TOKEN] + [token for token in tokens if token.lower() != NATIVE_TOKEN]
+        self.cache: Dict[str, Dict[str, Any]] = {}  # Последний снимок по адресу кошелька
+
+    def snapshot(self, wallet_address: str, extra_tokens: Sequence[str] = ()) -> Dict[str, Any]:
+        """
+        Возвращает снимок портфеля на текущем блоке.
+
+        Args:
+            wallet_address: Адрес кошелька
+            extra_tokens: Токены сверх отслеживаемых только для этого снимка (снимок не кэшируется)
+
+        Returns:
+            {'block': int, 'balances': {token_address: {'symbol': str, 'number_tokens': Decimal, 'decimals': int}}}
+            Токены, для которых не получены метаданные или баланс, в balances отсутствуют.
+        """
+        block_hex = self.rpc.batch_call([{'method': 'eth_blockNumber', 'params': []}])[0]
+        if block_hex is None:
+            raise BalanceProviderError('eth_blockNumber returned no result')
+        block = int(block_hex, 16)
+
+        cached = None if extra_tokens else self.cache.get(wallet_address.lower())
+        if cached and cached['block'] == block:
+            return cached
+
+        # Токены без метаданных в снимок не попадают
+        tokens = self.rpc.load_token_meta(self.tokens + list(extra_tokens))
+        calls = []
+        for token in tokens:
+            if token == NATIVE_TOKEN:
+                calls.append((self.multicall_address, GET_ETH_BALANCE_SELECTOR + encode_address(wallet_address)))
+            else:
+                calls.append((token, BALANCE_OF_SELECTOR + encode_address(wallet_address)))
+
+        result = self.rpc.batch_call([{
+            'method': 'eth_call',
+            'params': [{'to': self.multicall_address, 'data': encode_aggregate3(calls)}, hex(block)],
+        }])[0]
+        if not result or result == '0x':
+            raise BalanceProviderError(f'Multicall3 aggregate3 returned no data at block {block}')
+
+        balances = {}
+        for token, (success, data) in zip(tokens, decode_aggregate3(result)):
+            if not success or len(data) < 32:
+                logger.warning(f' (PortfolioSnapshotService.snapshot), Баланс токена {token} не получен')
+                continue
+            meta = self.rpc.token_meta[token.lower()]
+            balances[token] = {
+                'symbol': meta['symbol'],
+                'number_tokens': from_base_units(int.from_bytes(data[:32], 'big'), meta['decimals']),
+                'decimals': meta['decimals'],
+            }
+
+        snapshot = {'block': block, 'balances': balances}
+        if not extra_tokens:
+            self.cache[wallet_address.lower()] = snapshot
+        logger.debug(f' (PortfolioSnapshotService.snapshot), {wallet_address} @ {block}: {balances}')
+        return snapshot
+
+    def get_balances(self, wallet_address: str, tokens: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        tracked = {token.lower() for token in self.tokens}
+        untracked = [token for token in tokens if token.lower() not in tracked]  # Список отслеживаемых не меняется
+        snapshot = self.snapshot(wallet_address, untracked)
+        balances = {token.lower(): value for token, value in snapshot['balances'].items()}
+        try:
+            return {token: balances[token.lower()] for token in tokens}
+        except KeyError as e:
+            raise BalanceProviderError(f'No balance in snapshot for token {e}') from e
+
+
+def snapshot_to_details(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Преобразует снимок в JSON-совместимый вид для поля details активности.
+
+    Балансы по адресу токена (символы токенов могут совпадать): {token_address: {'symbol', 'amount'}}.
+    """
+    return {
+        'block': snapshot['block'],
+        'balances': {token: {'symbol': value['symbol'], 'amount': format(value['number_tokens'].normalize(), 'f')}
+                     for token, value in snapshot['balances'].items()},
+    }
+
+
+def diff_snapshots(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    """Изменения балансов между двумя снимками (только ненулевые), {token_address: {'symbol', 'delta': '+1.5'}}."""
+    changes = {}
+    for token, value in after['balances'].items():
+        if token not in before['balances']:
+            continue
+        delta = value['number_tokens'] - before['balances'][token]['number_tokens']
+        if delta:
+            changes[token] = {'symbol': value['symbol'], 'delta': format(delta.normalize(), '+f')}
+    return changes
@@ -0,0 +1,25 @@
+"""
+Адреса токенов Kuru для свапов и сканирования балансов.
+
+Модуль без импортов: список используют kuru.kuru (свапы в браузере) и scan_balances.py
+(без браузера и selenium).
+"""
+
+toket_address_list = [
+'0xf817257fed379853cDe0fa4F97AB987181B1E5Ea',
+'0x3a98250F98Dd388C211206983453837C8365BDc1',
+'0xfe140e1dce99be9f4f15d657cd9b7bf622270c50',
+'0xe0590015a873bf326bd645c3e1266d4db41c4e6b',
+'0x0f0bdebf0f83cd1ee3974779bcb7315f9808c714',
+'0xb5a30b0fdc5ea94a52fdc42e3e9760cb8449fb37',
+# '0xcf5a6076cfa32686c0df13abada2b40dec133f1d',  # WBTC
+'0xabd7afa2161eb7254c0a9dbb5fe79216b7c28e03',
+# '0x39e95286dd43f8da34cbda8e4b656da9f53ca644',  #AXO
+'0x743cef7ccc8ac56605c8404607142e5b35efa11d',
+'0x268e4e24e0051ec27b3d27a95977e71ce6875a05',
+'0x4c10428ed0410dfb2de62fc007f7c1105ae861e9',
+'0x2bb4219b8e85c111613f3ee192a115676f230d35',
+'0x8507f576eb214d172012065d58cfb38a4540b0a6',
+'0x859fb36f3fe7e22b37dd99b501f891377ddc9c33',
+'0x53abd7e17c8939558bfa80a721e01633a3ef9d5c',
+]
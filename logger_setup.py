@@ -1,11 +1,22 @@
+import atexit
+import json
 import logging
+import os
+import queue
+import secrets
 import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional
 
 import colorlog
 
-# Константы для форматов логирования
-LOG_FORMAT_CONSOLE = '%(log_color)s%(asctime)s - %(levelname)s - %(message)s'
-LOG_FORMAT_FILE = '%(asctime)s - %(levelname)s - %(message)s'
+# Константы для форматов логирования (%(context)s - "[P17 Kuru_Swap] " внутри профиля, иначе пусто)
+LOG_FORMAT_CONSOLE = '%(log_color)s%(asctime)s - %(levelname)s - %(context)s%(message)s'
+LOG_FORMAT_FILE = '%(asctime)s - %(levelname)s - %(context)s%(message)s'
 
 LOG_COLORS = {
     'DEBUG': 'white',
@@ -18,8 +29,15 @@ LOG_COLORS = {
 
 LOG_LEVEL_CONSOLE = logging.DEBUG
 LOG_LEVEL_FILE = logging.DEBUG  # INFO, WARNING
+LOG_FILE = 'app.log'
+LOG_JSON_FILE = 'app.jsonl'  # JSON lines для разбора логов программами
+LOG_MAX_BYTES = 10 * 1024 * 1024  # Размер файла лога до ротации
+LOG_BACKUP_COUNT = 5  # Сколько старых файлов лога хранить (app.log.1 ... app.log.5)
+LOG_DIR = 'logs'  # Логи профилей (logs/profiles) и события запусков (logs/runs)
+MAX_OPEN_LOG_FILES = 32  # Открытых файлов профилей/запусков одновременно, остальные закрываются
 
 logger = None
+listener = None
 
 # Добавляем кастомный уровень UPDATE
 UPDATE_LEVEL = 25
@@ -32,27 +50,205 @@ def update(self, message, *args, **kwargs):
 # Добавляем метод в класс Logger
 logging.Logger.update = update
 
-def setup_logging(log_level="DEBUG"):
-    global logger
+
+# Контекст записи: запуск профиля, номер профиля, Env ID MoreLogin, активность
+LOG_CONTEXT_FIELDS = ('run_id', 'profile', 'env_id', 'activity')
+log_context: ContextVar[Dict[str, Any]] = ContextVar('log_context', default={})
+
+
+def push_log_context(**fields) -> Token:
+    """Добавляет поля в контекст логов текущего потока/задачи; вернуть прежний - pop_log_context(token)."""
+    return log_context.set({**log_context.get(), **{key: value for key, value in fields.items() if value is not None}})
+
+
+def pop_log_context(token: Token):
+    log_context.reset(token)
+
+
+@contextmanager
+def bind_log_context(**fields):
+    """Контекст логов на время блока: with bind_log_context(activity='Kuru_Swap'): ..."""
+    token = push_log_context(**fields)
+    try:
+        yield
+    finally:
+        pop_log_context(token)
+
+
+def new_run_id(profile) -> str:
+    """Идентификатор запуска профиля: дата в начале задает каталог событий запуска (run_log_path)."""
+    return f"{datetime.now():%Y%m%dT%H%M%S}-p{profile}-{secrets.token_hex(3)}"
+
+
+def run_log_path(run_id: str, log_dir: str = LOG_DIR) -> str:
+    """Файл событий запуска: путь вычисляется из run_id, без поиска по логам."""
+    return os.path.join(log_dir, 'runs', run_id[:8], f"{run_id}.jsonl")
+
+
+def read_run_events(run_id: str, log_dir: str = LOG_DIR) -> List[Dict[str, Any]]:
+    """События одного запуска профиля в порядке записи."""
+    with open(run_log_path(run_id, log_dir), encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ContextFilter(logging.Filter):
+    """Переносит контекст логов в поля записи (выполняется в потоке, который пишет лог)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = log_context.get()
+        for field in LOG_CONTEXT_FIELDS:
+            setattr(record, field, context.get(field))
+        parts = [f"P{context['profile']}" if 'profile' in context else None, context.get('activity')]
+        parts = [part for part in parts if part]
+        record.context = f"[{' '.join(parts)}] " if parts else ""
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Одна запись - одна строка JSON: время, уровень, поток, контекст, сообщение (и traceback при наличии)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'thread': record.threadName,
+        }
+        for field in LOG_CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        entry['message'] = record.getMessage()
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class KeyedFileHandler(logging.Handler):
+    """
+    Пишет записи в отдельный файл на значение поля записи (профиль, запуск).
+
+    Работает в потоке QueueListener, поэтому без блокировок; держит открытыми не более
+    MAX_OPEN_LOG_FILES файлов, давно не использованные закрываются.
+    """
+
+    def __init__(self, field: str, path_for: callable, level=logging.NOTSET):
+        super().__init__(level)
+        self.field = field
+        self.path_for = path_for  # Значение поля -> путь к файлу
+        self.streams: "OrderedDict[Any, Any]" = OrderedDict()
+
+    def _stream(self, key):
+        stream = self.streams.pop(key, None)
+        if stream is None:
+            path = self.path_for(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            stream = open(path, 'a', encoding='utf-8')
+            while len(self.streams) >= MAX_OPEN_LOG_FILES:
+                self.streams.popitem(last=False)[1].close()
+        self.streams[key] = stream
+        return stream
+
+    def emit(self, record: logging.LogRecord):
+        key = getattr(record, self.field, None)
+        if key is None:
+            return
+        try:
+            stream = self._stream(key)
+            stream.write(self.format(record) + "\n")
+            stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        for stream in self.streams.values():
+            stream.close()
+        self.streams.clear()
+        super().close()
+
+
+def _level(name, default: int) -> int:
+    return getattr(logging, str(name).upper(), default) if name else default
+
+
+def stop_logging():
+    """Дописывает записи из очереди и останавливает поток записи логов."""
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
+
+
+def setup_logging(log_level="DEBUG", file_level=None, json_lines=False,
+                  max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT,
+                  per_profile=False, run_events=False, log_dir=LOG_DIR):
+    """
+    Настраивает логгер 'main.py'.
+
+    Логгер только кладет записи в очередь (QueueHandler), а консоль и файлы пишет
+    отдельный поток QueueListener: активности в параллельных потоках не ждут запись
+    на диск и не делят один файловый дескриптор. Уровень логгера - минимальный из
+    уровней обработчиков, поэтому logger.debug(...) при уровнях INFO отбрасывается
+    сразу, без формирования записи.
+
+    Args:
+        log_level: Уровень вывода в консоль
+        file_level: Уровень app.log (по умолчанию LOG_LEVEL_FILE)
+        json_lines: Дополнительно писать app.jsonl (JSON на строку)
+        max_bytes: Размер файла лога до ротации
+        backup_count: Количество хранимых старых файлов лога
+        per_profile: Дополнительно писать лог каждого профиля в logs/profiles/profile_<N>.log
+        run_events: Писать события каждого запуска профиля в JSONL-файл запуска (run_log_path)
+        log_dir: Каталог логов профилей и запусков
+    """
+    global logger, listener
     if logger is None:
         logger = logging.getLogger('main.py')
-        logger.setLevel(logging.DEBUG)
 
         # Проверка наличия обработчиков
         if not logger.hasHandlers():
             # Настройка обработчика консоли с цветным выводом
             console_handler = colorlog.StreamHandler(sys.stdout)
-            console_handler.setLevel(
-                getattr(logging, log_level.upper(), logging.DEBUG))  # Установка уровня из параметра
+            console_handler.setLevel(_level(log_level, logging.DEBUG))  # Установка уровня из параметра
             console_formatter = colorlog.ColoredFormatter(LOG_FORMAT_CONSOLE, log_colors=LOG_COLORS)
             console_handler.setFormatter(console_formatter)
-            logger.addHandler(console_handler)
 
-            # Настройка обработчика файла без цветного вывода
-            file_handler = logging.FileHandler('app.log', encoding="utf-8")
-            file_handler.setLevel(LOG_LEVEL_FILE)
+            # Настройка обработчика файла без цветного вывода, с ротацией по размеру
+            file_handler = RotatingFileHandler(LOG_FILE, maxBytes=max_bytes, backupCount=backup_count,
+                                               encoding="utf-8")
+            file_handler.setLevel(_level(file_level, LOG_LEVEL_FILE))
             file_formatter = logging.Formatter(LOG_FORMAT_FILE)
             file_handler.setFormatter(file_formatter)
-            logger.addHandler(file_handler)
+            handlers = [console_handler, file_handler]
+
+            if json_lines:
+                json_handler = RotatingFileHandler(LOG_JSON_FILE, maxBytes=max_bytes, backupCount=backup_count,
+                                                   encoding="utf-8")
+                json_handler.setLevel(file_handler.level)
+                json_handler.setFormatter(JsonLinesFormatter())
+                handlers.append(json_handler)
+
+            if per_profile:
+                profile_handler = KeyedFileHandler(
+                    'profile', lambda profile: os.path.join(log_dir, 'profiles', f"profile_{profile}.log"),
+                    file_handler.level)
+                profile_handler.setFormatter(file_formatter)
+                handlers.append(profile_handler)
+
+            if run_events:
+                run_handler = KeyedFileHandler('run_id', lambda run_id: run_log_path(run_id, log_dir),
+                                               file_handler.level)
+                run_handler.setFormatter(JsonLinesFormatter())
+                handlers.append(run_handler)
+
+            log_queue = queue.SimpleQueue()
+            queue_handler = QueueHandler(log_queue)
+            queue_handler.addFilter(ContextFilter())  # Контекст читается в потоке, который пишет лог
+            logger.addHandler(queue_handler)
+            logger.setLevel(min(handler.level for handler in handlers))
+            listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            listener.start()
+            atexit.register(stop_logging)
 
-    return logger
\ No newline at end of file
+    return logger
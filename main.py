@@ -10,27 +10,27 @@ from datetime import datetime
 
 # Внешние библиотеки
 import asyncio
-import openpyxl
-from openpyxl import Workbook
-from openpyxl.utils.exceptions import InvalidFileException
 
 from automation.run_automation import schedule_next_run, check_auto_mode
-from database import process_activity, DatabaseError, process_random_profile
-from onchaingm.onchaingm import Onchaingm
-from kuru.kuru import kuru
+from automation.daemon import ProfileDaemon
+from database import process_activity, DatabaseError, process_random_profile, SQLiteDatabase
 
 # Локальные модули
+# Модули активностей (kuru, onchaingm, faucet_morkie) загружает activity_registry при первом обращении,
+# openpyxl и hdwallet (create_mm_wallet) импортируются в функциях, где нужны
 from lava_moat import modify_file_runtimelavamoat
-from meta_mask import MetaMaskHelper, check_setup_active_network
-from create_mm_wallet import create_wallet
+from meta_mask import MetaMaskHelper, check_setup_active_network, MM_UNLOCKED
 from config import (
-    logger, DATA_BASE_PATH, WORKSHEET_NAME,
-    MODE_CLOSE_PROFILE, GLOBAL_SETTINGS, MIX_PROFILES, PROFILE_DELAY, AUTO_MODE
+    logger, init_logging, DATA_BASE_PATH, WORKSHEET_NAME,
+    MODE_CLOSE_PROFILE, GLOBAL_SETTINGS, MIX_PROFILES, PROFILE_DELAY, AUTO_MODE, DAEMON_MODE
 )
 from MoreLogin.browser_manager import BrowserManager
+from networks import network_config
+from MoreLogin.session_pool import WarmSession, warm_pool
+from address_cache import address_cache, precompute_workbook
+from logger_setup import new_run_id, push_log_context, pop_log_context
+from utils import save_workbook_cells
 
-# Проверяем режим работы в начале выполнения
-check_auto_mode()
 
 
 def create_password():
@@ -44,8 +44,18 @@ class MainError(Exception):
     pass
 
 
+def log_task_error(task: asyncio.Task):
+    """Callback фоновой задачи: пишет ее исключение в лог (иначе оно теряется до сборки мусора)."""
+    if not task.cancelled() and task.exception():
+        logger.error(f" (log_task_error), Фоновая задача {task.get_name()} завершилась с ошибкой: "
+                     f"{task.exception()!r}")
+
+
 def workbook_worksheet():
     """Инициализация и получение рабочей книги и листа Excel."""
+    import openpyxl
+    from openpyxl.utils.exceptions import InvalidFileException
+
     try:
         workbook_mm = openpyxl.load_workbook(DATA_BASE_PATH)
         worksheet_mm = workbook_mm[WORKSHEET_NAME]
@@ -107,8 +117,28 @@ async def main_flow(
     """Основной рабочий процесс для одного профиля."""
     driver = None
     count = 0
+    # Все логи профиля (включая потоки активностей) получают run_id, номер профиля и Env ID
+    run_id = new_run_id(unique_id)
+    log_token = push_log_context(run_id=run_id, profile=unique_id, env_id=env_id)
+    logger.info(f" (main_flow), Запуск профиля, run_id: {run_id}")
+    close_profile = mode_close_profile_or_not.lower() == "y"
+    wallet_address = None  # Адрес кошелька после успешной работы - профиль можно оставить в пуле
+    failed = False
+    warm = None
     try:
-        while True:
+        # Профиль уже запущен и разблокирован с прошлого раза - сразу к активностям
+        warm = await warm_pool.acquire(env_id) if close_profile else None
+        if warm is not None:
+            try:
+                driver = warm.driver
+                await operation_warm_session(warm, row)
+                wallet_address = warm.wallet_address
+            except Exception as e:
+                logger.warning(f" (main_flow), Профиль №: {unique_id} из пула не отработал ({e}), запуск заново")
+                await warm_pool.discard(warm)
+                driver, warm = None, None
+
+        while wallet_address is None:
             if count <= 3:
                 await asyncio.sleep(5)
             # Запуск профиля
@@ -140,10 +170,10 @@ async def main_flow(
             )
 
             try:
-                await operationEnv(
+                wallet_address = await operationEnv(
                     driver, seed, env_id, password, mm_address,
                     worksheet_mm, workbook_mm, row, DATA_BASE_PATH
-                )
+                ) or ""  # "" - активности не выполнялись, профиль в пул не попадает
                 break
             except Exception as e:
                 logger.error(f"Error in operationEnv: {e}")
@@ -152,6 +182,7 @@ async def main_flow(
                 continue
 
     except Exception as e:
+        failed = True
         logger.error(
             f" (main_flow) ERROR in Profile №: {unique_id}, Env_Name: {env_name}, Env ID: {env_id}, Ошибка: {e}"
         )
@@ -159,18 +190,23 @@ async def main_flow(
 
     finally:
         # Завершаем профиль корректно
-        if driver and mode_close_profile_or_not.lower() == "y":
+        if driver and close_profile:
             try:
                 close_tabs = MetaMaskHelper(driver)
                 close_tabs.delete_others_windows()
-                driver.quit()
-                await BrowserManager.stop_browser_profile(env_id)
+                if warm_pool.enabled and wallet_address and not failed:
+                    # Не закрываем: следующий запуск профиля возьмет его из пула
+                    await warm_pool.release(warm or WarmSession(env_id, driver, wallet_address))
+                else:
+                    driver.quit()
+                    await BrowserManager.stop_browser_profile(env_id)
                 # Добавляем сообщение о завершении работы с профилем
                 logger.warning(
                     f"\n{'#' * 20} (main_flow) SCRIPT ENDED for Profile №: {unique_id}, Env_Name: {env_name}, Env ID: {env_id} {'#' * 20}\n"
                 )
             except Exception as e:
                 logger.error(f"Error closing browser profile: {e}")
+        pop_log_context(log_token)
 
 
 async def read_user_list_file(
@@ -197,20 +233,21 @@ async def read_user_list_file(
                 if password is None and seed:
                     password = create_password()
                     worksheet_mm.cell(row=row, column=2).value = password
-                    workbook_mm.save(DATA_BASE_PATH)
+                    save_workbook_cells(DATA_BASE_PATH, worksheet_mm.title, {(row, 2): password})
                     logger.info(
                         f"[NEW PASSWORD] Для Профиль № {unique_id} создан новый пароль."
                     )
 
                 # Проверка и создание нового кошелька если отсутствует seed
                 if seed is None:
+                    from create_mm_wallet import create_wallet  # hdwallet нужен только для новых кошельков
+
                     seed, mm_address, private_key = create_wallet()
                     password = create_password()  # Создаем новый пароль для нового кошелька
-                    worksheet_mm.cell(row=row, column=2).value = password
-                    worksheet_mm.cell(row=row, column=3).value = seed
-                    worksheet_mm.cell(row=row, column=4).value = mm_address
-                    worksheet_mm.cell(row=row, column=5).value = private_key
-                    workbook_mm.save(DATA_BASE_PATH)
+                    new_cells = {(row, 2): password, (row, 3): seed, (row, 4): mm_address, (row, 5): private_key}
+                    for (cell_row, column), value in new_cells.items():
+                        worksheet_mm.cell(row=cell_row, column=column).value = value
+                    save_workbook_cells(DATA_BASE_PATH, worksheet_mm.title, new_cells)
                     logger.info(
                         f"[NEW WALLET] Для Профиль № {unique_id} создан новый кошелек:\n"
                         f"Адрес: {mm_address}\n"
@@ -366,6 +403,44 @@ def get_user_input():
         raise MainError(f"Failed to get user input: {e}")
 
 
+async def operation_warm_session(warm, row):
+    """
+    Активности в профиле из пула.
+
+    Перед активностями одним probe_state проверяется, что MetaMask разблокирован и выбрана
+    сеть Monad (кошелек мог заблокироваться по таймеру, сеть - смениться). Иначе MainError:
+    main_flow закрывает профиль и запускает его заново с разблокировкой и выбором сети.
+    """
+    driver = warm.driver
+    logger.debug(f" (operation_warm_session) STEP 2 <<< Профиль из пула, кошелек: {warm.wallet_address} >>>")
+    mm = MetaMaskHelper(driver)
+    mm.delete_others_windows()  # Остается одна вкладка с главной страницей MetaMask
+    probe = mm.probe_state(timeout=10)
+    if probe['state'] != MM_UNLOCKED:
+        raise MainError(f"MetaMask не разблокирован: {probe['state']}")
+    if "Monad" not in (probe['network'] or ""):
+        # Сохраненная в БД настройка сети больше не верна - при запуске заново сеть проверяется
+        SQLiteDatabase().mark_network_configured(warm.env_id, network_config['chain_id'], configured=False)
+        raise MainError(f"Активна сеть {probe['network']}, а не Monad")
+    driver.switch_to.window(driver.window_handles[0])
+    process_activity(driver, warm.wallet_address, row, activity_types=None)
+
+
+def ensure_profile_network(mm, env_id):
+    """Monad Testnet в MetaMask профиля с учетом сохраненного в БД результата прошлых запусков."""
+    chain_id = network_config['chain_id']
+    try:
+        db = SQLiteDatabase()
+    except DatabaseError:
+        db = None  # Без БД сеть проверяется при каждом запуске
+    if db is not None and db.is_network_configured(env_id, chain_id):
+        logger.debug(f" (ensure_profile_network), Сеть уже настроена в профиле {env_id}, проверка пропущена")
+        return
+    configured = check_setup_active_network(mm, target_network="Monad")
+    if db is not None:
+        db.mark_network_configured(env_id, chain_id, configured)
+
+
 async def operationEnv(
         driver, seed, env_id, password, mm_address, worksheet_mm, workbook_mm, row, file_path
 ):
@@ -404,17 +479,16 @@ async def operationEnv(
                 logger.error(f"Error in MetaMask operation: {e}")
                 raise
 
-            # Проверяем активную сеть, меняем на Monad Testnet, если ее нет то устанавливаем
-            check_setup_active_network(mm, target_network="Monad")
+            # Проверяем активную сеть, меняем на Monad Testnet, если ее нет то устанавливаем.
+            # Профиль, где сеть уже настраивалась за последние NETWORK.CHECK_TTL_HOURS, не проверяется
+            ensure_profile_network(mm, env_id)
 
             time.sleep(5)
             # Проверка БД на предмет наступления времени в необходимости выполнения активности faucet_morkie
             # и занесением результата в БД.
+            wallet_address = wallet_mm_from_browser_extension or mm_address
             try:
-                if wallet_mm_from_browser_extension:
-                    process_activity(driver, wallet_mm_from_browser_extension, row, activity_types=None)
-                else:
-                    process_activity(driver, mm_address, row, activity_types=None)
+                process_activity(driver, wallet_address, row, activity_types=None)
             except DatabaseError as e:
                 logger.error(f"Database error in operationEnv: {e}")
                 raise
@@ -431,7 +505,7 @@ async def operationEnv(
             # mm.open_tab(f"https://testnet.monadexplorer.com/address/{wallet_mm_from_browser_extension}")
             # mm.open_tab("https://debank.com/profile/" + wallet_mm_from_browser_extension)
 
-
+            return wallet_address
 
     except Exception as e:
         logger.error(f"Error in operationEnv: {e}")
@@ -474,6 +548,8 @@ async def main():
             workbook_mm, worksheet_mm = workbook_worksheet()
         else:
             logger.info(f" (main) DATABASE База данных отсутствует. Создание нового файла базы данных.")
+            from openpyxl import Workbook
+
             workbook_mm = Workbook()
             worksheet_mm = workbook_mm.active
             worksheet_mm.title = WORKSHEET_NAME
@@ -507,6 +583,12 @@ async def main():
             logger.info("Profiles have been shuffled")
 
         logger.info(f"Будет обработано профилей: {len(profiles)}")
+        # Адреса по сид-фразам вычисляются в фоне, проверка адреса в MetaMask берет их из кэша
+        # (ссылка на задачу хранится до конца main, иначе ее может удалить сборщик мусора)
+        precompute_task = asyncio.create_task(
+            asyncio.to_thread(address_cache.precompute, [profile[2] for profile in profiles]),
+            name="precompute_addresses")
+        precompute_task.add_done_callback(log_task_error)
 
         for idx, profile in enumerate(profiles, 1):
             try:
@@ -563,6 +645,7 @@ async def main():
         logger.error(f"Unexpected error in main: {e}")
         sys.exit(1)
     finally:
+        await warm_pool.close_all()
         total_time = datetime.now() - script_start
         logger.info(f"\nСкрипт завершен. Общее время: {total_time}")
 
@@ -577,9 +660,63 @@ async def main():
         logger.info(f"\n Успешно обработано {count_profile} {profile_word} из {len(profiles)}\n")
 
 
+async def launch_daemon_profile(row, wallet_address, activities):
+    """Обработка одного профиля в постоянном режиме (ProfileDaemon)."""
+    workbook_mm, worksheet_mm = workbook_worksheet()
+    profiles = await read_user_list_file(worksheet_mm, row, row, "n", workbook_mm)
+    unique_id, password, seed, mm_address, private_key, worksheet_mm, workbook_mm, excel_row = profiles[0]
+    env_id, unique_id, env_name = await BrowserManager.get_list_browser_profiles(unique_id)
+    logger.update(
+        f"\n{'=' * 80}\n"
+        f"Обработка Профиль № {unique_id} (постоянный режим): {activities}\n"
+        f"Имя: {env_name}, Адрес: {mm_address}\n"
+        f"{'=' * 80}\n"
+    )
+    # Selenium блокирует поток, поэтому каждый профиль работает в своем потоке и своем цикле событий,
+    # а очередь ProfileDaemon продолжает запускать другие профили
+    await asyncio.to_thread(
+        asyncio.run,
+        main_flow(env_id, seed, password, env_name, unique_id, mm_address, worksheet_mm, workbook_mm, excel_row, "y")
+    )
+
+
+def read_workbook_profiles():
+    """Профили DB.xlsx с сид-фразой для постоянного режима: [(номер профиля, адрес или None), ...]."""
+    workbook_mm, worksheet_mm = workbook_worksheet()
+    try:
+        return [
+            (index, address if isinstance(address, str) and address.startswith('0x') else None)
+            for index, (_, _, seed, address) in enumerate(
+                worksheet_mm.iter_rows(min_row=2, max_col=4, values_only=True), 1)
+            if seed
+        ]
+    finally:
+        workbook_mm.close()
+
+
+async def run_daemon():
+    """Постоянный режим: профили запускаются по мере наступления времени их активностей."""
+    logger.info("Начало работы скрипта в постоянном режиме")
+    # Адреса всех профилей DB.xlsx
+    precompute_task = asyncio.create_task(asyncio.to_thread(precompute_workbook), name="precompute_workbook")
+    precompute_task.add_done_callback(log_task_error)
+    try:
+        # При каждом поиске новых профилей закрываются простаивающие профили пула
+        await ProfileDaemon(launch_daemon_profile, housekeeping=warm_pool.sweep,
+                            profiles=read_workbook_profiles).run()
+    finally:
+        await warm_pool.close_all()
+
+
 if __name__ == "__main__":
+    init_logging()
+    # Постоянный режим: расписание ведет сам процесс, Task Scheduler не используется
+    daemon_run = DAEMON_MODE or "--daemon" in sys.argv
+    if not daemon_run:
+        # Проверяем режим работы в начале выполнения (при AUTO_MODE: false удаляет задачу Task Scheduler)
+        check_auto_mode()
     try:
-        asyncio.run(main())
+        asyncio.run(run_daemon() if daemon_run else main())
     except KeyboardInterrupt:
         logger.info("\nСкрипт остановлен пользователем")
         sys.exit(0)
@@ -1,22 +1,302 @@
 # Стандартные библиотеки
 import platform
+import threading
 import time
 import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pprint import pprint
+from typing import Dict, Optional, Sequence
 
 # Сторонние библиотеки
-import pyperclip
-from selenium.common import WebDriverException
+from selenium.common import NoSuchWindowException, WebDriverException
 from selenium.webdriver import ActionChains, Keys
-from selenium.webdriver.common.actions.action_builder import ActionBuilder
-from selenium.webdriver.common.actions.pointer_input import PointerInput
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 # Локальные модули
-from config import logger
+from address_cache import address_cache
+from config import logger, get_settings
+from networks import network_config
 from SeleniumUtilities.selenium_utilities import SeleniumUtilities
+from status_classifier import PAGE_TEXT_SCRIPT
+from utils import save_workbook_cells
+
+
+# Состояния MetaMask по результату probe_state
+MM_UNLOCKED = 'unlocked'  # Главная страница кошелька
+MM_LOCKED = 'locked'  # Экран разблокировки паролем
+MM_ONBOARDING = 'onboarding'  # Первоначальная настройка (импорт сид-фразы)
+MM_ONBOARDING_UNLOCK = 'onboarding_unlock'  # Разблокировка после настройки
+MM_UNKNOWN = 'unknown'  # Страница не загрузилась или не распознана
+
+# Один execute_async_script: ждет отрисовки MetaMask (до arguments[1] мс) и определяет маршрут,
+# состояние, активную сеть и ошибку пароля. arguments[2] - список состояний, которых нужно дождаться
+# (например, unlocked после нажатия Unlock); ошибка пароля завершает ожидание сразу.
+PROBE_STATE_SCRIPT = """
+var done = arguments[arguments.length - 1], networkXPath = arguments[0], timeoutMs = arguments[1],
+    wanted = arguments[2] || [], started = Date.now();
+function visible(selector) {
+    var el = document.querySelector(selector);
+    return el && el.offsetParent !== null ? el : null;
+}
+function probe() {
+    var route = window.location.hash.replace(/^#/, ''), state = null, network = null, error = null;
+    if (route.indexOf('onboarding/unlock') === 0) {
+        state = 'onboarding_unlock';
+    } else if (route.indexOf('onboarding') === 0 || visible('[data-testid="onboarding-get-started-button"]')) {
+        state = 'onboarding';
+    } else if (route.indexOf('unlock') === 0 || visible('[data-testid="unlock-page"]')) {
+        state = 'locked';
+    } else if (visible('[data-testid="app-header-copy-button"]') || visible('[data-testid="network-display"]')) {
+        state = 'unlocked';
+        var node = document.evaluate(networkXPath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null)
+            .singleNodeValue || document.querySelector('[data-testid="network-display"]');
+        network = node ? node.textContent.trim() : null;
+    }
+    var helper = document.getElementById('password-helper-text');
+    error = helper && helper.textContent.trim() ? helper.textContent.trim() : null;
+    var ready = state && (!wanted.length || wanted.indexOf(state) !== -1 || error);
+    if (ready || Date.now() - started > timeoutMs) {
+        done({state: state || 'unknown', route: route, network: network, error: error});
+    } else {
+        setTimeout(probe, 100);
+    }
+}
+probe();
+"""
+
+
+# Сокращенный адрес из шапки MetaMask (кнопка копирования), ждет отрисовки до arguments[0] мс
+READ_SHORT_ADDRESS_SCRIPT = """
+var done = arguments[arguments.length - 1], timeoutMs = arguments[0], started = Date.now();
+(function poll() {
+    var button = document.querySelector('[data-testid="app-header-copy-button"]');
+    var text = button ? button.textContent.trim() : '';
+    if (text.indexOf('0x') === 0 || Date.now() - started > timeoutMs) { done(text || null); }
+    else { setTimeout(poll, 100); }
+})();
+"""
+
+# Полный адрес через кнопку копирования MetaMask, но без системного буфера обмена: запись
+# перехватывается в странице (navigator.clipboard.writeText и событие copy), поэтому
+# параллельные профили не читают адреса друг друга. После захвата writeText восстанавливается,
+# чтобы копирование в MetaMask работало как обычно
+CAPTURE_COPIED_ADDRESS_SCRIPT = """
+var done = arguments[arguments.length - 1], copied = null;
+var button = document.querySelector('[data-testid="app-header-copy-button"]');
+if (!button) { done(null); return; }
+var clipboard = navigator.clipboard, originalWriteText = clipboard && clipboard.writeText,
+    ownWriteText = clipboard && Object.prototype.hasOwnProperty.call(clipboard, 'writeText');
+if (clipboard) {
+    clipboard.writeText = function (text) { copied = text; return Promise.resolve(); };
+}
+function onCopy(event) {
+    copied = copied || (event.clipboardData && event.clipboardData.getData('text/plain'))
+        || String(document.getSelection() || '');
+    event.preventDefault();
+}
+function restore() {
+    document.removeEventListener('copy', onCopy, true);
+    if (!clipboard) { return; }
+    if (ownWriteText) { clipboard.writeText = originalWriteText; } else { delete clipboard.writeText; }
+}
+document.addEventListener('copy', onCopy, true);
+try {
+    button.click();
+} catch (e) {
+    restore();
+    done(null);
+    return;
+}
+setTimeout(function () {
+    restore();
+    done(copied ? copied.trim() : null);
+}, 300);
+"""
+
+
+SEED_WORD_COUNTS = (12, 15, 18, 21, 24)  # Длины сид-фраз BIP39, которые принимает MetaMask
+
+# Ввод сид-фразы одним execute_async_script (arguments[0] - слова, arguments[1] - ожидание полей, мс).
+# Сначала вставка всей фразы в первое поле (MetaMask сам раскладывает слова по полям), если поля
+# не заполнились - значения задаются напрямую через setter React с событием input. Возвращает
+# {ok, method, filled, mismatched: [номера полей]} - слова в ответ не попадают.
+FILL_SEED_SCRIPT = """
+var done = arguments[arguments.length - 1], words = arguments[0], timeoutMs = arguments[1], started = Date.now();
+var setValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+var setSelect = Object.getOwnPropertyDescriptor(HTMLSelectElement.prototype, 'value').set;
+function field(i) { return document.getElementById('import-srp__srp-word-' + i); }
+function check(method) {
+    var mismatched = [];
+    for (var i = 0; i < words.length; i++) {
+        if (!field(i) || field(i).value !== words[i]) { mismatched.push(i); }
+    }
+    return {ok: mismatched.length === 0, method: method, filled: words.length - mismatched.length,
+            mismatched: mismatched};
+}
+function chooseWordCount() {
+    var selects = document.querySelectorAll('select');
+    for (var i = 0; i < selects.length; i++) {
+        var select = selects[i];
+        for (var j = 0; j < select.options.length; j++) {
+            if (select.options[j].value === String(words.length) && select.value !== String(words.length)) {
+                setSelect.call(select, String(words.length));
+                select.dispatchEvent(new Event('change', {bubbles: true}));
+                return;
+            }
+        }
+    }
+}
+function typeValues() {
+    for (var i = 0; i < words.length; i++) {
+        var input = field(i);
+        if (!input) { continue; }
+        input.focus();
+        setValue.call(input, words[i]);
+        input.dispatchEvent(new Event('input', {bubbles: true}));
+        input.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+    done(check('values'));
+}
+function paste() {
+    var first = field(0);
+    try {
+        var data = new DataTransfer();
+        data.setData('text/plain', words.join(' '));
+        first.focus();
+        first.dispatchEvent(new ClipboardEvent('paste', {clipboardData: data, bubbles: true, cancelable: true}));
+    } catch (e) { typeValues(); return; }
+    setTimeout(function () {
+        var result = check('paste');
+        if (result.ok) { done(result); } else { typeValues(); }
+    }, 200);
+}
+var countChosen = false;
+(function waitFields() {
+    if (field(0) && !countChosen) {
+        chooseWordCount();  // Для 24 слов поля появляются после выбора длины фразы
+        countChosen = true;
+    }
+    if (field(words.length - 1)) {
+        paste();
+    } else if (Date.now() - started > timeoutMs) {
+        done({ok: false, method: null, filled: 0, mismatched: []});
+    } else {
+        setTimeout(waitFields, 100);
+    }
+})();
+"""
+
+
+# Локальная страница для запросов к провайдеру MetaMask (window.ethereum внедряется только
+# в http(s)-страницы, не в chrome-extension:// и не в data:)
+NETWORK_HELPER_HTML = b"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Network helper</title></head>" \
+                      b"<body>Network helper</body></html>"
+PROVIDER_APPROVE_BUTTONS = ("Connect", "Approve", "Switch network", "Confirm")  # Кнопки окна MetaMask по порядку
+METAMASK_EXTENSION_URL = "chrome-extension://nkbihfbeogaeaoehlefnkodbefgpgknn/"  # Окна MetaMask
+METAMASK_POPUP_PAGE = "notification.html"  # Всплывающее окно запроса к MetaMask
+PROVIDER_POPUP_WAIT = 5  # Ожидание отрисовки запроса во всплывающем окне, сек
+
+# Запускает wallet_switchEthereumChain (при коде 4902 - wallet_addEthereumChain) и сразу возвращается:
+# подтверждение в окне MetaMask нажимает Python, результат ждет в window.__networkResult.
+# После запроса разрешения страницы отзываются (wallet_revokePermissions): адрес 127.0.0.1:<порт>
+# не остается подключенным к кошельку ни в одном профиле
+SWITCH_NETWORK_SCRIPT = """
+var done = arguments[arguments.length - 1], chain = arguments[0], started = Date.now();
+(function waitProvider() {
+    if (window.ethereum) {
+        window.__networkResult = null;
+        var ethereum = window.ethereum;
+        function revoke() {
+            // Разрешение, выданное при подключении, не оставляем локальной странице
+            return ethereum.request({method: 'wallet_revokePermissions', params: [{eth_accounts: {}}]})
+                .catch(function () { return null; });
+        }
+        function finish(ok, error) {
+            ethereum.request({method: 'eth_chainId'}).then(function (chainId) {
+                return revoke().then(function () {
+                    window.__networkResult = {ok: ok && chainId === chain.chainId, chainId: chainId, error: error};
+                });
+            }, function () {
+                return revoke().then(function () {
+                    window.__networkResult = {ok: false, chainId: null, error: error};
+                });
+            });
+        }
+        ethereum.request({method: 'wallet_switchEthereumChain', params: [{chainId: chain.chainId}]})
+            .then(function () { finish(true, null); }, function (error) {
+                if (error && (error.code === 4902 || (error.data && error.data.originalError &&
+                                                      error.data.originalError.code === 4902))) {
+                    ethereum.request({method: 'wallet_addEthereumChain', params: [chain]})
+                        .then(function () { finish(true, null); },
+                              function (addError) { finish(false, addError.message || String(addError)); });
+                } else {
+                    finish(false, error && (error.message || String(error)));
+                }
+            });
+        done(true);
+    } else if (Date.now() - started > 5000) {
+        done(false);
+    } else {
+        setTimeout(waitProvider, 100);
+    }
+})();
+"""
+
+_helper_server = None
+_helper_lock = threading.Lock()
+
+
+class _NetworkHelperHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(NETWORK_HELPER_HTML)
+
+    def log_message(self, format, *args):
+        pass  # Запросы браузера не пишем в лог
+
+
+def network_helper_url() -> str:
+    """Адрес локальной страницы для запросов к провайдеру (сервер запускается при первом обращении)."""
+    global _helper_server
+    with _helper_lock:
+        if _helper_server is None:
+            try:
+                _helper_server = ThreadingHTTPServer(("127.0.0.1", get_settings().network_helper_port),
+                                                     _NetworkHelperHandler)
+            except OSError:
+                _helper_server = ThreadingHTTPServer(("127.0.0.1", 0), _NetworkHelperHandler)  # Порт занят
+            threading.Thread(target=_helper_server.serve_forever, name="network-helper", daemon=True).start()
+        return f"http://127.0.0.1:{_helper_server.server_address[1]}/"
+
+
+def provider_chain_params() -> dict:
+    """Параметры Monad Testnet для wallet_addEthereumChain (EIP-3085)."""
+    return {
+        'chainId': hex(int(network_config['chain_id'])),
+        'chainName': network_config['network_name'],
+        'nativeCurrency': {'name': network_config['currency_symbol'],
+                           'symbol': network_config['currency_symbol'], 'decimals': 18},
+        'rpcUrls': [network_config['default_rpc_url']],
+        'blockExplorerUrls': [network_config['block_explorer_url']],
+    }
+
+
+def is_network_request_text(text: str, helper_url: str) -> bool:
+    """
+    Текст окна MetaMask - запрос локальной страницы на добавление или выбор Monad Testnet.
+
+    Запрос должен исходить от адреса helper_url (127.0.0.1:<порт>) и называть ожидаемую сеть:
+    chain ID (десятичный или hex) или ее имя из network_config.
+    """
+    text = (text or '').lower()
+    origin = helper_url.split('://', 1)[-1].strip('/')
+    chain_id = int(network_config['chain_id'])
+    markers = (str(chain_id), hex(chain_id), network_config['network_name'].lower())
+    return origin in text and any(marker in text for marker in markers)
 
 
 def compare_addresses(full_address: str, short_address: str, prefix_length: int = 4,
@@ -49,9 +329,31 @@ def compare_addresses(full_address: str, short_address: str, prefix_length: int
 class MetaMaskHelper(SeleniumUtilities):
     def __init__(self, driver):
         self.driver = driver
-        self.base_url = "chrome-extension://nkbihfbeogaeaoehlefnkodbefgpgknn/home.html#"
+        self.base_url = f"{METAMASK_EXTENSION_URL}home.html#"
         self.network_manager = self.NetworkManager(self.driver)
 
+    def probe_state(self, timeout: float = 15, wait_for: Sequence[str] = ()) -> Dict[str, Optional[str]]:
+        """
+        Определяет состояние MetaMask на текущей странице за один вызов WebDriver.
+
+        Args:
+            timeout: Сколько секунд ждать отрисовки страницы MetaMask
+            wait_for: Ждать одно из этих состояний (MM_UNLOCKED и т.д.), а не первое распознанное
+
+        Returns:
+            {'state': MM_*, 'route': маршрут после '#', 'network': активная сеть (если кошелек
+            разблокирован), 'error': текст ошибки пароля}
+        """
+        try:
+            result = self.driver.execute_async_script(
+                PROBE_STATE_SCRIPT, self.NetworkManager.NETWORK_DISPLAY[1], int(timeout * 1000), list(wait_for))
+        except WebDriverException as e:
+            logger.debug("(probe_state) Состояние MetaMask не определено: %s", e)
+            result = None
+        state = result or {'state': MM_UNKNOWN, 'route': None, 'network': None, 'error': None}
+        logger.debug("(probe_state) MetaMask: %s", state)
+        return state
+
     def check_page_url(self, expected_url=None):
         """Проверяет текущий URL страницы."""
         time.sleep(3)
@@ -61,52 +363,37 @@ class MetaMaskHelper(SeleniumUtilities):
         logger.debug(f"(check_page_url) Current URL: {current_url}, Expected: {expected}, Match: {match}")
         return match
 
-    def check_wallet_mm(self, mm_address):
-        """Проверяет адрес кошелька в MetaMask."""
-        self.driver.refresh()
-        self.driver.get(f"{self.base_url}")
+    def check_wallet_mm(self, mm_address, seed=None):
+        """
+        Определяет адрес активного аккаунта MetaMask без системного буфера обмена.
 
-        # Для клика в стороне модального окна, чтобы его закрыть
-        # Получить размеры окна браузера
-        viewport_width = self.driver.execute_script("return window.innerWidth;")
-        viewport_height = self.driver.execute_script("return window.innerHeight;")
-
-        # Вычислить координаты (25% от левого края, 25% от верха)
-        x = int(viewport_width * 0.25)
-        y = int(viewport_height * 0.25)
-
-        # Добавить красную точку в вычисленных координатах
-        self.driver.execute_script(f"""
-            var dot = document.createElement('div');
-            dot.style.position = 'absolute';
-            dot.style.left = '{x}px';
-            dot.style.top = '{y}px';
-            dot.style.width = '10px';
-            dot.style.height = '10px';
-            dot.style.backgroundColor = 'red';
-            dot.style.zIndex = '9999';
-            document.body.appendChild(dot);
-        """)
-        time.sleep(5)
-
-        # Выполнить клик
-        actions_builder = ActionBuilder(self.driver, mouse=PointerInput("mouse", "default"))
-        actions_builder.pointer_action.move_to_location(x, y).click()
-        actions_builder.perform()
-        time.sleep(1)
+        Адрес из БД, затем адрес из сид-фразы (первый аккаунт MetaMask) сверяются с сокращенным
+        адресом в шапке кошелька; если ни один не совпал (выбран другой аккаунт), полный адрес
+        берется кнопкой копирования с перехватом записи внутри страницы этого драйвера.
 
+        Returns:
+            Адрес кошелька или None
+        """
+        self.driver.get(f"{self.base_url}")
         try:
-            copy_btn = self.find_element_safely(
-                self.driver,
-                By.CSS_SELECTOR,
-                '[data-testid="app-header-copy-button"]',
-                timeout=15
-            )
-
-            if copy_btn and self.click_safely(copy_btn):
-                logger.debug("(check_wallet_mm) Кнопка копирования нажата успешно")
-                wallet_address = pyperclip.paste()
+            short_address = self.driver.execute_async_script(READ_SHORT_ADDRESS_SCRIPT, 15000)
+            if not short_address:
+                logger.error("(check_wallet_mm) Адрес в шапке MetaMask не найден")
+                return None
+
+            if mm_address and compare_addresses(mm_address, short_address):
+                logger.debug("(check_wallet_mm) Адрес из БД совпадает с MetaMask: %s", short_address)
+                return mm_address
+            seed_address = address_cache.expected_address(seed) if seed else None
+            if seed_address and compare_addresses(seed_address, short_address):
+                logger.debug("(check_wallet_mm) Адрес по сид-фразе совпадает с MetaMask: %s", seed_address)
+                return seed_address
+
+            wallet_address = self.driver.execute_async_script(CAPTURE_COPIED_ADDRESS_SCRIPT)
+            if wallet_address and compare_addresses(wallet_address, short_address):
+                logger.debug("(check_wallet_mm) Адрес получен кнопкой копирования: %s", wallet_address)
                 return wallet_address
+            logger.error(f"(check_wallet_mm) Полный адрес для {short_address} не получен")
 
         except Exception as e:
             logger.error(f"(check_wallet_mm) Ошибка: {e}")
@@ -114,21 +401,26 @@ class MetaMaskHelper(SeleniumUtilities):
 
         return None
 
-    def check_mm_data_base(self, mm_address, row, workbook_mm, worksheet_mm, file_path):
+    def check_mm_data_base(self, mm_address, row, workbook_mm, worksheet_mm, file_path, seed=None):
         """Сравнивает адрес кошелька с базой данных и обновляет при необходимости."""
-        wallet_from_extension = self.check_wallet_mm(mm_address)
+        wallet_from_extension = self.check_wallet_mm(mm_address, seed)
 
         if not wallet_from_extension:
             logger.error("(check_mm_data_base) Не удалось получить адрес из расширения")
             return None
 
+        expected = address_cache.get(seed) if seed else None
+        if expected and expected.lower() != wallet_from_extension.lower():
+            logger.warning(f"(check_mm_data_base) В MetaMask выбран аккаунт {wallet_from_extension}, "
+                           f"по сид-фразе ожидается {expected}")
+
         if wallet_from_extension == mm_address:
             logger.update(f"(check_mm_data_base) Адреса совпадают: {mm_address} = {wallet_from_extension}")
             return wallet_from_extension
 
         # Обновление адреса в БД
         worksheet_mm.cell(row=row + 1, column=4).value = wallet_from_extension
-        workbook_mm.save(file_path)
+        save_workbook_cells(file_path, worksheet_mm.title, {(row + 1, 4): wallet_from_extension})
 
         if mm_address:
             logger.update(
@@ -267,16 +559,34 @@ class MetaMaskHelper(SeleniumUtilities):
         return False
 
     def fill_seed(self, seed):
-        """Заполнение сид-фразы по словам в 12 полей."""
+        """
+        Заполнение сид-фразы одним вызовом WebDriver (FILL_SEED_SCRIPT) с проверкой полей.
+
+        Если поля не заполнились (изменилась разметка MetaMask), фраза вводится по словам.
+        """
+        seed_words = seed.split()
+        if len(seed_words) not in SEED_WORD_COUNTS:
+            logger.error(f"(fill_seed) Сид-фраза должна содержать {', '.join(map(str, SEED_WORD_COUNTS))} слов, "
+                         f"получено {len(seed_words)}")
+            return False
+
         try:
-            # Разбиваем сид-фразу на отдельные слова
-            seed_words = seed.split()
-            if len(seed_words) != 12:
-                logger.error("(fill_seed) Сид-фраза должна содержать ровно 12 слов")
-                return False
+            result = self.driver.execute_async_script(FILL_SEED_SCRIPT, seed_words, 10000)
+        except WebDriverException as e:
+            logger.debug("(fill_seed) Ввод одним вызовом не выполнен: %s", e)
+            result = None
+        if result and result['ok']:
+            logger.debug(f"(fill_seed) Сид-фраза введена ({result['method']}), слов: {result['filled']}")
+            return True
+
+        logger.warning(f"(fill_seed) Сид-фраза не введена одним вызовом ({result}), ввод по словам")
+        return self.fill_seed_by_words(seed_words)
 
+    def fill_seed_by_words(self, seed_words):
+        """Заполнение сид-фразы по словам, каждое слово в свое поле."""
+        try:
             # Заполняем каждое поле отдельно
-            for i in range(12):
+            for i in range(len(seed_words)):
                 field = self.find_element_safely(
                     self.driver,
                     By.ID,
@@ -527,48 +837,65 @@ class MetaMaskHelper(SeleniumUtilities):
             logger.debug("(pop_up_window_close) Всплывающее окно не найдено")
             return False
 
-    def starting_metamask(self, seed, password):
-        """Основной процесс запуска MetaMask."""
-        self.delete_others_windows()
-        self.open_tab(f"{self.base_url}unlock")
+    def unlock_with_password(self, seed, password):
+        """Ввод пароля на экране разблокировки; при неверном пароле - восстановление по сид-фразе."""
+        if not (self.enter_password(password) and self.click_unlock_button()):
+            return False
 
-        onboarding_welcome = 'chrome-extension://nkbihfbeogaeaoehlefnkodbefgpgknn/home.html#onboarding/welcome'
+        probe = self.probe_state(timeout=10, wait_for=(MM_UNLOCKED,))
+        if probe['state'] == MM_UNLOCKED:
+            self.pop_up_window_close()
+            return True
 
-        if self.unlock():
-            if self.enter_password(password) and self.click_unlock_button():
+        if self.handle_incorrect_password():
+            logger.info("(starting_metamask) Восстановление кошелька")
+            if self.input_seed_phrase_and_password_restore_vault(seed, password):
                 self.pop_up_window_close()
-                if self.check_page_url():
-                    return True
+                return True
+        return False
 
-                if self.handle_incorrect_password():
-                    logger.info("(starting_metamask) Восстановление кошелька")
-                    if self.input_seed_phrase_and_password_restore_vault(seed, password):
-                        self.pop_up_window_close()
-                        return True
+    def onboard_and_unlock(self, seed, password):
+        """Первоначальная настройка: импорт сид-фразы и разблокировка."""
+        logger.info("(starting_metamask) Первоначальная настройка")
+        if self.onboard_page(seed, password):
+            if self.check_page_url(f"{self.base_url}onboarding/pin-extension"):
+                self.pop_up_window_close()
+                self.pop_up_window_close()
+                self.con_eth_network_window_close()
 
-        elif self.get_started():
-            logger.info("(starting_metamask) Первоначальная настройка")
-            if self.onboard_page(seed, password):
-                if self.check_page_url(f"{self.base_url}onboarding/pin-extension"):
-                    self.pop_up_window_close()
-                    self.pop_up_window_close()
-                    self.con_eth_network_window_close()
-
-
-                time.sleep(5)
-                if self.onboarding_unlock():
-                    if self.enter_password(password) and self.click_unlock_button():
-                        self.pop_up_window_close()
-                        if self.check_page_url():
-                            return True
-
-                        if self.handle_incorrect_password():
-                            logger.info("(starting_metamask) Восстановление кошелька")
-                            if self.input_seed_phrase_and_password_restore_vault(seed, password):
-                                self.pop_up_window_close()
-                                return True
-                return True
+            time.sleep(5)
+            if self.onboarding_unlock():
+                return self.unlock_with_password(seed, password)
+            return True  # Экрана разблокировки нет - кошелек открыт после настройки
+        return False
 
+    def starting_metamask(self, seed, password):
+        """
+        Основной процесс запуска MetaMask.
+
+        Состояние кошелька определяется одним probe_state: разблокированный кошелек (профиль
+        из пула, кошелек без автоблокировки) не проходит экран разблокировки, для остальных
+        сразу выполняется нужный шаг.
+        """
+        self.delete_others_windows()
+        probe = self.probe_state()
+        state = probe['state']
+
+        if state == MM_UNLOCKED:
+            logger.info(f"(starting_metamask) MetaMask уже разблокирован, сеть: {probe['network']}")
+            return True
+        if state in (MM_LOCKED, MM_ONBOARDING_UNLOCK):
+            return self.unlock_with_password(seed, password)
+        if state == MM_ONBOARDING:
+            return self.get_started() and self.onboard_and_unlock(seed, password)
+
+        # Состояние не распознано (изменилась разметка MetaMask) - прежний путь через страницу unlock
+        logger.warning(f"(starting_metamask) Состояние MetaMask не распознано: {probe}")
+        self.open_tab(f"{self.base_url}unlock")
+        if self.unlock():
+            return self.unlock_with_password(seed, password)
+        if self.get_started():
+            return self.onboard_and_unlock(seed, password)
         return False
 
     def meta_mask(self, seed, password, mm_address, row, workbook_mm, worksheet_mm, file_path):
@@ -582,7 +909,8 @@ class MetaMaskHelper(SeleniumUtilities):
                 row,
                 workbook_mm,
                 worksheet_mm,
-                file_path
+                file_path,
+                seed
             )
         return None
 
@@ -626,6 +954,88 @@ class MetaMaskHelper(SeleniumUtilities):
         def __init__(self, driver):
             self.driver = driver
 
+        def switch_via_provider(self, timeout: float = 60) -> bool:
+            """
+            Добавление и выбор Monad Testnet запросом к провайдеру MetaMask с локальной страницы.
+
+            Открывает network_helper_url в новой вкладке, отправляет wallet_switchEthereumChain
+            (wallet_addEthereumChain, если сети нет) и подтверждает запросы в окнах MetaMask.
+            Разрешение страницы на доступ к аккаунтам затем отзывается (wallet_revokePermissions).
+            Вкладка закрывается, драйвер возвращается в исходное окно.
+            """
+            original = self.driver.current_window_handle
+            self.driver.switch_to.new_window('tab')
+            helper = self.driver.current_window_handle
+            result = None
+            try:
+                self.driver.get(network_helper_url())
+                if not self.driver.execute_async_script(SWITCH_NETWORK_SCRIPT, provider_chain_params()):
+                    logger.warning(" (switch_via_provider), Провайдер MetaMask на странице не найден")
+                    return False
+
+                deadline = time.monotonic() + timeout
+                while time.monotonic() < deadline:
+                    self.driver.switch_to.window(helper)
+                    result = self.driver.execute_script("return window.__networkResult;")
+                    if result:
+                        break
+                    self._approve_provider_windows(helper, original)
+                    time.sleep(0.5)
+
+                logger.debug(f" (switch_via_provider), Результат: {result}")
+                return bool(result and result['ok'])
+            except Exception as e:
+                logger.error(f" (switch_via_provider), Ошибка переключения сети: {e}")
+                return False
+            finally:
+                try:
+                    if helper in self.driver.window_handles:
+                        self.driver.switch_to.window(helper)
+                        self.driver.close()
+                    self.driver.switch_to.window(original)
+                except Exception as e:
+                    logger.debug(f" (switch_via_provider), Окно не восстановлено: {e}")
+
+        def _approve_provider_windows(self, *own_windows):
+            """
+            Нажимает кнопку подтверждения во всплывающих окнах MetaMask с запросом сети.
+
+            Окна сайтов, других расширений и вкладки MetaMask не трогаются: только всплывающие окна
+            METAMASK_EXTENSION_URL. Подтверждается лишь запрос локальной страницы на добавление или
+            выбор ожидаемой сети (is_network_request_text), остальные всплывающие окна закрываются.
+            """
+            helper_url = network_helper_url()
+            for window in self.driver.window_handles:
+                if window in own_windows:
+                    continue
+                try:
+                    self.driver.switch_to.window(window)
+                    url = self.driver.current_url
+                    if not url.startswith(METAMASK_EXTENSION_URL) or METAMASK_POPUP_PAGE not in url:
+                        continue
+                    if not self._wait_network_request(helper_url):
+                        logger.warning(f" (switch_via_provider), Окно MetaMask не относится к запросу сети, "
+                                       f"закрываем: {url}")
+                        self.driver.close()
+                        continue
+                except NoSuchWindowException:
+                    continue  # Окно закрылось после подтверждения
+                for text in PROVIDER_APPROVE_BUTTONS:
+                    button = SeleniumUtilities.find_button_by_text(self.driver, text, timeout=1)
+                    if button and SeleniumUtilities.click_safely(button):
+                        logger.info(f" (switch_via_provider), Подтверждение в MetaMask: <{text}>")
+                        break
+
+        def _wait_network_request(self, helper_url: str, timeout: float = PROVIDER_POPUP_WAIT) -> bool:
+            """Ждет, пока во всплывающем окне отрисуется запрос сети от локальной страницы."""
+            deadline = time.monotonic() + timeout
+            while True:
+                if is_network_request_text(self.driver.execute_script(PAGE_TEXT_SCRIPT), helper_url):
+                    return True
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.5)
+
         def add_custom_network(self):
             """Добавление кастомной сети по оригинальному алгоритму"""
             try:
@@ -759,7 +1169,7 @@ class MetaMaskHelper(SeleniumUtilities):
 
 
             if main_block:
-                logger.debug(f' (try_to_find_monad_testnet), main_block получен: {main_block}')
+                logger.debug(' (try_to_find_monad_testnet), main_block получен: %s', main_block)
                 res_info = SeleniumUtilities.parse_interactive_elements(main_block[0])
 
                 el_res = res_info['elements_info']
@@ -845,17 +1255,22 @@ class MetaMaskHelper(SeleniumUtilities):
                 return False
 
 
-network_config = {
-    'network_name': 'Monad Testnet',
-    'default_rpc_url': 'https://testnet-rpc.monad.xyz',
-    'chain_id': '10143',
-    'currency_symbol': 'MON',
-    'block_explorer_url': 'https://testnet.monadexplorer.com'
-}
-
+def check_setup_active_network(mm, target_network) -> bool:
+    """
+    Выбирает сеть target_network в MetaMask.
 
-def check_setup_active_network(mm, target_network):
+    Сначала читается активная сеть (probe_state), затем сеть добавляется/выбирается запросом
+    к провайдеру (NETWORK.VIA_PROVIDER) и только при неудаче - через меню MetaMask.
+    """
+    network = mm.probe_state(timeout=5)['network']
+    if network and target_network in network:
+        logger.info(f"Сеть {network} уже активна\n")
+        return True
+    if get_settings().network_via_provider and mm.network_manager.switch_via_provider():
+        logger.info("Monad Testnet активирована запросом к провайдеру MetaMask\n")
+        return True
     if mm.network_manager.ensure_monad_testnet_active(target_network):
         logger.info("Monad Testnet успешно активирована\n")
-    else:
-        logger.error("Не удалось активировать Monad Testnet\n")
\ No newline at end of file
+        return True
+    logger.error("Не удалось активировать Monad Testnet\n")
+    return False
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""
+Параметры сети Monad Testnet.
+
+Вынесены из meta_mask.py, чтобы модули без браузера (балансы по RPC,
+scan_balances, симулятор узла) не импортировали selenium ради одного словаря.
+"""
+
+network_config = {
+    'network_name': 'Monad Testnet',
+    'default_rpc_url': 'https://testnet-rpc.monad.xyz',
+    'chain_id': '10143',
+    'currency_symbol': 'MON',
+    'block_explorer_url': 'https://testnet.monadexplorer.com'
+}
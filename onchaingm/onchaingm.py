@@ -12,6 +12,15 @@ from meta_mask import MetaMaskHelper, compare_addresses
 from SeleniumUtilities.selenium_utilities import SeleniumUtilities
 from config import logger
 from utils import adjust_window_position, random_number_for_sell
+from activity_registry import ActivityPlugin, register_activity
+from status_classifier import StatusClassifier
+
+# Сообщения onchaingm и MetaMask о подключении кошелька в порядке приоритета (для details при ошибке)
+STATUS_RULES = [
+    ('rejected', [r'User rejected', r'rejected the request', r'Connection request reset']),
+    ('failed', [r'Failed to connect', r'Something went wrong', r'\berror\b']),
+]
+STATUS_CLASSIFIER = StatusClassifier(STATUS_RULES)
 
 
 #  Click button <text....>
@@ -329,4 +338,27 @@ class Onchaingm:
     #                 'error': str(e),
     #                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     #             }
-    #         }
\ No newline at end of file
+    #         }
+
+
+def process_onchaingm(driver, wallet_address: str) -> Dict[str, Any]:
+    """Точка входа активности Onchaingm для планировщика: результат в формате записи БД."""
+    result = Onchaingm(driver).onchaingm()
+    if isinstance(result, dict):
+        result['wallet_address'] = wallet_address
+        return result
+    return {
+        'activity_type': 'Onchaingm',
+        'status': 'success' if result else 'error',
+        'wallet_address': wallet_address,
+        'next_attempt': None,
+        'details': {} if result else {'error': 'Failed to connect wallet', **STATUS_CLASSIFIER.page_details(driver)},
+    }
+
+
+register_activity(ActivityPlugin(
+    'Onchaingm', process_onchaingm,
+    cooldown=lambda: timedelta(hours=24),
+    expected_duration=60,
+    value=0.5,
+))
@@ -0,0 +1,60 @@
+"""
+Просмотр событий запусков профилей (logs/runs/<дата>/<run_id>.jsonl).
+
+run_id пишется в лог в начале main_flow ("Запуск профиля, run_id: ..."), файл
+запуска находится по нему сразу, без поиска по общему app.log.
+
+Запуск из корня проекта:
+    python run_log.py 20261019T065411-p17-a1b2c3
+    python run_log.py 20261019T065411-p17-a1b2c3 --level WARNING
+    python run_log.py --profile 17
+"""
+import argparse
+import glob
+import os
+from typing import List
+
+from logger_setup import LOG_DIR, read_run_events
+
+LEVELS = ['DEBUG', 'INFO', 'UPDATE', 'WARNING', 'ERROR', 'CRITICAL']
+
+
+def list_runs(profile, log_dir: str = LOG_DIR) -> List[str]:
+    """run_id запусков профиля, от старых к новым (run_id начинается с даты и времени)."""
+    paths = glob.glob(os.path.join(log_dir, 'runs', '*', f"*-p{profile}-*.jsonl"))
+    return sorted(os.path.splitext(os.path.basename(path))[0] for path in paths)
+
+
+def print_run(run_id: str, level: str, log_dir: str = LOG_DIR):
+    min_index = LEVELS.index(level)
+    for event in read_run_events(run_id, log_dir):
+        if event.get('level') in LEVELS and LEVELS.index(event['level']) < min_index:
+            continue
+        activity = f"[{event['activity']}] " if event.get('activity') else ""
+        print(f"{event['time']} {event['level']:<8} {activity}{event['message']}")
+        if event.get('exc_info'):
+            print(event['exc_info'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="События запуска профиля по run_id")
+    parser.add_argument("run_id", nargs="?", help="Идентификатор запуска")
+    parser.add_argument("--profile", help="Показать список запусков профиля")
+    parser.add_argument("--level", default="DEBUG", choices=LEVELS, help="Минимальный уровень событий")
+    parser.add_argument("--log-dir", default=LOG_DIR, help="Каталог логов")
+    args = parser.parse_args()
+
+    if args.profile:
+        runs = list_runs(args.profile, args.log_dir)
+        print("\n".join(runs) if runs else f"Запусков профиля {args.profile} не найдено")
+        return
+    if not args.run_id:
+        parser.error("укажите run_id или --profile")
+    try:
+        print_run(args.run_id, args.level, args.log_dir)
+    except FileNotFoundError:
+        print(f"Событий запуска {args.run_id} не найдено")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Сканирование балансов всех кошельков из DB.xlsx без запуска браузерных профилей.
+
+Адреса читаются из Excel-базы (столбец Address), балансы MON и токенов
+kuru.tokens.toket_address_list запрашиваются пакетными JSON-RPC запросами через
+asyncio/aiohttp с пулом соединений и ограничением параллельности. Результат
+сохраняется в таблицу balances SQLite-базы активностей; планировщик
+(get_random_eligible_profile) по ней пропускает Kuru_Swap для кошельков без MON.
+
+Запуск из корня проекта:
+    python scan_balances.py
+    python scan_balances.py --native-only --concurrency 16 --batch-size 200
+"""
+import argparse
+import asyncio
+import random
+import time
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+import aiohttp
+import openpyxl
+
+from amounts import from_base_units
+from config import logger, get_config, init_logging
+from database import SQLiteDatabase
+from kuru.balance_provider import RpcBalanceProvider, BalanceProviderError, NATIVE_TOKEN, balance_call
+from kuru.tokens import toket_address_list
+from networks import network_config
+
+MAX_RETRIES = 4
+BASE_RETRY_DELAY = 0.5
+
+
+def read_wallets(start_row: int = 1, end_row: Optional[int] = None) -> List[Tuple[int, str]]:
+    """
+    Читает адреса кошельков из Excel-базы.
+
+    Returns:
+        Список (номер профиля, адрес) для строк с заполненным адресом.
+    """
+    config = get_config()
+    workbook = openpyxl.load_workbook(config.file_path, read_only=True)
+    try:
+        worksheet = workbook[config.worksheet_name]
+        wallets = []
+        # Профили начинаются со 2 строки, номер профиля = номер строки - 1
+        for index, row in enumerate(worksheet.iter_rows(min_row=2, max_col=4, values_only=True), 1):
+            if index < start_row or (end_row and index > end_row):
+                continue
+            address = row[3]
+            if isinstance(address, str) and address.startswith('0x') and len(address) == 42:
+                wallets.append((index, address))
+        return wallets
+    finally:
+        workbook.close()
+
+
+class AsyncRpcClient:
+    """Асинхронный JSON-RPC клиент: пакетные запросы, пул соединений и повторы при 429/5xx."""
+
+    def __init__(self, session: aiohttp.ClientSession, rpc_url: str, concurrency: int):
+        self.session = session
+        self.rpc_url = rpc_url
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.stats = {"http_requests": 0, "calls": 0, "retries": 0}
+
+    async def batch_call(self, calls: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Отправляет пакет вызовов одним HTTP-запросом, результаты в порядке вызовов."""
+        payload = [{'jsonrpc': '2.0', 'id': i, **call} for i, call in enumerate(calls)]
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                async with self.semaphore:
+                    self.stats["http_requests"] += 1
+                    async with self.session.post(self.rpc_url, json=payload) as response:
+                        if response.status == 429 or response.status >= 500:
+                            raise aiohttp.ClientResponseError(response.request_info, response.history,
+                                                              status=response.status, message=response.reason)
+                        response.raise_for_status()
+                        answers = await response.json(content_type=None)
+                if isinstance(answers, dict):
+                    raise BalanceProviderError(f'RPC batch rejected: {answers.get("error")}')
+                self.stats["calls"] += len(calls)
+                results: List[Optional[str]] = [None] * len(calls)
+                for answer in answers:
+                    if 'error' not in answer:
+                        results[answer['id']] = answer.get('result')
+                return results
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == MAX_RETRIES:
+                    raise BalanceProviderError(f'RPC request failed after {attempt} attempts: {e}') from e
+                self.stats["retries"] += 1
+                delay = BASE_RETRY_DELAY * (2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+                logger.debug(f" (AsyncRpcClient.batch_call), Повтор через {delay:.2f} сек: {e}")
+                await asyncio.sleep(delay)
+
+
+async def scan_balances(wallets: List[Tuple[int, str]], tokens: List[str], token_meta: Dict[str, Dict[str, Any]],
+                        rpc_url: str, concurrency: int, batch_size: int) -> Tuple[List[Dict[str, Any]], Dict]:
+    """
+    Запрашивает балансы всех кошельков.
+
+    Кошельки группируются так, чтобы в одном JSON-RPC массиве было не больше batch_size вызовов;
+    пакеты отправляются параллельно (не больше concurrency одновременно).
+
+    Returns:
+        (строки для таблицы balances, статистика клиента)
+    """
+    wallets_per_batch = max(1, batch_size // len(tokens))
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        client = AsyncRpcClient(session, rpc_url, concurrency)
+        block_number = int((await client.batch_call([{'method': 'eth_blockNumber', 'params': []}]))[0] or '0x0', 16)
+
+        async def scan_chunk(chunk: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+            calls = [balance_call(address, token) for _, address in chunk for token in tokens]
+            try:
+                results = await client.batch_call(calls)
+            except BalanceProviderError as e:
+                logger.error(f" (scan_balances), Пакет из {len(chunk)} кошельков не получен: {e}")
+                return []
+            rows = []
+            for index, (profile_number, address) in enumerate(chunk):
+                for offset, token in enumerate(tokens):
+                    raw = results[index * len(tokens) + offset]
+                    if raw is None:
+                        continue
+                    meta = token_meta[token.lower()]
+                    amount = from_base_units(int(raw, 16) if raw != '0x' else 0, meta['decimals'])
+                    rows.append({
+                        'wallet_address': address,
+                        'token_address': token,
+                        'profile_number': profile_number,
+                        'symbol': meta['symbol'],
+                        'amount': format(amount.normalize(), 'f'),
+                        'block_number': block_number,
+                    })
+            return rows
+
+        chunks = [wallets[i:i + wallets_per_batch] for i in range(0, len(wallets), wallets_per_batch)]
+        results = await asyncio.gather(*(scan_chunk(chunk) for chunk in chunks))
+    return [row for rows in results for row in rows], client.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сканирование балансов кошельков из DB.xlsx через JSON-RPC")
+    parser.add_argument("--rpc-url", default=network_config['default_rpc_url'], help="Адрес RPC-узла")
+    parser.add_argument("--concurrency", type=int, default=8, help="Максимум одновременных HTTP-запросов")
+    parser.add_argument("--batch-size", type=int, default=100, help="Максимум вызовов в одном JSON-RPC массиве")
+    parser.add_argument("--native-only", action="store_true", help="Только баланс MON, без токенов")
+    parser.add_argument("--start", type=int, default=1, help="Номер начального профиля")
+    parser.add_argument("--end", type=int, help="Номер конечного профиля")
+    args = parser.parse_args()
+
+    wallets = read_wallets(args.start, args.end)
+    if not wallets:
+        logger.info(" (scan_balances), В базе нет адресов кошельков")
+        return
+
+    tokens = [NATIVE_TOKEN] + ([] if args.native_only else list(toket_address_list))
+    rpc = RpcBalanceProvider(args.rpc_url)
+    tokens = rpc.load_token_meta(tokens)  # symbol/decimals - один пакетный запрос; токены без decimals() пропускаются
+
+    started = time.perf_counter()
+    rows, stats = asyncio.run(scan_balances(wallets, tokens, rpc.token_meta, args.rpc_url,
+                                            args.concurrency, args.batch_size))
+    elapsed = time.perf_counter() - started
+
+    SQLiteDatabase().upsert_balances(rows)
+    empty = sum(1 for row in rows if row['token_address'] == NATIVE_TOKEN and Decimal(row['amount']) == 0)
+    logger.info(f" (scan_balances), Кошельков: {len(wallets)}, балансов: {len(rows)}, без MON: {empty}, "
+                f"время: {elapsed:.2f} сек, HTTP-запросов: {stats['http_requests']}, повторов: {stats['retries']}")
+
+
+if __name__ == "__main__":
+    init_logging()
+    main()
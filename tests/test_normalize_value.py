@@ -0,0 +1,70 @@
+"""
+Тесты kuru.normalize_value: таблица известных форматов и свойства парсера на
+значениях, которые генерирует hypothesis (запись с разделителями разрядов,
+суффиксы K/M/B, сокращенная запись 0.0ₙXYZ).
+
+Запуск из корня проекта:
+    python -m pytest tests/test_normalize_value.py
+"""
+from decimal import Decimal
+
+import pytest
+from hypothesis import given, strategies as st
+
+from benchmarks.bench_normalize_value import CASES, SUBSCRIPTS, SUFFIXES
+from kuru.kuru import normalize_value
+
+TO_SUBSCRIPT = str.maketrans('0123456789', SUBSCRIPTS)
+
+# Неотрицательные балансы до 10^24 с точностью до 18 знаков (decimals ERC-20)
+balances = st.builds(lambda units, exponent: Decimal(units).scaleb(-exponent),
+                     st.integers(min_value=0, max_value=10 ** 24), st.integers(min_value=0, max_value=18))
+
+
+@pytest.mark.parametrize('text, expected', [case for case in CASES if case[1] is not None])
+def test_known_formats(text, expected):
+    assert normalize_value(text) == expected
+
+
+@pytest.mark.parametrize('text', [text for text, expected in CASES if expected is None])
+def test_rejected_formats(text):
+    with pytest.raises(ValueError):
+        normalize_value(text)
+
+
+@given(balances)
+def test_plain_with_thousands_separators(value):
+    assert normalize_value(f"{value:,f}") == value
+
+
+@given(balances)
+def test_plain_without_separators(value):
+    assert normalize_value(f"{value:f}") == value
+
+
+@given(st.integers(min_value=1, max_value=999_999), st.integers(min_value=0, max_value=3),
+       st.sampled_from(sorted(SUFFIXES)), st.booleans())
+def test_suffix(digits, exponent, suffix, lower):
+    mantissa = Decimal(digits).scaleb(-exponent)
+    text = f"{mantissa:f}{suffix.lower() if lower else suffix}"
+    assert normalize_value(text) == mantissa * SUFFIXES[suffix]
+
+
+@given(st.integers(min_value=1, max_value=30), st.integers(min_value=1, max_value=10 ** 8))
+def test_subscript_zeros(zeros, tail):
+    text = '0.0' + str(zeros).translate(TO_SUBSCRIPT) + str(tail)
+    assert normalize_value(text) == Decimal(f"0.{'0' * zeros}{tail}")
+
+
+@given(st.one_of(balances.map(lambda value: f"{value:,f}"),
+                 st.integers(min_value=1, max_value=30).map(lambda zeros: '0.0' + str(zeros).translate(TO_SUBSCRIPT) + '7')))
+def test_reparse_is_stable(text):
+    value = normalize_value(text)
+    assert value >= 0
+    assert normalize_value(format(value, 'f')) == value
+
+
+@given(st.text(alphabet='abcdefghijxyz-+/()', max_size=12))
+def test_text_without_digits_is_rejected(text):
+    with pytest.raises(ValueError):
+        normalize_value(text)
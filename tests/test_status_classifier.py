@@ -0,0 +1,117 @@
+"""
+Тесты StatusClassifier: таблица сообщений крана, приоритет правил, время ожидания
+и правила результатов Kuru и onchaingm.
+
+Запуск из корня проекта:
+    python -m pytest tests/test_status_classifier.py
+"""
+from datetime import timedelta
+
+import pytest
+
+from benchmarks.bench_status_classifier import CASES
+from faucet_morkie.faucet_morkie import STATUS_CLASSIFIER
+from status_classifier import StatusClassifier
+
+RULES = [
+    ('limit', [r'limit reached', r'try again later']),
+    ('failed', [r'transaction failed']),
+    ('success', [r'success!']),
+    ('failed', [r'\berror\b']),
+]
+
+
+class FakeDriver:
+    """Драйвер, который возвращает заданный текст страницы или бросает исключение."""
+
+    def __init__(self, text=None, error=None):
+        self.text = text
+        self.error = error
+
+    def execute_script(self, script):
+        if self.error:
+            raise self.error
+        return self.text
+
+
+@pytest.mark.parametrize('text, expected_status, expected_wait', CASES)
+def test_faucet_messages(text, expected_status, expected_wait):
+    result = STATUS_CLASSIFIER.classify(text)
+    assert (result['status'], result['wait']) == (expected_status, expected_wait)
+
+
+@pytest.mark.parametrize('text', [
+    "Transaction failed. Limit reached",
+    "Limit reached. Transaction failed",
+    "error\nsuccess!\nlimit reached",
+])
+def test_priority_does_not_depend_on_position(text):
+    assert StatusClassifier(RULES).classify(text)['status'] == 'limit'
+
+
+def test_general_pattern_does_not_shadow_specific_rule():
+    classifier = StatusClassifier(RULES)
+    assert classifier.classify("Success! No error")['status'] == 'success'
+    assert classifier.classify("Unexpected error")['status'] == 'failed'
+    assert classifier.classify("Errors: none")['status'] == 'unknown'
+
+
+def test_message_is_line_with_match():
+    result = StatusClassifier(RULES).classify("Claim MON\n  Transaction failed: nonce too low  \nFooter")
+    assert result['message'] == "Transaction failed: nonce too low"
+
+
+def test_unknown_status_keeps_whole_text():
+    result = StatusClassifier(RULES, default_status='pending').classify("  Processing...\n")
+    assert result == {'status': 'pending', 'message': "Processing...", 'wait': None}
+
+
+@pytest.mark.parametrize('text, expected_wait', [
+    ("Try again in 3h 12m", timedelta(hours=3, minutes=12)),
+    ("Try again in 5h", timedelta(hours=5)),
+    ("Try again in 45m", timedelta(minutes=45)),
+    ("Login 5m ago. Try again in 2h 1m", timedelta(hours=2, minutes=1)),
+    ("in 7m", timedelta(minutes=7)),
+    ("Try again within 3h", None),
+    ("Try again in 3 hours", None),
+    ("", None),
+    (None, None),
+])
+def test_wait_time(text, expected_wait):
+    assert StatusClassifier(RULES).classify(text)['wait'] == expected_wait
+
+
+def test_patterns_in_priority_order():
+    assert StatusClassifier(RULES).patterns == [
+        r'limit reached', r'try again later', r'transaction failed', r'success!', r'\berror\b']
+
+
+def test_page_details():
+    classifier = StatusClassifier(RULES)
+    assert classifier.page_details(FakeDriver("Header\nTransaction failed\nFooter")) == {
+        'page_status': 'failed', 'page_message': "Transaction failed"}
+    assert classifier.page_details(FakeDriver("Connect wallet")) == {}
+    assert classifier.page_details(FakeDriver(error=RuntimeError("no such window"))) == {}
+
+
+@pytest.mark.parametrize('text, expected_status', [
+    ("MetaMask Tx Signature: User denied transaction signature.", 'rejected'),
+    ("Insufficient balance", 'insufficient_balance'),
+    ("Swap failed: execution reverted", 'failed'),
+    ("Swap successful\nTransaction confirmed", 'success'),
+    ("Unexpected error", 'failed'),
+    ("Swap\nYou pay 0.1 MON", 'unknown'),
+])
+def test_kuru_swap_messages(text, expected_status):
+    kuru = pytest.importorskip('kuru.kuru')
+    assert kuru.SWAP_STATUS_CLASSIFIER.classify(text)['status'] == expected_status
+
+
+@pytest.mark.parametrize('text, expected_status', [
+    ("MetaMask: User rejected the request.", 'rejected'),
+    ("Failed to connect. Something went wrong", 'failed'),
+    ("Connect Wallet", 'unknown'),
+])
+def test_onchaingm_messages(text, expected_status):
+    onchaingm = pytest.importorskip('onchaingm.onchaingm')
+    assert onchaingm.STATUS_CLASSIFIER.classify(text)['status'] == expected_status
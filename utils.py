@@ -1,32 +1,57 @@
 import random
+import threading
 import time
+from decimal import Decimal
+from typing import Any, Dict, Tuple
 
-from config import logger, MIN_PERCENT_MON, MAX_PERCENT_MON, MIN_PERCENT_TOKEN, \
-    MAX_PERCENT_TOKEN  # Подключение конфигурации логгера и констант из config
+from config import logger, get_settings  # Подключение конфигурации логгера и настроек из config
+from amounts import Amount, DEFAULT_DECIMALS, percent_of
 
 
-def calculate_percentage(number: float, percent: float) -> float:
-    try:
-        return round((number * percent) / 100, 4)  # Округляем до 4 знаков после запятой
-    except Exception as e:
-        print(f"Ошибка: {e}")
-        return 0.0
+def calculate_percentage(number: Amount, percent: Amount, decimals: int = DEFAULT_DECIMALS) -> Decimal:
+    """Точная доля percent% от number, округленная вниз (см. amounts.percent_of)"""
+    return percent_of(number, percent, decimals)
 
-def random_number_for_sell(selling_symbol, number_tokens_selling):
+def random_number_for_sell(selling_symbol, number_tokens_selling, decimals: int = DEFAULT_DECIMALS) -> Decimal:
     # Расчет количества для продажи
+    settings = get_settings()
     if selling_symbol.lower() == 'mon':
-        random_percent = random.randint(MIN_PERCENT_MON, MAX_PERCENT_MON)
+        random_percent = random.randint(settings.min_percent_mon, settings.max_percent_mon)
         logger.debug(f'Выбран коин: {selling_symbol}')
     else:
-        random_percent = random.randint(MIN_PERCENT_TOKEN, MAX_PERCENT_TOKEN)
+        random_percent = random.randint(settings.min_percent_token, settings.max_percent_token)
         logger.debug(f'Выбран токен: {selling_symbol}')
 
-    number_for_sell = calculate_percentage(number_tokens_selling, random_percent)
+    number_for_sell = calculate_percentage(number_tokens_selling, random_percent, decimals)
     logger.debug(
         f"Выбрано рандомно число: {random_percent}% от {number_tokens_selling} = "
         f"{number_for_sell} на продажу")
     return number_for_sell
 
+# DB.xlsx сохраняют потоки профилей (постоянный режим) и основной поток: запись под общей блокировкой
+WORKBOOK_LOCK = threading.Lock()
+
+
+def save_workbook_cells(file_path: str, worksheet_name: str, cells: Dict[Tuple[int, int], Any]):
+    """
+    Записывает ячейки {(строка, колонка): значение} в DB.xlsx.
+
+    Файл перечитывается под WORKBOOK_LOCK, поэтому книга, загруженная профилем раньше,
+    не затирает изменения, сохраненные другими профилями после ее загрузки.
+    """
+    import openpyxl
+
+    with WORKBOOK_LOCK:
+        workbook = openpyxl.load_workbook(file_path)
+        try:
+            worksheet = workbook[worksheet_name]
+            for (row, column), value in cells.items():
+                worksheet.cell(row=row, column=column).value = value
+            workbook.save(file_path)
+        finally:
+            workbook.close()
+
+
 def convert_minutes_to_time(total_minutes: int) -> tuple[int, int]:
     hours = total_minutes // 60
     minutes = total_minutes % 60
@@ -0,0 +1,80 @@
+"""
+Адреса кошельков по сид-фразам без побочных эффектов при импорте.
+
+Модуль не импортирует config и другие модули проекта: дочерние процессы пула
+(на Windows процессы запускаются через spawn и заново импортируют модули) не читают
+.env, не открывают app.log и не запускают свой поток логирования.
+
+Пул процессов запускается отдельным интерпретатором (python -m wallet_derivation):
+его главный модуль - этот файл, поэтому процессы пула не импортируют main.py.
+Сид-фразы передаются через stdin (JSON-список), результат - JSON {фраза: адрес или null}
+в stdout; в аргументах командной строки сид-фраз нет.
+"""
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional
+
+
+def address_from_seed(seed: str) -> str:
+    """
+    Адрес первого аккаунта MetaMask (m/44'/60'/0'/0/0) по сид-фразе, без браузера.
+
+    Результат не кэшируется в памяти: сид-фразы не должны оставаться в процессе после
+    вычисления, повторные запросы берут адрес из зашифрованного кэша address_cache.
+
+    Returns:
+        str: Адрес в формате EIP-55 (0x...)
+    """
+    # hdwallet загружается только при вычислении адреса
+    from hdwallet import HDWallet
+    from hdwallet.mnemonics import BIP39Mnemonic
+    from hdwallet.cryptocurrencies import Ethereum as Cryptocurrency
+    from hdwallet.hds import BIP44HD
+    from hdwallet.derivations import BIP44Derivation, CHANGES
+
+    hdwallet = (
+        HDWallet(
+            cryptocurrency=Cryptocurrency,
+            hd=BIP44HD,
+            network=Cryptocurrency.NETWORKS.MAINNET,
+            passphrase=None,
+        )
+        .from_mnemonic(mnemonic=BIP39Mnemonic(mnemonic=" ".join(seed.split())))
+        .from_derivation(
+            derivation=BIP44Derivation(
+                coin_type=Cryptocurrency.COIN_TYPE,
+                account=0,
+                change=CHANGES.EXTERNAL_CHAIN,
+                address=0,
+            )
+        )
+    )
+    return hdwallet.address()
+
+
+def derive_address(seed: str) -> Optional[str]:
+    """Адрес по сид-фразе или None для некорректной фразы (функция процессов пула)."""
+    try:
+        return address_from_seed(seed)
+    except Exception:
+        return None
+
+
+def derive_addresses(seeds: Iterable[str], workers: Optional[int] = None) -> Dict[str, Optional[str]]:
+    """Адреса для списка сид-фраз в пуле процессов."""
+    seeds = list(seeds)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(seeds, pool.map(derive_address, seeds, chunksize=4)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Адреса кошельков по сид-фразам из stdin (JSON-список)")
+    parser.add_argument("--workers", type=int, help="Количество процессов пула")
+    args = parser.parse_args()
+    json.dump(derive_addresses(json.load(sys.stdin), args.workers), sys.stdout)
+
+
+if __name__ == "__main__":
+    main()